@@ -0,0 +1,138 @@
+"""Бенчмарки интеграции Интерсвязь на локальном стенде.
+
+Измеряет два сценария на ``benchmarks.fake_is74``, без обращения к облаку:
+
+* setup — полное обновление координатора (группы, камеры, реле);
+* door — задержка открытия двери при заданной параллельности.
+
+Снимки здесь не измеряются: кадр берётся из HLS-потока через ffmpeg,
+и без настоящего видео стенд такую нагрузку не воспроизводит.
+
+Запуск из корня репозитория (нужен установленный Home Assistant)::
+
+    python -m benchmarks.bench --latency 40 --concurrency 10 --json results.json
+
+Результаты пишутся в файл ``--json``, их удобно сравнивать между коммитами.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.intersvyaz.api import IntersvyazApiClient, async_create_session
+from custom_components.intersvyaz.coordinator import async_fetch_data
+
+from .fake_is74 import FakeIs74Config, async_start
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    """Медиана, p95 и максимум выборки."""
+    ordered = sorted(samples_ms)
+    p95_index = max(int(len(ordered) * 0.95) - 1, 0)
+    return {
+        "count": len(ordered),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[p95_index], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+async def bench_setup(client: IntersvyazApiClient, rounds: int) -> dict:
+    """Время полного обновления данных."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        data = await async_fetch_data(client)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {**summarize(samples), "cameras": len(data.cameras), "relays": len(data.relays)}
+
+
+async def bench_door(client: IntersvyazApiClient, relay_id: str, presses: int, concurrency: int) -> dict:
+    """Задержка открытия двери."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+    failures = 0
+
+    async def press() -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await client.async_open_door(relay_id)
+            except Exception:  # noqa: BLE001
+                status = None
+            samples.append((time.perf_counter() - started) * 1000)
+            failures += status != 200
+
+    await asyncio.gather(*(press() for _ in range(presses)))
+    return {**summarize(samples), "failures": failures}
+
+
+async def async_main(args: argparse.Namespace) -> dict:
+    """Запуск всех сценариев."""
+    config = FakeIs74Config(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        cameras_per_group=args.cameras,
+    )
+    runner, base_url = await async_start(config)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        session = async_create_session(hass)
+        credentials = {"username": "bench", "password": "bench"}
+        try:
+            bootstrap = IntersvyazApiClient(session, base_url=base_url)
+            token = await bootstrap.async_get_token("bench", "bench")
+            client = IntersvyazApiClient(
+                session,
+                token,
+                credentials=credentials,
+                base_url=base_url,
+                base_url_cam=base_url,
+                base_url_stream=base_url,
+            )
+
+            results = {"setup": await bench_setup(client, args.rounds)}
+            data = await async_fetch_data(client)
+            relay_id = str(data.relays[0]["RELAY_ID"])
+            results["door"] = await bench_door(client, relay_id, args.presses, args.concurrency)
+            results["api_metrics"] = client.metrics.as_dict()
+            results["server_requests"] = dict(runner.app["state"].requests)
+        finally:
+            await session.close()
+            await runner.cleanup()
+            await hass.async_stop(force=True)
+
+    return results
+
+
+def main() -> None:
+    """Запуск из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=30.0, help="задержка стенда, мс")
+    parser.add_argument("--jitter", type=float, default=5.0, help="разброс задержки, мс")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--cameras", type=int, default=8, help="камер в группе")
+    parser.add_argument("--rounds", type=int, default=20, help="повторов setup")
+    parser.add_argument("--presses", type=int, default=50, help="нажатий кнопки")
+    parser.add_argument("--concurrency", type=int, default=10, help="параллельных нажатий")
+    parser.add_argument(
+        "--json", dest="json_path", required=True, help="файл для результатов в JSON"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(async_main(args))
+    with open(args.json_path, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
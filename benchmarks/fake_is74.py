@@ -0,0 +1,290 @@
+"""Локальная замена API Интерсвязь для бенчмарков и ручной проверки.
+
+Один сервер отвечает за api.is74.ru, cams.is74.ru и cdn.cams.is74.ru:
+пути у них не пересекаются. Задержка, джиттер, доля ошибок и время
+жизни токена настраиваются, поэтому можно воспроизвести медленное
+облако, 5xx и истёкший токен.
+
+Запуск::
+
+    python -m benchmarks.fake_is74 --port 8074 --latency 40 --error-rate 0.05
+
+После этого адрес ``http://127.0.0.1:8074`` можно передать в
+``IntersvyazApiClient`` как ``base_url``, ``base_url_cam`` и
+``base_url_stream`` (или в ключи ``base_url*`` записи конфигурации).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+
+@dataclass
+class FakeIs74Config:
+    """Параметры стенда."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    token_ttl: float | None = None
+    yard_groups: int = 1
+    cameras_per_group: int = 8
+    relays: int = 2
+    # Сколько первых открытий двери отвечают error_status (проверка повторов)
+    open_failures: int = 0
+    # Статус ответа на авторизацию: отказ (4xx) или сбой сервера (5xx)
+    auth_status: int = 200
+    # Статус ответа на запрос групп «Свои камеры»
+    self_cams_status: int = 200
+    # Записей в журнале и есть ли журнал вообще (иначе 404)
+    history_records: int = 10
+    history_supported: bool = True
+
+
+@dataclass
+class FakeIs74State:
+    """Состояние стенда: выданные токены, вызовы и счётчики запросов."""
+
+    tokens: dict[str, float] = field(default_factory=dict)
+    # Квартира (USER_ID), для которой выдан токен по телефону
+    token_users: dict[str, str] = field(default_factory=dict)
+    calls: list[dict] = field(default_factory=list)
+    requests: Counter = field(default_factory=Counter)
+
+    def issue_token(self, user_id: str | None = None) -> str:
+        """Выдаёт новый токен."""
+        token = uuid.uuid4().hex
+        self.tokens[token] = time.monotonic()
+        if user_id is not None:
+            self.token_users[token] = user_id
+        return token
+
+    def push_call(self, user_id: str) -> dict:
+        """Добавляет вызов домофона в квартиру user_id."""
+        event = {"ID": len(self.calls) + 1, "USER_ID": user_id, "TYPE": "call"}
+        self.calls.append(event)
+        return event
+
+
+def create_app(config: FakeIs74Config | None = None) -> web.Application:
+    """Создаёт приложение стенда."""
+    config = config or FakeIs74Config()
+    state = FakeIs74State()
+
+    def token_valid(token: str | None) -> bool:
+        issued = state.tokens.get(token or "")
+        if issued is None:
+            return False
+        return config.token_ttl is None or time.monotonic() - issued < config.token_ttl
+
+    @web.middleware
+    async def simulate_network(request: web.Request, handler):
+        """Задержка, случайные ошибки и проверка токена."""
+        state.requests[request.match_info.route.name or request.path] += 1
+        delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and random.random() < config.error_rate:
+            return web.json_response({"message": "injected error"}, status=config.error_status)
+
+        if request.path.startswith(("/domofon", "/api/get-group", "/api/archive")):
+            if not token_valid(request_token(request)):
+                return web.json_response({"message": "Unauthorized"}, status=401)
+        elif request.path.startswith("/hls"):
+            token = request.query.get("token", "").removeprefix("bearer-")
+            if not token_valid(token):
+                return web.Response(status=401)
+        return await handler(request)
+
+    def request_token(request: web.Request) -> str:
+        return request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+    def token_response(user_id: str | None = None) -> web.Response:
+        if config.auth_status != 200:
+            return web.json_response({"message": "auth error"}, status=config.auth_status)
+        return web.json_response({"TOKEN": state.issue_token(user_id)})
+
+    async def auth_mobile(request: web.Request) -> web.Response:
+        return token_response()
+
+    async def send_sms(request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def confirm(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "authId": "fake-auth",
+                "addresses": [
+                    {"ADDRESS": "ул. Тестовая, 1, кв. 1", "USER_ID": "1001"},
+                    {"ADDRESS": "ул. Тестовая, 2, кв. 5", "USER_ID": "1002"},
+                ],
+            }
+        )
+
+    async def get_token(request: web.Request) -> web.Response:
+        payload = await request.json()
+        return token_response(str(payload["userId"]))
+
+    async def relays(request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {"RELAY_ID": 500 + index, "ADDRESS": f"Подъезд {index + 1}"}
+                for index in range(config.relays)
+            ]
+        )
+
+    async def open_door(request: web.Request) -> web.Response:
+        relay_id = int(request.match_info["relay_id"])
+        if not 500 <= relay_id < 500 + config.relays:
+            return web.json_response({"message": "Not found"}, status=404)
+        if state.requests["open"] <= config.open_failures:
+            return web.json_response({"message": "relay busy"}, status=config.error_status)
+        # Настоящий сервер отвечает на открытие пустым телом
+        return web.Response()
+
+    async def history(request: web.Request) -> web.Response:
+        if not config.history_supported:
+            return web.json_response({"message": "Not found"}, status=404)
+        after_id = int(request.query.get("afterId", 0))
+        records = [
+            {"ID": 9000 + index, "TYPE": "call" if index % 2 else "open", "DATE": int(time.time())}
+            for index in range(config.history_records)
+        ]
+        return web.json_response([record for record in records if record["ID"] > after_id])
+
+    async def call_events(request: web.Request) -> web.Response:
+        # Отвечает сразу, не держа соединение; токен видит только вызовы своей квартиры
+        after_id = int(request.query.get("lastId", 0))
+        user_id = state.token_users.get(request_token(request))
+        return web.json_response(
+            [
+                event for event in state.calls
+                if event["ID"] > after_id and user_id in (None, event["USER_ID"])
+            ]
+        )
+
+    async def archive_ranges(request: web.Request) -> web.Response:
+        # Запись по 20 минут в начале каждого часа запрошенного интервала
+        start, end = int(request.query["from"]), int(request.query["to"])
+        page, limit = int(request.query.get("page", 1)), int(request.query.get("limit", 100))
+        ranges = [
+            {"FROM": hour, "TO": min(hour + 1200, end)}
+            for hour in range(start - start % 3600, end, 3600)
+            if hour >= start
+        ]
+        return web.json_response(ranges[(page - 1) * limit : page * limit])
+
+    async def groups(request: web.Request) -> web.Response:
+        if request.query.get("selfCams") == "true":
+            if config.self_cams_status != 200:
+                return web.json_response({"message": "error"}, status=config.self_cams_status)
+            return web.json_response([{"ID": "self", "NAME": "Свои камеры"}])
+        return web.json_response(
+            [{"ID": f"yard{index}", "NAME": f"Умный двор {index + 1}"} for index in range(config.yard_groups)]
+            + [{"ID": "other", "NAME": "Городские камеры"}]
+        )
+
+    async def group_cameras(request: web.Request) -> web.Response:
+        group_id = request.match_info["group_id"]
+        return web.json_response(
+            [
+                {"UUID": f"{group_id}-cam{index}", "NAME": f"Камера {index + 1}", "ADDRESS": "ул. Тестовая, 1"}
+                for index in range(config.cameras_per_group)
+            ]
+        )
+
+    async def multivariant(request: web.Request) -> web.Response:
+        camera_uuid = request.query.get("uuid", "")
+        return web.Response(
+            text=(
+                "#EXTM3U\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=400000,RESOLUTION=640x360\n"
+                f"variant.m3u8?uuid={camera_uuid}&quality=low\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=1500000,RESOLUTION=1280x720\n"
+                f"variant.m3u8?uuid={camera_uuid}&quality=high\n"
+            ),
+            content_type="application/vnd.apple.mpegurl",
+        )
+
+    async def variant(request: web.Request) -> web.Response:
+        return web.Response(
+            text=(
+                "#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:1\n"
+                "#EXTINF:2.0,\nsegment1.ts\n#EXTINF:2.0,\nsegment2.ts\n"
+            ),
+            content_type="application/vnd.apple.mpegurl",
+        )
+
+    async def segment(request: web.Request) -> web.Response:
+        camera_uuid = request.query.get("uuid", "")
+        return web.Response(
+            body=f"{camera_uuid}:{request.match_info['name']};".encode(), content_type="video/mp2t"
+        )
+
+    app = web.Application(middlewares=[simulate_network])
+    app["config"] = config
+    app["state"] = state
+    app.router.add_post("/auth/mobile", auth_mobile, name="auth-mobile")
+    app.router.add_post("/mobile/auth/send-sms", send_sms, name="send-sms")
+    app.router.add_post("/mobile/auth/confirm", confirm, name="confirm")
+    app.router.add_post("/mobile/auth/get-token", get_token, name="get-token")
+    app.router.add_get("/domofon/relays", relays, name="relays")
+    app.router.add_post("/domofon/relays/{relay_id}/open", open_door, name="open")
+    app.router.add_get("/domofon/history", history, name="history")
+    app.router.add_get("/domofon/calls/events", call_events, name="call-events")
+    app.router.add_get("/api/archive/{uuid}/ranges", archive_ranges, name="archive")
+    app.router.add_get("/api/get-group/", groups, name="get-group")
+    app.router.add_get("/api/get-group/{group_id}", group_cameras, name="get-group-cameras")
+    app.router.add_get("/hls/playlists/multivariant.m3u8", multivariant, name="playlist")
+    app.router.add_get("/hls/playlists/variant.m3u8", variant, name="variant")
+    app.router.add_get("/hls/playlists/{name}.ts", segment, name="segment")
+    return app
+
+
+async def async_start(config: FakeIs74Config, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+    """Запускает стенд, возвращает runner и базовый URL."""
+    app = create_app(config)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def main() -> None:
+    """Запуск стенда из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8074)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, мс")
+    parser.add_argument("--jitter", type=float, default=0.0, help="разброс задержки, мс")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов с ошибкой")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--token-ttl", type=float, default=None, help="время жизни токена, с")
+    parser.add_argument("--cameras", type=int, default=8, help="камер в группе")
+    parser.add_argument("--relays", type=int, default=2)
+    args = parser.parse_args()
+
+    config = FakeIs74Config(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_ttl=args.token_ttl,
+        cameras_per_group=args.cameras,
+        relays=args.relays,
+    )
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
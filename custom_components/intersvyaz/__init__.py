@@ -1,295 +1,257 @@
+import asyncio
 import logging
-import aiohttp
+import shutil
+import time
+from functools import partial
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
-import uuid
-from typing import Optional
 from homeassistant.const import Platform
 import homeassistant.helpers.config_validation as cv
 
-# Определение домена интеграции и базовых URL
-DOMAIN = "intersvyaz"
-BASE_URL = "https://api.is74.ru"
-BASE_URL_CAM = "https://cams.is74.ru"
+from .addresses import (
+    address_credentials,
+    async_remove_legacy_device,
+    async_save_address_token,
+    entry_addresses,
+    item_address,
+    primary_address,
+)
+from .api import IntersvyazApiClient, async_create_session
+from .archive import ArchiveTimeline
+from .call_listener import async_setup_call_listener, async_unload_call_listener
+from .clips import ClipRecorder, SegmentBuffer, clips_directory
+from .const import (
+    DOMAIN,
+    ADDRESS_KEY,
+    BASE_URL,
+    BASE_URL_CAM,
+    BASE_URL_STREAM,
+    CONF_BASE_URL,
+    CONF_BASE_URL_CAM,
+    CONF_BASE_URL_STREAM,
+    CONF_CALL_EVENTS,
+    CONF_CLIP_CAMERAS,
+    CONF_CLIP_MAX_SIZE,
+    CONF_CLIP_RETENTION_DAYS,
+    CONF_PRELOAD_CAMERAS,
+    CONF_PREWARM_STREAMS,
+    CONF_SNAPSHOT_CACHE_SIZE,
+    CONF_SNAPSHOT_MAX_AGE,
+    CLIP_POST_SECONDS,
+    CLIP_PRE_SECONDS,
+    DEFAULT_CALL_EVENTS,
+    DEFAULT_CLIP_MAX_SIZE,
+    DEFAULT_CLIP_RETENTION_DAYS,
+    DEFAULT_PREWARM_STREAMS,
+    DEFAULT_SNAPSHOT_CACHE_SIZE,
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    EVENT_DOOR_OPEN,
+    SIGNAL_CALL,
+    SNAPSHOT_BATCH_CONCURRENCY,
+    STORAGE_VERSION,
+    VARIANT_CACHE_TTL,
+)
+from .coordinator import IntersvyazDataUpdateCoordinator, storage_key
+from .history import HistoryCoordinator, history_storage_key
+from .hls import VariantCache
+from .metrics import ApiMetrics
+from .scheduler import async_get_scheduler
+from .services import async_setup_services
+from .snapshot import SnapshotCache, SnapshotRefresher
 
 # Логгер для отладки
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.CAMERA, Platform.BUTTON]
+PLATFORMS = [
+    Platform.CAMERA, Platform.BUTTON, Platform.EVENT, Platform.SENSOR, Platform.BINARY_SENSOR
+]
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Настройка интеграции."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Настройка интеграции для камеры и кнопки."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    started = time.monotonic()
 
-    # Настройка камеры и кнопки
-    await hass.config_entries.async_forward_entry_setups(entry, ["camera", "button"])
-    
-    return True
+    # Один пул соединений на запись, через него идут все платформы.
+    # У каждого адреса свой токен, пул и счётчики общие. Очередь запросов
+    # общая для всех записей: ограничения сервера действуют на все сразу.
+    session = async_create_session(hass)
+    # Закрывается и при выгрузке, и при ошибке на любом шаге настройки ниже
+    entry.async_on_unload(session.close)
+    metrics = ApiMetrics()
+    scheduler = async_get_scheduler(hass)
+    clients: dict[str, IntersvyazApiClient] = {}
+    for address in entry_addresses(entry):
+        key = address["key"]
+        clients[key] = IntersvyazApiClient(
+            session,
+            address["token"],
+            credentials=address_credentials(entry, address),
+            base_url=entry.data.get(CONF_BASE_URL, BASE_URL),
+            base_url_cam=entry.data.get(CONF_BASE_URL_CAM, BASE_URL_CAM),
+            base_url_stream=entry.data.get(CONF_BASE_URL_STREAM, BASE_URL_STREAM),
+            metrics=metrics,
+            scheduler=scheduler,
+        )
+        entry.async_on_unload(
+            clients[key].tokens.async_add_listener(
+                partial(async_save_address_token, hass, entry, key)
+            )
+        )
+    # Журнал и диагностика идут через первый адрес: записи журнала
+    # других адресов записи не отслеживаются. Вызовы слушаются по всем адресам.
+    client = next(iter(clients.values()))
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Разгрузка конфигурационной записи."""
-    unload_ok = await hass.config_entries.async_forward_entry_unload(entry, "camera")
-    unload_ok_button = await hass.config_entries.async_forward_entry_unload(entry, "button")
-    
-    if unload_ok and unload_ok_button:
-        hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok and unload_ok_button
+    # Группы, камеры и реле запрашиваются одним обновлением для всех платформ.
+    # Если есть сохранённый снимок, сущности создаются из него сразу,
+    # а свежие данные подтягиваются в фоне.
+    # Без снимка ждём первого ответа API: при ошибке связи
+    # async_config_entry_first_refresh поднимает ConfigEntryNotReady,
+    # и Home Assistant повторяет настройку с нарастающей паузой.
+    # Журнал загружается из хранилища, новые записи — в фоне по курсору.
+    coordinator = IntersvyazDataUpdateCoordinator(hass, entry, clients)
+    history = HistoryCoordinator(hass, entry, client)
+    cached, _ = await asyncio.gather(coordinator.async_load_cached(), history.async_load())
+    if not cached:
+        await coordinator.async_config_entry_first_refresh()
 
-async def get_token(session: aiohttp.ClientSession, username: str, password: str) -> str | None:
-    """Получение токена авторизации."""
-    url = f"{BASE_URL}/auth/mobile"
-    payload = {"username": username, "password": password}
-    headers = {"Content-Type": "application/json"}
-    
-    try:
-        _LOGGER.debug(f"Отправка запроса авторизации для пользователя: {username}")
-        async with session.post(url, json=payload, headers=headers) as resp:
-            response_text = await resp.text()
-            _LOGGER.debug(f"Ответ сервера: {response_text}")
-            
-            if resp.status == 200:
-                try:
-                    data = await resp.json()
-                    if "TOKEN" in data:
-                        return data["TOKEN"]
-                    _LOGGER.error("Токен отсутствует в ответе")
-                except ValueError as e:
-                    _LOGGER.error(f"Ошибка разбора JSON ответа: {e}")
-            else:
-                _LOGGER.error(f"Ошибка авторизации. Статус: {resp.status}")
-    except aiohttp.ClientError as e:
-        _LOGGER.error(f"Ошибка сети при авторизации: {e}")
-    except Exception as e:
-        _LOGGER.error(f"Неожиданная ошибка при авторизации: {e}")
-    
-    return None
+    variants = VariantCache(hass, coordinator.camera_client, VARIANT_CACHE_TTL)
+    for address_client in clients.values():
+        entry.async_on_unload(address_client.tokens.async_add_listener(lambda token: variants.clear()))
 
-async def get_relay_id(session: aiohttp.ClientSession, token: str) -> str | None:
-    """Получение ID реле."""
-    url = f"{BASE_URL}/domofon/relays"
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    async with session.get(url, headers=headers) as resp:
-        data = await resp.json()
-        _LOGGER.info(f"Ответ API на relays: {data}")
-        
-        if isinstance(data, list) and data:
-            return data[0].get("RELAY_ID")
-        _LOGGER.error("API не вернул список реле!")
-    return None
+    snapshot_max_age = entry.options.get(CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE)
+    snapshots = SnapshotCache(
+        hass,
+        max_age=snapshot_max_age,
+        max_bytes=entry.options.get(CONF_SNAPSHOT_CACHE_SIZE, DEFAULT_SNAPSHOT_CACHE_SIZE) * 1024 * 1024,
+    )
 
-async def get_group_id(session: aiohttp.ClientSession, token: str) -> str | None:
-    """Получение ID группы с названием, начинающимся на 'Умный двор', или 'Свои камеры' через дополнительный запрос."""
-    # Первый запрос: ищем "Умный двор" по основному URL
-    url = f"{BASE_URL_CAM}/api/get-group/"
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    async with session.get(url, headers=headers) as resp:
-        data = await resp.json()
-        _LOGGER.info(f"Ответ API на group (основной URL): {data}")
-        
-        # Проверяем наличие "Умный двор"
-        for group in data:
-            if group.get("NAME", "").startswith("Умный двор"):
-                _LOGGER.info(f"Найдена группа 'Умный двор' с ID: {group.get('ID')}")
-                return group.get("ID")
-        
-        _LOGGER.info("Группа 'Умный двор' не найдена в основном запросе, проверяем 'Свои камеры'")
+    hass.data[DOMAIN][entry.entry_id] = {
+        "session": session,
+        "client": client,
+        "clients": clients,
+        "coordinator": coordinator,
+        "history": history,
+        "archive": ArchiveTimeline(),
+        "options": dict(entry.options),
+        "variants": variants,
+        "snapshots": snapshots,
+        "snapshot_refresher": SnapshotRefresher(
+            hass, snapshots, snapshot_max_age, SNAPSHOT_BATCH_CONCURRENCY
+        ),
+    }
 
-    # Второй запрос: ищем "Свои камеры" с параметром ?selfCams=true
-    url_self_cams = f"{BASE_URL_CAM}/api/get-group/?selfCams=true"
-    async with session.get(url_self_cams, headers=headers) as resp:
-        data = await resp.json()
-        _LOGGER.info(f"Ответ API на group (с ?selfCams=true): {data}")
-        
-        # Проверяем наличие "Свои камеры"
-        for group in data:
-            if group.get("NAME", "") == "Свои камеры":
-                _LOGGER.info(f"Найдена группа 'Свои камеры' с ID: {group.get('ID')}")
-                return group.get("ID")
-        
-        _LOGGER.error("Не найдены ни группа 'Умный двор', ни 'Свои камеры'!")
-    return None
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    async_remove_legacy_device(hass, entry)
 
-async def get_uuid_cam(session: aiohttp.ClientSession, token: str, group_id: str) -> list[str]:
-    """Получение списка UUID камер."""
-    url = f"{BASE_URL_CAM}/api/get-group/{group_id}"
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    async with session.get(url, headers=headers) as resp:
-        data = await resp.json()
-        _LOGGER.info(f"Ответ API на камеры: {data}")
-        
-        if isinstance(data, list) and data:
-            return [camera["UUID"] for camera in data if "UUID" in camera]
-        _LOGGER.error("API не вернул список UUID камер!")
-    return []
+    # Настройка камеры, кнопки и сенсоров
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-async def open_door(session: aiohttp.ClientSession, token: str, relay_id: str) -> None:
-    """Открытие домофона."""
-    url = f"{BASE_URL}/domofon/relays/{relay_id}/open?from=app"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
-    async with session.post(url, headers=headers) as resp:
-        if resp.status == 200:
-            _LOGGER.info("Дверь успешно открыта")
-        else:
-            _LOGGER.error("Ошибка открытия двери")
+    if cached:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), "intersvyaz_reconcile"
+        )
 
-async def get_token_by_phone(
-    session: aiohttp.ClientSession, 
-    phone: str,
-    code: Optional[str] = None,
-    device_id: Optional[str] = None,
-    auth_id: Optional[str] = None,
-    user_id: Optional[str] = None,
-    skip_sms: bool = False
-) -> dict:
-    """Авторизация по номеру телефона."""
-    clean_phone = phone.replace("+7", "")
-    
-    if auth_id and user_id and skip_sms:
-        # Получение токена для выбранного адреса
-        url = f"{BASE_URL}/mobile/auth/get-token"
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "authId": str(auth_id).strip(),
-            "userId": str(user_id).strip()
-        }
-        
-        _LOGGER.debug(f"Отправка запроса на получение токена: {payload}")
-        
-        try:
-            async with session.post(url, json=payload, headers=headers) as resp:
-                response_text = await resp.text()
-                _LOGGER.debug(f"Ответ сервера при получении токена: {response_text}")
-                
-                if resp.status == 200:
-                    data = await resp.json()
-                    if "TOKEN" in data:
-                        return {"token": data["TOKEN"]}
-                
-                _LOGGER.error(f"Ошибка получения токена. Статус: {resp.status}, Ответ: {response_text}")
-                return {"error": "token_error"}
-                
-        except Exception as e:
-            _LOGGER.error(f"Ошибка при получении токена: {e}")
-            return {"error": "token_error"}
-    
-    if not code:
-        # Первый шаг - отправка СМС
-        device_id = str(uuid.uuid4()).replace("-", "")
-        url = f"{BASE_URL}/mobile/auth/send-sms"
-        payload = {
-            "phone": clean_phone,
-            "uniqueDeviceId": device_id
-        }
-        
-        _LOGGER.debug(f"Отправка запроса на SMS: {payload}")
-        async with session.post(url, json=payload) as resp:
-            response_text = await resp.text()
-            _LOGGER.debug(f"Ответ сервера: {response_text}")
-            
-            try:
-                data = await resp.json()
-                if resp.status != 200:
-                    error_message = data.get("message", "") if isinstance(data, dict) else str(data)
-                    return {"error": "sms_error", "message": error_message}
-                        
-                return {"device_id": device_id}
-            except Exception as e:
-                _LOGGER.error(f"Ошибка разбора ответа: {e}")
-                return {"error": "parse_error"}
-            
-    elif code and device_id and not auth_id:
-        # Второй шаг - подтверждение кода
-        url = f"{BASE_URL}/mobile/auth/confirm"
-        payload = {
-            "confirmCode": code,
-            "phone": clean_phone,
-            "uniqueDeviceId": device_id
-        }
-        
-        _LOGGER.debug(f"Отправка запроса подтверждения: {payload}")
-        async with session.post(url, json=payload) as resp:
-            response_text = await resp.text()
-            _LOGGER.debug(f"Ответ сервера при подтверждении: {response_text}")
-            
-            try:
-                data = await resp.json()
-                if "authId" in data and "addresses" in data:
-                    return {
-                        "auth_id": data["authId"],
-                        "addresses": data["addresses"]
-                    }
-                return {"error": "wrong_code"}
-            except Exception as e:
-                _LOGGER.error(f"Ошибка разбора ответа: {e}")
-                return {"error": "parse_error"}
-            
-    elif auth_id and user_id:
-        # Третий шаг - получение токена для выбранного адреса
-        url = f"{BASE_URL}/mobile/auth/get-token"
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "authId": str(auth_id).strip(),
-            "userId": str(user_id).strip()
-        }
-        
-        _LOGGER.debug(f"Отправка запроса на получение токена:")
-        _LOGGER.debug(f"URL: {url}")
-        _LOGGER.debug(f"Headers: {headers}")
-        _LOGGER.debug(f"Payload: {payload}")
-        
-        try:
-            async with session.post(url, json=payload, headers=headers) as resp:
-                response_text = await resp.text()
-                _LOGGER.debug(f"Статус ответа: {resp.status}")
-                _LOGGER.debug(f"Заголовки ответа: {resp.headers}")
-                _LOGGER.debug(f"Тело ответа: {response_text}")
-                
-                if resp.status != 200:
-                    _LOGGER.error(f"Ошибка HTTP: {resp.status}")
-                    return {"error": "http_error", "message": f"HTTP {resp.status}"}
-                
-                try:
-                    data = await resp.json()
-                    _LOGGER.debug(f"Разобранный JSON: {data}")
-                    
-                    if isinstance(data, dict):
-                        if "TOKEN" in data:
-                            _LOGGER.debug(f"Успешно получен токен: {data['TOKEN']}")
-                            return {"token": data["TOKEN"]}
-                        elif "token" in data:
-                            _LOGGER.debug(f"Успешно получен токен (lower case): {data['token']}")
-                            return {"token": data["token"]}
-                        else:
-                            _LOGGER.error(f"Токен отсутствует в ответе: {data}")
-                            return {"error": "no_token", "message": "Токен отсутствует в ответе"}
-                    else:
-                        _LOGGER.error(f"Неожиданный формат ответа: {data}")
-                        return {"error": "invalid_response", "message": "Неверный формат ответа"}
-                        
-                except ValueError as e:
-                    _LOGGER.error(f"Ошибка разбора JSON: {e}")
-                    return {"error": "parse_error", "message": str(e)}
-                    
-        except aiohttp.ClientError as e:
-            _LOGGER.error(f"Ошибка сети: {e}")
-            return {"error": "network_error", "message": str(e)}
-        except Exception as e:
-            _LOGGER.error(f"Неожиданная ошибка: {e}")
-            return {"error": "unknown_error", "message": str(e)}
+    entry.async_create_background_task(
+        hass, history.async_refresh(), "intersvyaz_history_sync"
+    )
+
+    # Вызовы домофона приходят через одно соединение на адрес аккаунта;
+    # после вызова по адресу журнала он подтягивается, не дожидаясь интервала
+    if entry.options.get(CONF_CALL_EVENTS, DEFAULT_CALL_EVENTS):
+        async_setup_call_listener(hass, entry, clients)
+        history_address = primary_address(entry)
+
+        async def _async_call_received(event: dict) -> None:
+            if event[ADDRESS_KEY] == history_address:
+                await history.async_request_refresh()
+
+        entry.async_on_unload(
+            async_dispatcher_connect(hass, SIGNAL_CALL.format(entry.entry_id), _async_call_received)
+        )
+
+    # Варианты потоков избранных камер (или всех в режиме прогрева) получаем заранее
+    if entry.options.get(CONF_PREWARM_STREAMS, DEFAULT_PREWARM_STREAMS):
+        prewarm_uuids = [camera["UUID"] for camera in coordinator.data.cameras]
+    else:
+        prewarm_uuids = entry.options.get(CONF_PRELOAD_CAMERAS, [])
+    if prewarm_uuids:
+        entry.async_create_background_task(
+            hass, variants.async_prewarm(prewarm_uuids), "intersvyaz_prewarm_streams"
+        )
+
+    # Буфер сегментов выбранных камер для клипов при открытии двери и вызове
+    clip_uuids = entry.options.get(CONF_CLIP_CAMERAS, [])
+    if clip_uuids:
+        cameras = {camera["UUID"]: camera for camera in coordinator.data.cameras}
+        recorder = ClipRecorder(
+            hass,
+            entry.entry_id,
+            {
+                camera_uuid: SegmentBuffer(
+                    hass,
+                    coordinator.camera_client(camera_uuid),
+                    variants,
+                    camera_uuid,
+                    CLIP_PRE_SECONDS,
+                    address=item_address(cameras[camera_uuid]),
+                )
+                for camera_uuid in clip_uuids
+                if camera_uuid in cameras
+            },
+            pre_seconds=CLIP_PRE_SECONDS,
+            post_seconds=CLIP_POST_SECONDS,
+            max_bytes=entry.options.get(CONF_CLIP_MAX_SIZE, DEFAULT_CLIP_MAX_SIZE) * 1024 * 1024,
+            retention_days=entry.options.get(CONF_CLIP_RETENTION_DAYS, DEFAULT_CLIP_RETENTION_DAYS),
+        )
+        recorder.start()
+        hass.data[DOMAIN][entry.entry_id]["clips"] = recorder
+        entry.async_on_unload(hass.bus.async_listen(EVENT_DOOR_OPEN, recorder.async_handle_door_open))
+        entry.async_on_unload(
+            async_dispatcher_connect(hass, SIGNAL_CALL.format(entry.entry_id), recorder.async_handle_call)
+        )
+
+    # Сетевые запросы выше ушли в фон, здесь видно, сколько запись задержала запуск
+    _LOGGER.debug(
+        "Запись %s настроена за %.3f с (снимок из хранилища: %s)",
+        entry.title, time.monotonic() - started, "да" if cached else "нет",
+    )
+    return True
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Разгрузка конфигурационной записи."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
-    return {"error": "invalid_params", "message": "Неверные параметры запроса"}
+    if unload_ok:
+        await async_unload_call_listener(hass, entry)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        if "clips" in entry_data:
+            await entry_data["clips"].async_stop()
+        entry_data["snapshot_refresher"].async_stop()
+        entry_data["snapshots"].clear()
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Удаление сохранённых данных вместе с записью."""
+    await Store(hass, STORAGE_VERSION, storage_key(entry.entry_id)).async_remove()
+    await Store(hass, STORAGE_VERSION, history_storage_key(entry.entry_id)).async_remove()
+    await hass.async_add_executor_job(
+        partial(shutil.rmtree, clips_directory(hass, entry.entry_id), ignore_errors=True)
+    )
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Перезагрузка записи после изменения настроек."""
+    # Обновление токена тоже вызывает этот обработчик, его пропускаем
+    if hass.data[DOMAIN][entry.entry_id]["options"] == dict(entry.options):
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
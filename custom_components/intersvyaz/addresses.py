@@ -0,0 +1,114 @@
+"""Адреса (квартиры) одной записи конфигурации."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from .const import ADDRESS_KEY, CONF_ADDRESS, CONF_ADDRESSES, CONF_USER_ID, MAIN_ADDRESS
+
+DEVICE_DOMAIN = "intersvyaz_domofon"
+
+
+def entry_addresses(entry: ConfigEntry) -> list[dict[str, Any]]:
+    """Адреса записи: ключ, название, USER_ID и токен.
+
+    Записи с одним адресом (и записи по логину) хранят токен в корне
+    data и получают ключ ``main``, как до появления нескольких адресов.
+    """
+    if CONF_ADDRESSES in entry.data:
+        return [
+            {"key": str(address[CONF_USER_ID]), **address}
+            for address in entry.data[CONF_ADDRESSES]
+        ]
+    return [
+        {
+            "key": MAIN_ADDRESS,
+            CONF_ADDRESS: entry.data.get(CONF_ADDRESS) or entry.title,
+            CONF_USER_ID: entry.data.get(CONF_USER_ID),
+            "token": entry.data.get("token"),
+        }
+    ]
+
+
+def primary_address(entry: ConfigEntry) -> str:
+    """Ключ первого адреса записи: к нему относятся общие сущности."""
+    return entry_addresses(entry)[0]["key"]
+
+
+def address_credentials(entry: ConfigEntry, address: dict[str, Any]) -> dict[str, Any]:
+    """Данные для повторной авторизации по адресу: общий authId, свой USER_ID."""
+    if address["key"] == MAIN_ADDRESS:
+        return dict(entry.data)
+    return {**entry.data, CONF_USER_ID: address[CONF_USER_ID]}
+
+
+@callback
+def async_save_address_token(
+    hass: HomeAssistant, entry: ConfigEntry, key: str, token: str
+) -> None:
+    """Сохраняет обновлённый токен адреса в записи конфигурации."""
+    if key == MAIN_ADDRESS:
+        data = {**entry.data, "token": token}
+    else:
+        data = {
+            **entry.data,
+            CONF_ADDRESSES: [
+                {**address, "token": token} if str(address[CONF_USER_ID]) == key else address
+                for address in entry.data[CONF_ADDRESSES]
+            ],
+        }
+    hass.config_entries.async_update_entry(entry, data=data)
+
+
+def item_address(item: dict) -> str:
+    """Ключ адреса, к которому относится камера или реле."""
+    return item.get(ADDRESS_KEY, MAIN_ADDRESS)
+
+
+def item_client(clients: dict[str, Any], item: dict) -> Any:
+    """Клиент адреса камеры или реле.
+
+    Данные из старого снимка могут не иметь ключа адреса записи,
+    тогда используется первый адрес.
+    """
+    return clients.get(item_address(item)) or next(iter(clients.values()))
+
+
+def address_device_info(entry: ConfigEntry, key: str = MAIN_ADDRESS) -> dict:
+    """Устройство домофона по адресу.
+
+    Идентификатор включает entry_id, чтобы устройства разных записей
+    не сливались в одно.
+    """
+    if key == MAIN_ADDRESS:
+        name = "Домофон Интерсвязь"
+    else:
+        address = next(
+            (address[CONF_ADDRESS] for address in entry_addresses(entry) if address["key"] == key),
+            key,
+        )
+        name = f"Домофон {address}"
+    return {
+        "identifiers": {(DEVICE_DOMAIN, f"{entry.entry_id}_{key}")},
+        "name": name,
+        "manufacturer": "Интерсвязь",
+        "model": "Домофон IS74",
+        "sw_version": "1.0",
+    }
+
+
+@callback
+def async_remove_legacy_device(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Отвязывает запись от старого общего устройства ``main``.
+
+    Раньше все записи с одним адресом делили это устройство. Сущности
+    переходят на устройство записи, а старое удаляется реестром,
+    когда к нему не остаётся привязанных записей.
+    """
+    registry = dr.async_get(hass)
+    device = registry.async_get_device(identifiers={(DEVICE_DOMAIN, MAIN_ADDRESS)})
+    if device is not None and entry.entry_id in device.config_entries:
+        registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
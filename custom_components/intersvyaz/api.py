@@ -0,0 +1,675 @@
+"""Клиент API Интерсвязь (api.is74.ru, cams.is74.ru)."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import uuid
+from collections.abc import AsyncIterator, Mapping
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ssl import client_context
+
+from .auth import TokenManager
+from .const import (
+    ARCHIVE_PAGE_SIZE,
+    ARCHIVE_RANGES_PATH,
+    BASE_URL,
+    BASE_URL_CAM,
+    BASE_URL_STREAM,
+    CALL_EVENTS_PATH,
+    CALL_EVENTS_POLL_TIMEOUT,
+    CONF_AUTH_ID,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_USER_ID,
+    CONF_USERNAME,
+    DNS_CACHE_TTL,
+    DOOR_OPEN_ATTEMPT_TIMEOUT,
+    DOOR_OPEN_BACKOFF,
+    DOOR_OPEN_BUDGET,
+    DOOR_OPEN_CONNECT_TIMEOUT,
+    DOOR_OPEN_RETRIES,
+    HISTORY_PAGE_SIZE,
+    HISTORY_PATH,
+    KEEPALIVE_TIMEOUT,
+    MAX_CONNECTIONS_PER_HOST,
+    PROBE_TIMEOUT,
+    REQUEST_CONNECT_TIMEOUT,
+    REQUEST_TIMEOUT,
+)
+from .metrics import ApiMetrics
+from .scheduler import Priority, RequestScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IntersvyazApiError(aiohttp.ClientError):
+    """Сервер ответил ошибкой, данные не получены.
+
+    status — HTTP-статус ответа, если ошибка в статусе.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        """Инициализация."""
+        super().__init__(message)
+        self.status = status
+
+
+# Приоритет запросов в очереди планировщика; остальные — METADATA
+ENDPOINT_PRIORITY = {
+    "open": Priority.OPEN,
+    "auth": Priority.AUTH,
+    "probe": Priority.AUTH,
+    "playlist": Priority.MEDIA,
+    "segment": Priority.MEDIA,
+}
+
+# Long-poll держит соединение до минуты: он не занимает слот планировщика,
+# а его ожидаемые таймауты не считаются отказами хоста
+UNSCHEDULED_ENDPOINTS = frozenset({"events"})
+
+
+def async_create_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Создаёт сессию с keep-alive пулом соединений для API Интерсвязь.
+
+    Соединения к api.is74.ru и cams.is74.ru переиспользуются между
+    запросами, SSL-контекст общий, DNS кэшируется. Запросы без своего
+    таймаута ограничены REQUEST_TIMEOUT, а не пятью минутами aiohttp.
+    Сессию нужно закрыть при выгрузке записи.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ssl=client_context(),
+    )
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=REQUEST_CONNECT_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+class IntersvyazApiClient:
+    """Клиент API Интерсвязь поверх общей сессии."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        token: str | None = None,
+        credentials: Mapping[str, Any] | None = None,
+        base_url: str = BASE_URL,
+        base_url_cam: str = BASE_URL_CAM,
+        base_url_stream: str = BASE_URL_STREAM,
+        metrics: ApiMetrics | None = None,
+        scheduler: RequestScheduler | None = None,
+    ) -> None:
+        """Инициализация клиента.
+
+        Клиенты адресов одной записи передают общие metrics, а все
+        записи — общий планировщик запросов.
+        """
+        self._session = session
+        self.metrics = metrics or ApiMetrics()
+        self._credentials = credentials or {}
+        self.tokens = TokenManager(token, self._async_fetch_new_token)
+        self._base_url = base_url
+        self._base_url_cam = base_url_cam
+        self._base_url_stream = base_url_stream
+        self.scheduler = scheduler or RequestScheduler()
+
+    @property
+    def token(self) -> str | None:
+        """Текущий токен авторизации."""
+        return self.tokens.token
+
+    @property
+    def hosts(self) -> list[str]:
+        """Хосты API, камер и потоков."""
+        return list(
+            dict.fromkeys(
+                urlsplit(url).netloc
+                for url in (self._base_url, self._base_url_cam, self._base_url_stream)
+            )
+        )
+
+    @property
+    def api_available(self) -> bool:
+        """Доступен ли api.is74.ru."""
+        return self.scheduler.host_available(urlsplit(self._base_url).netloc)
+
+    @property
+    def cameras_available(self) -> bool:
+        """Доступны ли хосты камер и потоков."""
+        return all(
+            self.scheduler.host_available(urlsplit(url).netloc)
+            for url in (self._base_url_cam, self._base_url_stream)
+        )
+
+    async def _async_fetch_new_token(self) -> str | None:
+        """Повторная авторизация по сохранённым данным записи."""
+        credentials = self._credentials
+        if credentials.get(CONF_USERNAME) and credentials.get(CONF_PASSWORD):
+            return await self.async_get_token(
+                credentials[CONF_USERNAME], credentials[CONF_PASSWORD]
+            )
+
+        if credentials.get(CONF_AUTH_ID) and credentials.get(CONF_USER_ID):
+            result = await self.async_get_token_by_phone(
+                phone=credentials.get(CONF_PHONE, ""),
+                auth_id=credentials[CONF_AUTH_ID],
+                user_id=credentials[CONF_USER_ID],
+                skip_sms=True,
+            )
+            return result.get("token")
+
+        _LOGGER.error("Нет данных для повторной авторизации, требуется настроить интеграцию заново")
+        return None
+
+    async def _async_request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> tuple[int, Any]:
+        """Запрос с авторизацией, возвращает статус и разобранный JSON.
+
+        Одинаковые GET-запросы, идущие одновременно, выполняются один раз.
+        """
+        if method == "GET":
+            return await self.scheduler.async_dedupe(
+                (url, self.token),
+                lambda: self._async_request_once(endpoint, method, url, headers, timeout),
+            )
+        return await self._async_request_once(endpoint, method, url, headers, timeout)
+
+    async def _async_request_once(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> tuple[int, Any]:
+        """Запрос с повторами.
+
+        На 401 токен обновляется (один раз на все параллельные запросы),
+        и запрос повторяется с новым токеном. На 429 запрос повторяется
+        один раз, когда планировщик снимет паузу хоста.
+        """
+        token = self.token
+        status, data = await self._async_send(endpoint, method, url, token, headers, timeout)
+        if status == 401 and self._credentials:
+            token = await self.tokens.async_refresh(token)
+            status, data = await self._async_send(endpoint, method, url, token, headers, timeout)
+        if status == 429 and endpoint != "open":
+            status, data = await self._async_send(endpoint, method, url, token, headers, timeout)
+        return status, data
+
+    async def _async_send(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        token: str | None,
+        headers: dict[str, str] | None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> tuple[int, Any]:
+        """Отправляет запрос с указанным токеном."""
+        request_headers = {"Authorization": f"Bearer {token}", **(headers or {})}
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        with self.metrics.measure(endpoint) as sample:
+            async with self._slot(endpoint, url):
+                async with self._session.request(method, url, headers=request_headers, **kwargs) as resp:
+                    if endpoint not in UNSCHEDULED_ENDPOINTS:
+                        self._check_response(url, resp)
+                    if resp.status != 200:
+                        sample.error = True
+                        return resp.status, None
+                    if endpoint == "open":
+                        # Тело ответа на открытие не нужно и бывает пустым
+                        return resp.status, None
+                    return resp.status, await resp.json(content_type=None)
+
+    def _slot(self, endpoint: str, url: str) -> AbstractAsyncContextManager[None]:
+        """Место в очереди планировщика с приоритетом эндпоинта."""
+        if endpoint in UNSCHEDULED_ENDPOINTS:
+            return nullcontext()
+        priority = ENDPOINT_PRIORITY.get(endpoint, Priority.METADATA)
+        return self.scheduler.async_slot(urlsplit(url).netloc, priority)
+
+    def _check_response(self, url: str, resp: aiohttp.ClientResponse) -> None:
+        """Передаёт планировщику ответ хоста и просьбу подождать."""
+        host = urlsplit(url).netloc
+        if resp.status == 429 or (resp.status == 503 and "Retry-After" in resp.headers):
+            # Сервер жив и просит паузу — это не отказ
+            self.scheduler.retry_after(host, resp.headers.get("Retry-After"))
+            self.scheduler.record_response(host, 200)
+        else:
+            self.scheduler.record_response(host, resp.status)
+
+    @asynccontextmanager
+    async def _async_post(self, endpoint: str, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """POST-запрос без авторизации с замером задержки."""
+        with self.metrics.measure(endpoint) as sample:
+            async with self._slot(endpoint, url):
+                async with self._session.post(url, **kwargs) as resp:
+                    self._check_response(url, resp)
+                    sample.error = resp.status != 200
+                    yield resp
+
+    async def _get_json(self, endpoint: str, url: str) -> Any:
+        """GET-запрос с авторизацией, возвращает разобранный JSON.
+
+        Ответ не 200 — IntersvyazApiError: пустой результат при сбое
+        сервера нельзя отличить от настоящего пустого списка.
+        """
+        status, data = await self._async_request(endpoint, "GET", url)
+        if status != 200:
+            raise IntersvyazApiError(f"Ошибка запроса {endpoint}: HTTP {status}", status)
+        return data
+
+    async def async_fetch_text(self, url: str) -> str | None:
+        """GET-запрос без заголовка авторизации (токен уже в URL)."""
+        with self.metrics.measure("playlist") as sample:
+            async with self._slot("playlist", url):
+                async with self._session.get(url) as resp:
+                    self._check_response(url, resp)
+                    if resp.status != 200:
+                        sample.error = True
+                        return None
+                    return await resp.text()
+
+    async def async_fetch_bytes(self, url: str) -> bytes | None:
+        """Загружает сегмент потока (токен уже в URL)."""
+        with self.metrics.measure("segment") as sample:
+            async with self._slot("segment", url):
+                async with self._session.get(url) as resp:
+                    self._check_response(url, resp)
+                    if resp.status != 200:
+                        sample.error = True
+                        return None
+                    return await resp.read()
+
+    async def async_probe(self) -> None:
+        """Проверяет недоступные хосты, у которых истекла пауза.
+
+        Проба — HEAD к корню хоста: любой ответ значит, что хост на связи.
+        """
+        for base_url in (self._base_url, self._base_url_cam, self._base_url_stream):
+            if not self.scheduler.probe_due(urlsplit(base_url).netloc):
+                continue
+            try:
+                async with self._slot("probe", base_url):
+                    async with self._session.head(
+                        f"{base_url}/", timeout=aiohttp.ClientTimeout(total=PROBE_TIMEOUT)
+                    ) as resp:
+                        self._check_response(base_url, resp)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Проба %s не прошла: %s", base_url, err)
+
+    def stream_url(self, camera_uuid: str) -> str:
+        """URL HLS-потока камеры с текущим токеном."""
+        return (
+            f"{self._base_url_stream}/hls/playlists/multivariant.m3u8"
+            f"?uuid={camera_uuid}&realtime=1&token=bearer-{self.token}"
+        )
+
+    def archive_url(self, camera_uuid: str, start: int) -> str:
+        """URL архивного HLS-потока камеры с момента start (unix-время)."""
+        return (
+            f"{self._base_url_stream}/hls/playlists/multivariant.m3u8"
+            f"?uuid={camera_uuid}&start={start}&token=bearer-{self.token}"
+        )
+
+    async def async_get_token(self, username: str, password: str) -> str | None:
+        """Получение токена авторизации.
+
+        None — сервер отверг логин или пароль. Сетевые ошибки и сбои
+        сервера пробрасываются: недоступность облака не должна
+        требовать повторной настройки интеграции.
+        """
+        url = f"{self._base_url}/auth/mobile"
+        payload = {"username": username, "password": password}
+        headers = {"Content-Type": "application/json"}
+
+        _LOGGER.debug("Отправка запроса авторизации для пользователя: %s", username)
+        async with self._async_post("auth", url, json=payload, headers=headers) as resp:
+            _LOGGER.debug("Ответ сервера: HTTP %s", resp.status)
+            _raise_for_server_error(resp)
+            if resp.status != 200:
+                _LOGGER.error("Ошибка авторизации. Статус: %s", resp.status)
+                return None
+            return _token_from_response(await _async_json(resp))
+
+    async def async_get_relays(self) -> list[dict]:
+        """Получение списка реле."""
+        data = await self._get_json("relays", f"{self._base_url}/domofon/relays")
+        _LOGGER.debug("Ответ API на relays: %s", data)
+
+        if not isinstance(data, list):
+            raise IntersvyazApiError("API не вернул список реле")
+        if not data:
+            _LOGGER.warning("У адреса нет реле")
+        return data
+
+    async def async_get_relay_id(self) -> str | None:
+        """Получение ID реле."""
+        relays = await self.async_get_relays()
+        if relays:
+            return relays[0].get("RELAY_ID")
+        return None
+
+    async def async_get_groups(self) -> list[dict]:
+        """Получение групп камер 'Умный двор' и 'Свои камеры'.
+
+        Оба запроса идут параллельно. Возвращаются все подходящие группы:
+        сначала все 'Умный двор', затем 'Свои камеры'. Если один из
+        запросов не удался, используются группы другого; ошибка — только
+        когда не удались оба.
+        """
+        results = await asyncio.gather(
+            self._get_json("get-group", f"{self._base_url_cam}/api/get-group/"),
+            self._get_json("get-group", f"{self._base_url_cam}/api/get-group/?selfCams=true"),
+            return_exceptions=True,
+        )
+        _LOGGER.debug("Ответ API на group (основной URL): %s", results[0])
+        _LOGGER.debug("Ответ API на group (с ?selfCams=true): %s", results[1])
+
+        errors: list[BaseException] = []
+        for result in results:
+            if isinstance(result, (aiohttp.ClientError, asyncio.TimeoutError)):
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                # Отказ в авторизации и отмена не маскируются второй половиной
+                raise result
+            elif not isinstance(result, list):
+                errors.append(IntersvyazApiError("API не вернул список групп камер"))
+        if len(errors) == len(results):
+            raise errors[0]
+        if errors:
+            _LOGGER.warning("Часть групп камер не получена: %s", errors[0])
+        yard_data, self_data = (result if isinstance(result, list) else [] for result in results)
+
+        groups = [
+            group for group in yard_data
+            if group.get("NAME", "").startswith("Умный двор")
+        ]
+        groups.extend(
+            group for group in self_data
+            if group.get("NAME", "") == "Свои камеры"
+        )
+
+        if not groups:
+            _LOGGER.error("Не найдены ни группа 'Умный двор', ни 'Свои камеры'!")
+        return groups
+
+    async def async_get_cameras(self, group_id: str) -> list[dict]:
+        """Получает информацию о камерах группы."""
+        data = await self._get_json("get-group", f"{self._base_url_cam}/api/get-group/{group_id}")
+        if not isinstance(data, list):
+            raise IntersvyazApiError(f"API не вернул камеры группы {group_id}")
+        return data
+
+    async def async_poll_call_events(self, cursor: str | None) -> tuple[int, list[dict] | None]:
+        """Long-poll запрос новых событий вызова после cursor.
+
+        Сервер держит запрос открытым, пока не появится событие
+        или не истечёт время ожидания. Событием считается только объект
+        с ID: служебные ответы вроде {"status": "timeout"} отбрасываются.
+        """
+        url = f"{self._base_url}{CALL_EVENTS_PATH}?timeout={CALL_EVENTS_POLL_TIMEOUT}"
+        if cursor:
+            url += f"&lastId={cursor}"
+        timeout = aiohttp.ClientTimeout(total=CALL_EVENTS_POLL_TIMEOUT + 15)
+        status, data = await self._async_request("events", "GET", url, timeout=timeout)
+        if status != 200:
+            return status, None
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            return status, []
+        return status, [
+            event for event in data if isinstance(event, dict) and event.get("ID") is not None
+        ]
+
+    async def async_get_history(self, cursor: str | None) -> list[dict]:
+        """Записи журнала вызовов и открытий после cursor, от старых к новым.
+
+        Без курсора возвращается последняя страница журнала. Ответ
+        не 200 или не список — IntersvyazApiError, а не «новых записей нет».
+        """
+        url = f"{self._base_url}{HISTORY_PATH}?limit={HISTORY_PAGE_SIZE}"
+        if cursor:
+            url += f"&afterId={cursor}"
+        data = await self._get_json("history", url)
+        if not isinstance(data, list):
+            raise IntersvyazApiError("API не вернул журнал")
+        # Числовые ID сравниваются по длине и затем посимвольно
+        return sorted(data, key=lambda record: (len(str(record.get("ID", ""))), str(record.get("ID", ""))))
+
+    async def async_get_archive_ranges(
+        self, camera_uuid: str, start: int, end: int, page: int
+    ) -> list[dict] | None:
+        """Страница интервалов архива камеры между start и end (unix-время).
+
+        None — запрос не удался, пустой список — записей нет.
+        """
+        url = (
+            f"{self._base_url_cam}{ARCHIVE_RANGES_PATH.format(uuid=camera_uuid)}"
+            f"?from={start}&to={end}&page={page}&limit={ARCHIVE_PAGE_SIZE}"
+        )
+        status, data = await self._async_request("archive", "GET", url)
+        if status != 200:
+            return None
+        return data if isinstance(data, list) else []
+
+    async def async_open_door(self, relay_id: str) -> int:
+        """Открытие домофона. Возвращает HTTP-статус ответа.
+
+        У каждой попытки жёсткий таймаут. Сетевые ошибки и ответы 5xx
+        повторяются ограниченное число раз со случайной задержкой;
+        если все попытки исчерпаны, исключение пробрасывается наверх.
+        Все попытки вместе с ожиданием в очереди укладываются
+        в DOOR_OPEN_BUDGET, иначе — asyncio.TimeoutError.
+        """
+        async with asyncio.timeout(DOOR_OPEN_BUDGET):
+            status = await self._async_open_door_attempts(relay_id)
+
+        if status == 200:
+            _LOGGER.info("Дверь успешно открыта")
+        else:
+            _LOGGER.error("Ошибка открытия двери")
+        return status
+
+    async def _async_open_door_attempts(self, relay_id: str) -> int:
+        """Попытки открытия двери с повторами."""
+        url = f"{self._base_url}/domofon/relays/{relay_id}/open?from=app"
+        headers = {"Content-Type": "application/json"}
+        timeout = aiohttp.ClientTimeout(
+            total=DOOR_OPEN_ATTEMPT_TIMEOUT, connect=DOOR_OPEN_CONNECT_TIMEOUT
+        )
+
+        for attempt in range(DOOR_OPEN_RETRIES + 1):
+            last_attempt = attempt == DOOR_OPEN_RETRIES
+            try:
+                status, _ = await self._async_request("open", "POST", url, headers, timeout)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+                if last_attempt:
+                    raise
+                _LOGGER.debug("Попытка открытия двери %s не удалась: %s", attempt + 1, err)
+            else:
+                if (status < 500 and status != 429) or last_attempt:
+                    break
+                _LOGGER.debug("Попытка открытия двери %s: HTTP %s", attempt + 1, status)
+
+            # Задержка с джиттером, чтобы повторы не шли синхронно
+            await asyncio.sleep(DOOR_OPEN_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+        return status
+
+    async def async_get_token_by_phone(
+        self,
+        phone: str,
+        code: Optional[str] = None,
+        device_id: Optional[str] = None,
+        auth_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        skip_sms: bool = False
+    ) -> dict:
+        """Авторизация по номеру телефона."""
+        clean_phone = phone.replace("+7", "")
+
+        if auth_id and user_id and skip_sms:
+            # Получение токена для выбранного адреса
+            url = f"{self._base_url}/mobile/auth/get-token"
+            headers = {"Content-Type": "application/json"}
+            payload = {
+                "authId": str(auth_id).strip(),
+                "userId": str(user_id).strip()
+            }
+
+            _LOGGER.debug("Отправка запроса на получение токена: %s", payload)
+
+            # Как и в async_get_token, ошибкой авторизации считается
+            # только отказ сервера, сбои связи пробрасываются
+            async with self._async_post("auth", url, json=payload, headers=headers) as resp:
+                _LOGGER.debug("Ответ сервера при получении токена: HTTP %s", resp.status)
+                _raise_for_server_error(resp)
+                if resp.status != 200:
+                    _LOGGER.error(
+                        "Ошибка получения токена. Статус: %s, Ответ: %s", resp.status, await resp.text()
+                    )
+                    return {"error": "token_error"}
+                return {"token": _token_from_response(await _async_json(resp))}
+
+        if not code:
+            # Первый шаг - отправка СМС
+            device_id = str(uuid.uuid4()).replace("-", "")
+            url = f"{self._base_url}/mobile/auth/send-sms"
+            payload = {
+                "phone": clean_phone,
+                "uniqueDeviceId": device_id
+            }
+
+            _LOGGER.debug("Отправка запроса на SMS: %s", payload)
+            async with self._async_post("auth", url, json=payload) as resp:
+                response_text = await resp.text()
+                _LOGGER.debug("Ответ сервера: %s", response_text)
+
+                try:
+                    data = await resp.json()
+                    if resp.status != 200:
+                        error_message = data.get("message", "") if isinstance(data, dict) else str(data)
+                        return {"error": "sms_error", "message": error_message}
+
+                    return {"device_id": device_id}
+                except Exception as e:
+                    _LOGGER.error("Ошибка разбора ответа: %s", e)
+                    return {"error": "parse_error"}
+
+        elif code and device_id and not auth_id:
+            # Второй шаг - подтверждение кода
+            url = f"{self._base_url}/mobile/auth/confirm"
+            payload = {
+                "confirmCode": code,
+                "phone": clean_phone,
+                "uniqueDeviceId": device_id
+            }
+
+            _LOGGER.debug("Отправка запроса подтверждения: %s", payload)
+            async with self._async_post("auth", url, json=payload) as resp:
+                response_text = await resp.text()
+                _LOGGER.debug("Ответ сервера при подтверждении: %s", response_text)
+
+                try:
+                    data = await resp.json()
+                    if "authId" in data and "addresses" in data:
+                        return {
+                            "auth_id": data["authId"],
+                            "addresses": data["addresses"]
+                        }
+                    return {"error": "wrong_code"}
+                except Exception as e:
+                    _LOGGER.error("Ошибка разбора ответа: %s", e)
+                    return {"error": "parse_error"}
+
+        elif auth_id and user_id:
+            # Третий шаг - получение токена для выбранного адреса
+            url = f"{self._base_url}/mobile/auth/get-token"
+            headers = {"Content-Type": "application/json"}
+            payload = {
+                "authId": str(auth_id).strip(),
+                "userId": str(user_id).strip()
+            }
+
+            _LOGGER.debug("Отправка запроса на получение токена:")
+            _LOGGER.debug("URL: %s", url)
+            _LOGGER.debug("Headers: %s", headers)
+            _LOGGER.debug("Payload: %s", payload)
+
+            try:
+                async with self._async_post("auth", url, json=payload, headers=headers) as resp:
+                    response_text = await resp.text()
+                    _LOGGER.debug("Статус ответа: %s", resp.status)
+
+                    if resp.status != 200:
+                        _LOGGER.error("Ошибка HTTP: %s", resp.status)
+                        return {"error": "http_error", "message": f"HTTP {resp.status}"}
+
+                    try:
+                        data = await resp.json()
+
+                        if isinstance(data, dict):
+                            if "TOKEN" in data:
+                                _LOGGER.debug("Успешно получен токен")
+                                return {"token": data["TOKEN"]}
+                            elif "token" in data:
+                                _LOGGER.debug("Успешно получен токен (lower case)")
+                                return {"token": data["token"]}
+                            else:
+                                _LOGGER.error("Токен отсутствует в ответе: %s", data)
+                                return {"error": "no_token", "message": "Токен отсутствует в ответе"}
+                        else:
+                            _LOGGER.error("Неожиданный формат ответа: %s", data)
+                            return {"error": "invalid_response", "message": "Неверный формат ответа"}
+
+                    except ValueError as e:
+                        _LOGGER.error("Ошибка разбора JSON: %s", e)
+                        return {"error": "parse_error", "message": str(e)}
+
+            except aiohttp.ClientError as e:
+                _LOGGER.error("Ошибка сети: %s", e)
+                return {"error": "network_error", "message": str(e)}
+            except Exception as e:
+                _LOGGER.error("Неожиданная ошибка: %s", e)
+                return {"error": "unknown_error", "message": str(e)}
+
+        return {"error": "invalid_params", "message": "Неверные параметры запроса"}
+
+
+def _raise_for_server_error(resp: aiohttp.ClientResponse) -> None:
+    """Ответы 5xx и 429 — сбой сервера, а не отказ в авторизации."""
+    if resp.status >= 500 or resp.status == 429:
+        raise IntersvyazApiError(f"Сервер авторизации ответил HTTP {resp.status}")
+
+
+async def _async_json(resp: aiohttp.ClientResponse) -> Any:
+    """JSON ответа; неразборчивый ответ — сбой сервера."""
+    try:
+        return await resp.json(content_type=None)
+    except ValueError as err:
+        raise IntersvyazApiError(f"Ошибка разбора JSON ответа: {err}") from err
+
+
+def _token_from_response(data: Any) -> str:
+    """Токен из ответа 200 на запрос авторизации."""
+    if isinstance(data, dict):
+        token = data.get("TOKEN") or data.get("token")
+        if token:
+            return token
+    raise IntersvyazApiError("Токен отсутствует в ответе")
@@ -0,0 +1,123 @@
+"""Архив камер Интерсвязь: интервалы записей по дням.
+
+Интервалы запрашиваются только для дня, который открыл пользователь,
+постранично, и кэшируются по камере и дню. Прошедшие дни не меняются
+и хранятся до вытеснения, текущий день обновляется через
+ARCHIVE_TODAY_TTL секунд.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import aiohttp
+from homeassistant.util import dt as dt_util
+
+from .api import IntersvyazApiClient
+from .const import ARCHIVE_CACHE_SIZE, ARCHIVE_MAX_PAGES, ARCHIVE_PAGE_SIZE, ARCHIVE_TODAY_TTL
+from .history import parse_time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Возможные имена полей начала и конца интервала в ответе API
+RANGE_START_KEYS = ("FROM", "START", "from", "start")
+RANGE_END_KEYS = ("TO", "END", "to", "end")
+
+Range = tuple[datetime, datetime]
+
+
+def day_bounds(day: date) -> Range:
+    """Начало и конец дня в часовом поясе Home Assistant."""
+    start = dt_util.start_of_local_day(day)
+    return start, dt_util.start_of_local_day(day + timedelta(days=1))
+
+
+def parse_ranges(items: list[dict], start: datetime, end: datetime) -> list[Range]:
+    """Интервалы записей в пределах [start, end), отсортированные и обрезанные."""
+    ranges = []
+    for item in items:
+        range_start = parse_time(next((item[key] for key in RANGE_START_KEYS if key in item), None))
+        range_end = parse_time(next((item[key] for key in RANGE_END_KEYS if key in item), None))
+        if range_start is None or range_end is None:
+            continue
+        range_start, range_end = max(range_start, start), min(range_end, end)
+        if range_start < range_end:
+            ranges.append((range_start, range_end))
+    return sorted(ranges)
+
+
+def hours_with_records(ranges: list[Range], day: date) -> dict[int, datetime]:
+    """Часы дня с записями и начало первой записи в каждом часе."""
+    hours: dict[int, datetime] = {}
+    for range_start, range_end in ranges:
+        hour_start = dt_util.as_local(range_start).replace(minute=0, second=0, microsecond=0)
+        while hour_start < range_end:
+            if hour_start.date() == day:
+                hours.setdefault(hour_start.hour, max(range_start, hour_start))
+            hour_start += timedelta(hours=1)
+    return dict(sorted(hours.items()))
+
+
+class ArchiveTimeline:
+    """Интервалы записей камер по дням с ленивой загрузкой.
+
+    Параллельные запросы одного дня одной камеры объединяются.
+    """
+
+    def __init__(self, max_days: int = ARCHIVE_CACHE_SIZE) -> None:
+        """Инициализация кэша на max_days пар «камера, день»."""
+        self._max_days = max_days
+        # Значение: время загрузки, закончился ли день к загрузке, интервалы
+        self._days: OrderedDict[tuple[str, date], tuple[float, bool, list[Range]]] = OrderedDict()
+        self._pending: dict[tuple[str, date], asyncio.Task[list[Range] | None]] = {}
+
+    async def async_day(
+        self, client: IntersvyazApiClient, camera_uuid: str, day: date
+    ) -> list[Range]:
+        """Интервалы записей камеры за день."""
+        key = (camera_uuid, day)
+        cached = self._days.get(key)
+        if cached is not None and (cached[1] or time.monotonic() - cached[0] < ARCHIVE_TODAY_TTL):
+            self._days.move_to_end(key)
+            return cached[2]
+
+        complete = day_bounds(day)[1] <= dt_util.now()
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._async_fetch_day(client, camera_uuid, day))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        ranges = await asyncio.shield(task)
+        if ranges is None:
+            # Лучше устаревший список, чем пустой
+            return cached[2] if cached is not None else []
+
+        self._days[key] = (time.monotonic(), complete, ranges)
+        self._days.move_to_end(key)
+        while len(self._days) > self._max_days:
+            self._days.popitem(last=False)
+        return ranges
+
+    async def _async_fetch_day(
+        self, client: IntersvyazApiClient, camera_uuid: str, day: date
+    ) -> list[Range] | None:
+        """Загружает интервалы дня постранично."""
+        start, end = day_bounds(day)
+        items: list[dict] = []
+        try:
+            for page in range(1, ARCHIVE_MAX_PAGES + 1):
+                page_items = await client.async_get_archive_ranges(
+                    camera_uuid, int(start.timestamp()), int(end.timestamp()), page
+                )
+                if page_items is None:
+                    return None
+                items.extend(page_items)
+                if len(page_items) < ARCHIVE_PAGE_SIZE:
+                    break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Архив камеры %s за %s недоступен: %s", camera_uuid, day, err)
+            return None
+        return parse_ranges(items, start, end)
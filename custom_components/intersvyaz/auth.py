@@ -0,0 +1,71 @@
+"""Управление токеном авторизации Интерсвязь."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import CALLBACK_TYPE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IntersvyazAuthError(Exception):
+    """Сервер отверг сохранённые данные авторизации."""
+
+
+class TokenManager:
+    """Хранит токен и обновляет его после ответа 401.
+
+    Параллельные запросы, получившие 401 на одном и том же токене,
+    ждут одно повторное получение токена за общей блокировкой.
+    """
+
+    def __init__(
+        self,
+        token: str | None,
+        fetch_token: Callable[[], Awaitable[str | None]],
+    ) -> None:
+        """Инициализация менеджера.
+
+        fetch_token возвращает None, если сервер отверг данные авторизации.
+        """
+        self._token = token
+        self._fetch_token = fetch_token
+        self._lock = asyncio.Lock()
+        self._listeners: list[Callable[[str], None]] = []
+
+    @property
+    def token(self) -> str | None:
+        """Текущий токен."""
+        return self._token
+
+    def async_add_listener(self, listener: Callable[[str], None]) -> CALLBACK_TYPE:
+        """Подписка на смену токена."""
+        self._listeners.append(listener)
+
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    async def async_refresh(self, failed_token: str | None) -> str:
+        """Получает новый токен взамен отвергнутого failed_token.
+
+        IntersvyazAuthError — только если сервер отверг данные записи;
+        ошибки связи и сбои сервера пробрасываются как есть.
+        """
+        async with self._lock:
+            if self._token != failed_token:
+                # Токен уже обновил другой запрос, пока мы ждали блокировку
+                return self._token
+
+            _LOGGER.info("Токен отклонён сервером, выполняем повторную авторизацию")
+            token = await self._fetch_token()
+            if not token:
+                raise IntersvyazAuthError("Не удалось повторно авторизоваться")
+
+            self._token = token
+            for listener in list(self._listeners):
+                listener(token)
+            return token
@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .addresses import address_device_info, item_address, primary_address
+from .api import IntersvyazApiClient
+from .const import (
+    CONF_MOTION_CAMERAS,
+    CONF_MOTION_INTERVAL,
+    DEFAULT_MOTION_INTERVAL,
+    DOMAIN,
+    VARIANT_CACHE_TTL,
+)
+from .coordinator import IntersvyazDataUpdateCoordinator
+from .hls import VariantCache
+from .motion import MotionAnalyzer, MotionDetector, numpy_available
+
+_LOGGER = logging.getLogger(__name__)
+
+# Состояние движения и связи приходит сразу; раз в минуту обновляются
+# замеры нагрузки и проверяются недоступные хосты
+SCAN_INTERVAL = timedelta(seconds=60)
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Настройка датчика связи и датчиков движения выбранных камер."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    entities: list[BinarySensorEntity] = [ConnectivitySensor(entry, entry_data["client"])]
+    entities.extend(await _async_motion_sensors(hass, entry))
+    async_add_entities(entities)
+
+async def _async_motion_sensors(hass: HomeAssistant, entry: ConfigEntry) -> list[BinarySensorEntity]:
+    """Датчики движения камер, выбранных в настройках."""
+    motion_uuids = set(entry.options.get(CONF_MOTION_CAMERAS, []))
+    if not motion_uuids:
+        return []
+    if not await hass.async_add_executor_job(numpy_available):
+        _LOGGER.error("Для обнаружения движения нужен пакет numpy, датчики не созданы")
+        return []
+
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator: IntersvyazDataUpdateCoordinator = entry_data["coordinator"]
+    clients = entry_data["clients"]
+    # Для сравнения кадров хватает самого лёгкого варианта потока
+    variants = VariantCache(hass, coordinator.camera_client, VARIANT_CACHE_TTL, lowest=True)
+    for client in clients.values():
+        entry.async_on_unload(client.tokens.async_add_listener(lambda token: variants.clear()))
+    analyzer = MotionAnalyzer(hass)
+    interval = entry.options.get(CONF_MOTION_INTERVAL, DEFAULT_MOTION_INTERVAL)
+
+    return [
+        MotionBinarySensor(
+            address_device_info(entry, item_address(camera_info)),
+            camera_info,
+            MotionDetector(
+                hass,
+                coordinator.camera_client(camera_info["UUID"]),
+                variants,
+                analyzer,
+                camera_info["UUID"],
+                interval,
+            ),
+        )
+        for camera_info in coordinator.data.cameras
+        if camera_info.get("UUID") in motion_uuids
+    ]
+
+class ConnectivitySensor(BinarySensorEntity):
+    """Связь с облаком Интерсвязь по состоянию хостов в планировщике.
+
+    Пока хост недоступен, датчик раз в SCAN_INTERVAL проверяет его
+    дешёвым запросом, не дожидаясь обычных обновлений.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, entry: ConfigEntry, client: IntersvyazApiClient) -> None:
+        """Инициализация датчика (хосты у всех адресов записи общие)."""
+        self._client = client
+        self._attr_name = "Связь с облаком"
+        self._attr_unique_id = f"{entry.entry_id}_connectivity"
+
+        # Добавляем информацию об устройстве
+        self._attr_device_info = address_device_info(entry, primary_address(entry))
+
+    async def async_added_to_hass(self) -> None:
+        """Подписка на смену доступности хостов."""
+        self.async_on_remove(self._client.scheduler.async_add_listener(self._handle_connectivity))
+
+    @callback
+    def _handle_connectivity(self, host: str) -> None:
+        """Смена доступности хоста."""
+        if host in self._client.hosts:
+            self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Проба недоступных хостов."""
+        await self._client.async_probe()
+
+    @property
+    def is_on(self) -> bool:
+        """Все хосты на связи."""
+        return all(self._client.scheduler.host_available(host) for host in self._client.hosts)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Состояние связи с каждым хостом."""
+        return {host: self._client.scheduler.host_state(host) for host in self._client.hosts}
+
+class MotionBinarySensor(BinarySensorEntity):
+    """Движение в кадре камеры по локальному сравнению кадров."""
+
+    _attr_device_class = BinarySensorDeviceClass.MOTION
+    # Замеры меняются каждую минуту, в историю их не пишем
+    _unrecorded_attributes = frozenset(
+        {"changed_area", "samples", "skipped", "decode_cpu_ms", "analysis_cpu_ms", "cpu_load"}
+    )
+
+    def __init__(self, device_info: dict, camera_info: dict, detector: MotionDetector) -> None:
+        """Инициализация датчика."""
+        self._detector = detector
+        self._attr_name = f"Движение {camera_info.get('NAME', camera_info['UUID'])}"
+        self._attr_unique_id = f"is74_camera_{camera_info['UUID']}_motion"
+
+        # Датчик относится к устройству адреса камеры
+        self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Запуск детектора: выключенный датчик не тратит процессор."""
+        self.async_on_remove(self._detector.async_add_listener(self._handle_motion))
+        self._detector.start()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Остановка детектора."""
+        await self._detector.async_stop()
+
+    @callback
+    def _handle_motion(self) -> None:
+        """Смена состояния движения."""
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool:
+        """Есть ли движение."""
+        return self._detector.motion
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Замеры: доля изменившихся пикселей и процессорное время на камеру."""
+        stats = self._detector.stats
+        samples = max(stats.samples, 1)
+        cpu_load = stats.cpu_load
+        return {
+            "changed_area": None if stats.changed_area is None else round(stats.changed_area, 3),
+            "samples": stats.samples,
+            "skipped": stats.skipped,
+            "decode_cpu_ms": round(stats.decode_cpu / samples * 1000, 1),
+            "analysis_cpu_ms": round(stats.analysis_cpu / samples * 1000, 2),
+            "cpu_load": None if cpu_load is None else round(cpu_load, 2),
+        }
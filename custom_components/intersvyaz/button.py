@@ -1,55 +1,127 @@
 import logging
-import aiohttp
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN, open_door, get_token, get_relay_id
+from .addresses import address_device_info, item_address, item_client
+from .api import IntersvyazApiClient
+from .const import DOMAIN
+from .coordinator import IntersvyazDataUpdateCoordinator
+from .door import async_open_door
 
 _LOGGER = logging.getLogger(__name__)
 
+# Уникальный ID единственной кнопки в старых версиях
+LEGACY_UNIQUE_ID = "domofon_button"
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
-    """Настройка кнопки в Home Assistant."""
-    session = async_get_clientsession(hass)
-    
-    # Получаем токен из сохраненных данных конфигурации
-    token = entry.data.get("token")
-    if not token:
-        _LOGGER.error("Токен не найден в конфигурации")
+    """Настройка кнопок в Home Assistant."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    clients: dict[str, IntersvyazApiClient] = entry_data["clients"]
+    coordinator: IntersvyazDataUpdateCoordinator = entry_data["coordinator"]
+
+    relays = coordinator.data.relays
+    if relays and relays[0].get("RELAY_ID") is not None:
+        _async_migrate_legacy_button(hass, entry, relays[0]["RELAY_ID"])
+
+    known_relay_ids: set[str] = set()
+
+    @callback
+    def _async_add_new_buttons() -> None:
+        """Создаёт кнопки для реле, которых ещё нет."""
+        single = len(coordinator.data.relays) == 1
+        buttons = [
+            DomofonButton(hass, entry, item_client(clients, relay), coordinator, relay, single)
+            for relay in coordinator.data.relays
+            if relay.get("RELAY_ID") is not None
+            and str(relay["RELAY_ID"]) not in known_relay_ids
+        ]
+        if buttons:
+            known_relay_ids.update(button.relay_id for button in buttons)
+            async_add_entities(buttons)
+
+    # Кнопка на каждое реле из одного ответа /domofon/relays
+    _async_add_new_buttons()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_buttons))
+
+@callback
+def _async_migrate_legacy_button(hass: HomeAssistant, entry: ConfigEntry, relay_id) -> None:
+    """Переносит старую кнопку на уникальный ID первого реле."""
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id("button", DOMAIN, LEGACY_UNIQUE_ID)
+    if entity_id is None:
         return
-    
-    # Создаем кнопку с сохраненными данными
-    async_add_entities([DomofonButton(hass, token)])
 
-class DomofonButton(ButtonEntity):
-    """Кнопка открытия домофона."""
+    new_unique_id = relay_unique_id(entry, relay_id)
+    if registry.async_get_entity_id("button", DOMAIN, new_unique_id) is None:
+        registry.async_update_entity(
+            entity_id, new_unique_id=new_unique_id, config_entry_id=entry.entry_id
+        )
+
+def relay_unique_id(entry: ConfigEntry, relay_id) -> str:
+    """Стабильный уникальный ID кнопки реле."""
+    return f"{entry.entry_id}_relay_{relay_id}"
 
-    def __init__(self, hass: HomeAssistant, token: str):
+class DomofonButton(CoordinatorEntity[IntersvyazDataUpdateCoordinator], ButtonEntity):
+    """Кнопка открытия домофона для одного реле."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: IntersvyazApiClient,
+        coordinator: IntersvyazDataUpdateCoordinator,
+        relay: dict,
+        single: bool = True,
+    ):
         """Инициализация кнопки."""
+        super().__init__(coordinator)
         self._hass = hass
-        self._token = token
-        self._attr_name = "Открыть домофон"
-        self._attr_unique_id = "domofon_button"
+        self._entry = entry
+        self._client = client
+        self._relay_id = str(relay["RELAY_ID"])
+        if single:
+            self._attr_name = "Открыть домофон"
+        else:
+            relay_name = relay.get("NAME") or relay.get("ADDRESS") or self._relay_id
+            self._attr_name = f"Открыть домофон {relay_name}"
+        self._attr_unique_id = relay_unique_id(entry, self._relay_id)
         
-        # Добавляем информацию об устройстве
-        self._attr_device_info = {
-            "identifiers": {("intersvyaz_domofon", "main")},
-            "name": "Домофон Интерсвязь",
-            "manufacturer": "Интерсвязь",
-            "model": "Домофон IS74",
-            "sw_version": "1.0",
-        }
+        # Кнопка относится к устройству своего адреса
+        self._attr_device_info = address_device_info(entry, item_address(relay))
+
+    @property
+    def relay_id(self) -> str:
+        """ID реле кнопки."""
+        return self._relay_id
+
+    async def async_added_to_hass(self) -> None:
+        """Подписка на смену доступности облака."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._client.scheduler.async_add_listener(self._handle_connectivity))
+
+    @callback
+    def _handle_connectivity(self, host: str) -> None:
+        """Смена доступности облака."""
+        self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        """Кнопка недоступна без связи с API или если реле пропало из ответа.
+
+        Список реле берётся из последнего снимка координатора,
+        даже если его обновление не удалось.
+        """
+        return self._client.api_available and any(
+            str(relay.get("RELAY_ID")) == self._relay_id
+            for relay in self.coordinator.data.relays
+        )
 
     async def async_press(self):
         """Обработчик нажатия кнопки."""
-        session = async_get_clientsession(self._hass)
-        
-        # Получаем ID реле при каждом нажатии
-        relay_id = await get_relay_id(session, self._token)
-        if not relay_id:
-            _LOGGER.error("Не удалось получить ID реле")
-            return
-            
-        await open_door(session, self._token, relay_id)
+        # ID реле известен заранее, в API идёт только запрос открытия
+        await async_open_door(
+            self._hass, self._entry.entry_id, self._client, self.coordinator, self._relay_id
+        )
@@ -0,0 +1,146 @@
+"""Получение событий вызова домофона через long-poll."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+
+import aiohttp
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .addresses import entry_addresses
+from .api import IntersvyazApiClient
+from .auth import IntersvyazAuthError
+from .const import (
+    ADDRESS_KEY,
+    CALL_EVENTS_BACKOFF_MAX,
+    CALL_EVENTS_BACKOFF_MIN,
+    CALL_EVENTS_MIN_INTERVAL,
+    CONF_PHONE,
+    CONF_USER_ID,
+    CONF_USERNAME,
+    DATA_CALL_LISTENERS,
+    EVENT_CALL,
+    SIGNAL_CALL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def account_key(entry: ConfigEntry) -> str:
+    """Ключ учётной записи: логин или телефон."""
+    return entry.data.get(CONF_USERNAME) or entry.data.get(CONF_PHONE) or entry.entry_id
+
+
+def listener_key(entry: ConfigEntry, address: dict) -> str:
+    """Ключ соединения: аккаунт и квартира (USER_ID) адреса.
+
+    Токен адреса видит вызовы только своей квартиры, поэтому соединение
+    общее лишь у записей с одним и тем же адресом одного аккаунта.
+    """
+    return f"{account_key(entry)}_{address.get(CONF_USER_ID) or address['key']}"
+
+
+class CallListener:
+    """Одно long-poll соединение на адрес аккаунта с переподключением.
+
+    Каждое полученное событие публикуется в шину Home Assistant
+    и отправляется сущностям записей с этим адресом, вместе с ключом
+    адреса в записи.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Инициализация."""
+        self._hass = hass
+        # entry_id -> ключ адреса в записи и клиент этого адреса
+        self._clients: dict[str, tuple[str, IntersvyazApiClient]] = {}
+        self._task: asyncio.Task | None = None
+        self._cursor: str | None = None
+
+    def add_entry(self, entry: ConfigEntry, address_key: str, client: IntersvyazApiClient) -> None:
+        """Подключает адрес записи и запускает опрос, если он ещё не идёт."""
+        self._clients[entry.entry_id] = (address_key, client)
+        if self._task is None or self._task.done():
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), "intersvyaz_call_listener"
+            )
+
+    async def async_remove_entry(self, entry_id: str) -> bool:
+        """Отключает запись. Возвращает True, если записей больше нет."""
+        if self._clients.pop(entry_id, None) is None:
+            return not self._clients
+        if self._clients:
+            return False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        return True
+
+    async def _async_run(self) -> None:
+        """Цикл опроса с экспоненциальной задержкой после ошибок.
+
+        Между запросами проходит не меньше CALL_EVENTS_MIN_INTERVAL:
+        если сервер отвечает сразу, а не держит соединение, опрос
+        не превращается в частый цикл.
+        """
+        backoff = CALL_EVENTS_BACKOFF_MIN
+        while self._clients:
+            # Клиент любой из записей адреса: пул закрывается вместе с записью
+            _, client = next(iter(self._clients.values()))
+            started = time.monotonic()
+            try:
+                status, events = await client.async_poll_call_events(self._cursor)
+            except IntersvyazAuthError as err:
+                _LOGGER.error("События домофона остановлены: %s", err)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Ошибка получения событий домофона: %s", err)
+                status, events = None, None
+
+            if status == 404:
+                _LOGGER.warning("Сервер не поддерживает получение событий домофона")
+                return
+
+            if status == 200:
+                backoff = CALL_EVENTS_BACKOFF_MIN
+                for event in events or []:
+                    self._dispatch(event)
+                await asyncio.sleep(max(0.0, started + CALL_EVENTS_MIN_INTERVAL - time.monotonic()))
+                continue
+
+            await asyncio.sleep(backoff * random.uniform(0.8, 1.2))
+            backoff = min(backoff * 2, CALL_EVENTS_BACKOFF_MAX)
+
+    def _dispatch(self, event: dict) -> None:
+        """Публикует событие вызова для записей этого адреса."""
+        self._cursor = str(event["ID"])
+        for entry_id, (address_key, _) in self._clients.items():
+            data = {"entry_id": entry_id, "address": address_key, **event}
+            self._hass.bus.async_fire(EVENT_CALL, data)
+            async_dispatcher_send(
+                self._hass, SIGNAL_CALL.format(entry_id), {**event, ADDRESS_KEY: address_key}
+            )
+
+
+def async_setup_call_listener(
+    hass: HomeAssistant, entry: ConfigEntry, clients: dict[str, IntersvyazApiClient]
+) -> None:
+    """Подключает каждый адрес записи к общему слушателю этого адреса."""
+    listeners: dict[str, CallListener] = hass.data.setdefault(DATA_CALL_LISTENERS, {})
+    for address in entry_addresses(entry):
+        listener = listeners.setdefault(listener_key(entry, address), CallListener(hass))
+        listener.add_entry(entry, address["key"], clients[address["key"]])
+
+
+async def async_unload_call_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Отключает запись от слушателей, последняя запись останавливает соединение."""
+    listeners: dict[str, CallListener] = hass.data.get(DATA_CALL_LISTENERS, {})
+    for key, listener in list(listeners.items()):
+        if await listener.async_remove_entry(entry.entry_id):
+            listeners.pop(key, None)
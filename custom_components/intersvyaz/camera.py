@@ -1,137 +1,387 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import Any
+import inspect
 import logging
-import aiohttp
-import voluptuous as vol
 from aiohttp import web
-from haffmpeg.camera import CameraMjpeg
-from haffmpeg.tools import IMAGE_JPEG
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from homeassistant.components.camera import (
-    PLATFORM_SCHEMA as CAMERA_PLATFORM_SCHEMA,
-    Camera,
-    CameraEntityFeature,
-)
+from homeassistant.components.camera import Camera, CameraEntityFeature
+from homeassistant.components.camera.const import DATA_CAMERA_PREFS
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_aiohttp_proxy_stream
+from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_UUID, CONF_TOKEN
-from . import get_token, get_uuid_cam, get_group_id
+from .addresses import address_device_info, item_address, item_client
+from .api import IntersvyazApiClient
+from .const import (
+    DOMAIN,
+    CONF_ENABLED_CAMERAS,
+    CONF_MJPEG_FPS,
+    CONF_MJPEG_WIDTH,
+    CONF_PRELOAD_CAMERAS,
+    CONF_PREWARM_STREAMS,
+    CONF_WEBRTC_URL,
+    DEFAULT_MJPEG_FPS,
+    DEFAULT_MJPEG_WIDTH,
+    DEFAULT_PREWARM_STREAMS,
+    GROUP_KEY,
+    MAX_DEFAULT_CAMERAS,
+    MJPEG_IDLE_TIMEOUT,
+)
+from .coordinator import IntersvyazDataUpdateCoordinator
+from .hls import VariantCache
+from .mjpeg import MjpegBroadcaster, async_stream_mjpeg
+from .snapshot import SnapshotCache, SnapshotRefresher
+from .webrtc import Go2rtcClient, webrtc_stream_name
 
 # Логгер для вывода сообщений об ошибках
 _LOGGER = logging.getLogger(__name__)
 
-# Значение по умолчанию для имени камеры
-DEFAULT_NAME = "IS74 Camera"
-
-# Определение схемы конфигурации платформы
-PLATFORM_SCHEMA = CAMERA_PLATFORM_SCHEMA.extend(
-    {
-        vol.Required(CONF_UUID): cv.string,
-        vol.Required(CONF_TOKEN): cv.string,
-        vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
-    }
-)
+# Атрибуты камеры и возможные имена полей в ответе get-group
+CAMERA_ATTRIBUTES = {
+    "address": ("ADDRESS",),
+    "entrance": ("ENTRANCE", "PORCH"),
+    "online": ("ONLINE", "IS_ONLINE"),
+    "ptz": ("PTZ", "IS_PTZ"),
+    "audio": ("AUDIO", "HAS_AUDIO"),
+}
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Настройка платформы камеры из записи конфигурации."""
-    session = async_get_clientsession(hass)
-    
-    # Получаем токен из сохраненных данных конфигурации
-    token = entry.data.get("token")
-    if not token:
-        _LOGGER.error("Токен не найден в конфигурации")
-        return
-
-    # Получаем group_id
-    group_id = await get_group_id(session, token)
-    if not group_id:
-        _LOGGER.error("Не удалось получить group_id")
-        return
-
-    # Получаем информацию о камерах
-    cameras_info = await get_cameras_info(session, token, group_id)
-    if not cameras_info:
-        _LOGGER.error("Не удалось получить информацию о камерах")
-        return
-
-    # Создаём камеры
-    cameras = [IS74Camera(entry.data, token, camera_info) for camera_info in cameras_info]
-    
-    # Добавляем камеры
-    async_add_entities(cameras)
-
-async def async_setup_platform(
-    hass: HomeAssistant,
-    config: ConfigType,
-    async_add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,
-) -> None:
-    """Настройка камеры IS74 через YAML-конфигурацию."""
-    async_add_entities([IS74Camera(config)])
-
-async def get_cameras_info(session: aiohttp.ClientSession, token: str, group_id: str) -> list[dict] | None:
-    """Получает информацию о камерах."""
-    try:
-        headers = {"Authorization": f"Bearer {token}"}
-        async with session.get(
-            f"https://cams.is74.ru/api/get-group/{group_id}",
-            headers=headers,
-        ) as response:
-            if response.status == 200:
-                return await response.json()
-            return None
-    except aiohttp.ClientError as err:
-        _LOGGER.error("Ошибка при получении информации о камерах: %s", err)
-        return None
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    clients: dict[str, IntersvyazApiClient] = entry_data["clients"]
+    coordinator: IntersvyazDataUpdateCoordinator = entry_data["coordinator"]
+    snapshots: SnapshotCache = entry_data["snapshots"]
+    refresher: SnapshotRefresher = entry_data["snapshot_refresher"]
+    variants: VariantCache = entry_data["variants"]
+    prewarm = entry.options.get(CONF_PREWARM_STREAMS, DEFAULT_PREWARM_STREAMS)
+    preload_uuids = set(entry.options.get(CONF_PRELOAD_CAMERAS, []))
+    chosen_uuids = set(entry.options.get(CONF_ENABLED_CAMERAS, []))
+    # С сервером go2rtc камеры отдаются по WebRTC, без него — по HLS
+    webrtc_url = entry.options.get(CONF_WEBRTC_URL)
+    camera_class = (
+        partial(IS74WebRTCCamera, Go2rtcClient(async_get_clientsession(hass), webrtc_url))
+        if webrtc_url
+        else IS74Camera
+    )
+
+    def _enabled_by_default(index: int, camera_uuid: str) -> bool:
+        """Включена ли камера при первом добавлении в реестр.
+
+        Остальные регистрируются выключенными: не создают сущностей
+        и потоков, пока пользователь не включит их сам.
+        """
+        if camera_uuid in preload_uuids:
+            return True
+        if chosen_uuids:
+            return camera_uuid in chosen_uuids
+        return index < MAX_DEFAULT_CAMERAS
+
+    known_uuids: set[str] = set()
+
+    @callback
+    def _async_add_new_cameras() -> None:
+        """Создаёт сущности для камер, которых ещё нет."""
+        cameras = [
+            camera_class(
+                address_device_info(entry, item_address(camera_info)),
+                item_client(clients, camera_info),
+                coordinator,
+                snapshots,
+                refresher,
+                variants,
+                camera_info,
+                prewarm=prewarm or camera_info["UUID"] in preload_uuids,
+                preload=camera_info["UUID"] in preload_uuids,
+                enabled_default=_enabled_by_default(index, camera_info["UUID"]),
+                mjpeg_fps=entry.options.get(CONF_MJPEG_FPS, DEFAULT_MJPEG_FPS),
+                mjpeg_width=entry.options.get(CONF_MJPEG_WIDTH, DEFAULT_MJPEG_WIDTH),
+            )
+            for index, camera_info in enumerate(coordinator.data.cameras)
+            if camera_info.get("UUID") and camera_info["UUID"] not in known_uuids
+        ]
+        if cameras:
+            known_uuids.update(camera.uuid for camera in cameras)
+            async_add_entities(cameras)
+
+    # Камеры берём из снимка координатора, новые добавляем при обновлении
+    _async_add_new_cameras()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_cameras))
+
+def camera_attributes(camera_info: dict) -> dict[str, Any]:
+    """Атрибуты камеры: только поля, которые есть в ответе API."""
+    attributes = {}
+    for attribute, keys in CAMERA_ATTRIBUTES.items():
+        for key in keys:
+            if camera_info.get(key) is not None:
+                attributes[attribute] = camera_info[key]
+                break
+    return attributes
 
-class IS74Camera(Camera):
+class IS74Camera(CoordinatorEntity[IntersvyazDataUpdateCoordinator], Camera):
     """Реализация камеры IS74."""
     _attr_supported_features = CameraEntityFeature.STREAM
 
-    def __init__(self, config: dict[str, Any], token: str, camera_info: dict) -> None:
+    def __init__(
+        self,
+        device_info: dict[str, Any],
+        client: IntersvyazApiClient,
+        coordinator: IntersvyazDataUpdateCoordinator,
+        snapshots: SnapshotCache,
+        refresher: SnapshotRefresher,
+        variants: VariantCache,
+        camera_info: dict,
+        prewarm: bool = False,
+        preload: bool = False,
+        enabled_default: bool = True,
+        mjpeg_fps: int = DEFAULT_MJPEG_FPS,
+        mjpeg_width: int = DEFAULT_MJPEG_WIDTH,
+    ) -> None:
         """Инициализация камеры IS74."""
-        super().__init__()
+        CoordinatorEntity.__init__(self, coordinator)
+        Camera.__init__(self)
         self._uuid: str = camera_info["UUID"]
         self._name: str = camera_info["NAME"]
-        self._token: str = token
+        self._client = client
+        self._snapshots = snapshots
+        self._refresher = refresher
+        self._group: str | None = camera_info.get(GROUP_KEY)
+        self._variants = variants
+        self._prewarm = prewarm
+        self._preload = preload
         self._attr_unique_id = f"is74_camera_{self._uuid}"
-        self._input: str = (
-            f"https://cdn.cams.is74.ru/hls/playlists/multivariant.m3u8?uuid={self._uuid}&realtime=1&token=bearer-{self._token}"
+        self._attr_entity_registry_enabled_default = enabled_default
+        self._mjpeg_fps = mjpeg_fps
+        self._mjpeg_width = mjpeg_width
+        self._mjpeg: MjpegBroadcaster | None = None
+
+        # Камера относится к устройству своего адреса
+        self._attr_device_info = device_info
+
+    @property
+    def _input(self) -> str:
+        """URL HLS-потока с актуальным токеном."""
+        return self._client.stream_url(self._uuid)
+
+    async def async_added_to_hass(self) -> None:
+        """Подписка на смену токена."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._client.tokens.async_add_listener(self._handle_token_refresh))
+        self.async_on_remove(self._client.scheduler.async_add_listener(self._handle_connectivity))
+        self.async_on_remove(
+            self._refresher.async_register(self._uuid, self._group, self._async_grab_frame)
         )
-        
-        # Логируем URL потока
-        _LOGGER.info("Полученный URL потока камеры: %s", self._input)
-
-        # Добавляем информацию об устройстве
-        self._attr_device_info = {
-            "identifiers": {("intersvyaz_domofon", config.get("device_id", "main"))},
-            "name": "Домофон Интерсвязь",
-            "manufacturer": "Интерсвязь",
-            "model": "Домофон IS74",
-            "sw_version": "1.0",
-        }
+        if self._preload:
+            await self._async_enable_preload()
+        else:
+            await self._async_disable_preload()
+
+    async def _async_enable_preload(self) -> None:
+        """Включает предзагрузку потока в настройках камеры Home Assistant.
+
+        С этой настройкой Home Assistant сам запускает поток после старта
+        и не останавливает его, когда зритель закрывает видео. Если старт
+        уже прошёл (запись добавлена или перезагружена позже), поток
+        запускается здесь так же, как это делает Home Assistant.
+        """
+        await self.hass.data[DATA_CAMERA_PREFS].async_update(self.entity_id, preload_stream=True)
+        if self.hass.state is CoreState.running:
+            self.hass.async_create_task(self._async_preload_stream())
+
+    async def _async_disable_preload(self) -> None:
+        """Снимает предзагрузку с камеры, убранной из списка предзагрузки.
+
+        Настройка хранится в Home Assistant и без этого осталась бы
+        навсегда, а поток шёл бы круглосуточно.
+        """
+        prefs = self.hass.data[DATA_CAMERA_PREFS]
+        settings = await prefs.async_get_dynamic_stream_settings(self.entity_id)
+        if settings.preload_stream:
+            await prefs.async_update(self.entity_id, preload_stream=False)
+
+    async def _async_preload_stream(self) -> None:
+        """Запускает поток заранее, чтобы видео открывалось без задержки."""
+        stream = await self.async_create_stream()
+        if stream is None:
+            return
+        stream.keepalive = True
+        stream.add_provider("hls")
+        result = stream.start()
+        # В новых версиях Home Assistant start() — корутина
+        if inspect.isawaitable(result):
+            await result
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Останавливает MJPEG-перекодирование и поток предзагрузки."""
+        await super().async_will_remove_from_hass()
+        if self._mjpeg is not None:
+            await self._mjpeg.async_stop()
+        if self.stream is not None:
+            # Поток с keepalive сам не останавливается даже без зрителей
+            self.stream.keepalive = False
+            result = self.stream.stop()
+            if inspect.isawaitable(result):
+                await result
+            self.stream = None
+
+    @callback
+    def _handle_connectivity(self, host: str) -> None:
+        """Смена доступности облака."""
+        self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        """Камера недоступна, пока нет связи с хостами камер.
+
+        Неудачное обновление списка камер её не скрывает:
+        метаданные берутся из последнего снимка координатора.
+        """
+        return self._client.cameras_available
+
+    @callback
+    def _handle_token_refresh(self, token: str) -> None:
+        """Перестраивает URL уже запущенного потока под новый токен."""
+        if self.stream is not None:
+            self.stream.update_source(self._input)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Метаданные камеры из последнего ответа get-group."""
+        camera_info = next(
+            (camera for camera in self.coordinator.data.cameras if camera.get("UUID") == self._uuid),
+            None,
+        )
+        if camera_info is None:
+            return {}
+        return camera_attributes(camera_info)
+
+    @property
+    def uuid(self) -> str:
+        """UUID камеры."""
+        return self._uuid
 
     async def stream_source(self) -> str:
-        """Возвращает источник потока."""
+        """Возвращает источник потока.
+
+        В режиме прогрева отдаётся заранее полученный вариант потока,
+        чтобы воркер stream не разбирал мастер-плейлист при каждом открытии.
+        """
+        if self._prewarm:
+            if variant := self._variants.get(self._uuid):
+                return variant
+            self.hass.async_create_task(self._variants.async_resolve(self._uuid))
         return self._input
 
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
-        """Возвращает статичное изображение с камеры (не реализовано)."""
-        return None
+        """Возвращает статичное изображение с камеры.
+
+        Кадр берётся из HLS-потока через ffmpeg и кэшируется, поэтому
+        одновременные зрители вызывают одно декодирование. Пока кадры
+        смотрят, камеры той же группы обновляются заранее пакетом.
+        """
+        self._refresher.async_mark_viewed(self._uuid)
+        return await self._snapshots.async_get(
+            self._uuid, self._async_grab_frame, width, height
+        )
+
+    async def handle_async_mjpeg_stream(
+        self, request: web.Request
+    ) -> web.StreamResponse:
+        """MJPEG для клиентов без HLS.
+
+        Все зрители камеры получают кадры одного процесса ffmpeg.
+        """
+        if self._mjpeg is None:
+            self._mjpeg = MjpegBroadcaster(
+                self.hass,
+                self._uuid,
+                self._mjpeg_source,
+                fps=self._mjpeg_fps,
+                width=self._mjpeg_width,
+                idle_timeout=MJPEG_IDLE_TIMEOUT,
+            )
+        return await async_stream_mjpeg(request, self._mjpeg)
+
+    def _mjpeg_source(self) -> str:
+        """Источник для ffmpeg: готовый вариант потока или мастер-плейлист."""
+        return self._variants.get(self._uuid) or self._input
+
+    async def _async_grab_frame(self) -> bytes | None:
+        """Декодирует один кадр из потока камеры."""
+        if not self._client.cameras_available:
+            # Без связи не ждём ffmpeg: кэш отдаст последний кадр
+            return None
+        # haffmpeg нужен только для снимков и MJPEG
+        from haffmpeg.tools import IMAGE_JPEG
+        from homeassistant.components.ffmpeg import async_get_image
+
+        return await async_get_image(self.hass, self._input, output_format=IMAGE_JPEG)
 
     @property
     def name(self) -> str:
         """Возвращает имя камеры."""
         return self._name
+
+
+class IS74WebRTCCamera(IS74Camera):
+    """Камера с WebRTC через go2rtc: задержка меньше, чем у HLS.
+
+    go2rtc забирает мультивариантный плейлист камеры один раз на всех
+    зрителей и перепаковывает видео без перекодирования. Отдельный
+    класс нужен потому, что Home Assistant включает WebRTC по наличию
+    переопределённых методов.
+    """
+
+    def __init__(self, webrtc: Go2rtcClient, *args: Any, **kwargs: Any) -> None:
+        """Инициализация камеры."""
+        super().__init__(*args, **kwargs)
+        self._webrtc = webrtc
+        self._webrtc_name = webrtc_stream_name(self._uuid)
+        if not hasattr(Camera, "async_handle_async_webrtc_offer"):
+            # До 2024.11 фронтенд выбирал WebRTC только по этому признаку
+            from homeassistant.components.camera import StreamType
+
+            self._attr_frontend_stream_type = StreamType.WEB_RTC
+
+    @callback
+    def _handle_token_refresh(self, token: str) -> None:
+        """Передаёт go2rtc URL потока с новым токеном."""
+        super()._handle_token_refresh(token)
+        self.hass.async_create_task(self._async_update_webrtc_source())
+
+    async def _async_update_webrtc_source(self) -> None:
+        """Обновляет источник потока на сервере go2rtc."""
+        try:
+            await self._webrtc.async_register(self._webrtc_name, self._input)
+        except HomeAssistantError as err:
+            _LOGGER.debug("Не удалось обновить поток %s в go2rtc: %s", self._webrtc_name, err)
+
+    async def async_handle_web_rtc_offer(self, offer_sdp: str) -> str | None:
+        """SDP-ответ go2rtc на предложение браузера."""
+        if not self._client.cameras_available:
+            raise HomeAssistantError("Нет связи с сервером камер Интерсвязь")
+        await self._webrtc.async_register(self._webrtc_name, self._input)
+        return await self._webrtc.async_offer(self._webrtc_name, offer_sdp)
+
+    async def async_handle_async_webrtc_offer(
+        self, offer_sdp: str, session_id: str, send_message: Any
+    ) -> None:
+        """То же для Home Assistant 2024.11+: ответ уходит сообщением."""
+        from homeassistant.components.camera.webrtc import WebRTCAnswer
+
+        send_message(WebRTCAnswer(await self.async_handle_web_rtc_offer(offer_sdp)))
+
+    async def async_on_webrtc_candidate(self, session_id: str, candidate: Any) -> None:
+        """Кандидаты браузера не пересылаются.
+
+        go2rtc отвечает полным SDP со своими кандидатами, а адрес
+        браузера узнаёт из входящих STUN-запросов.
+        """
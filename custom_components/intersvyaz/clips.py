@@ -0,0 +1,335 @@
+"""Клипы камер при открытии двери и вызове домофона.
+
+Для выбранных камер в памяти держатся последние сегменты HLS-потока.
+По событию к ним добавляются следующие сегменты, и клип сохраняется
+на диск копированием потока, без перекодирования.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+
+import aiohttp
+from homeassistant.components.ffmpeg import get_ffmpeg_manager
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .api import IntersvyazApiClient
+from .const import (
+    ADDRESS_KEY,
+    CLIP_PRUNE_INTERVAL,
+    CLIP_RETRY_INTERVAL,
+    CLIPS_DIR,
+    DOMAIN,
+    EVENT_CLIP,
+    MAIN_ADDRESS,
+)
+from .hls import VariantCache, parse_media_playlist
+
+_LOGGER = logging.getLogger(__name__)
+
+CLIP_EXTENSIONS = (".mp4", ".ts")
+
+
+@dataclass
+class Segment:
+    """Сегмент потока."""
+
+    sequence: int
+    duration: float
+    data: bytes
+
+
+class SegmentBuffer:
+    """Скользящий буфер последних сегментов HLS одной камеры."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: IntersvyazApiClient,
+        variants: VariantCache,
+        camera_uuid: str,
+        keep_seconds: float,
+        address: str = MAIN_ADDRESS,
+    ) -> None:
+        """Инициализация буфера; address — ключ адреса камеры в записи."""
+        self._hass = hass
+        self._client = client
+        self._variants = variants
+        self.camera_uuid = camera_uuid
+        self.address = address
+        self._keep_seconds = keep_seconds
+        self._segments: deque[Segment] = deque()
+        self._listeners: list[Callable[[Segment], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускает чтение потока в фоне."""
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"intersvyaz_segments_{self.camera_uuid}"
+        )
+
+    async def async_stop(self) -> None:
+        """Останавливает чтение потока."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._segments.clear()
+
+    def recent(self, seconds: float) -> list[Segment]:
+        """Сегменты за последние seconds секунд."""
+        selected: list[Segment] = []
+        total = 0.0
+        for segment in reversed(self._segments):
+            if total >= seconds:
+                break
+            selected.append(segment)
+            total += segment.duration
+        return selected[::-1]
+
+    @callback
+    def async_add_listener(self, listener: Callable[[Segment], None]) -> CALLBACK_TYPE:
+        """Подписка на новые сегменты."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def _async_run(self) -> None:
+        """Опрашивает медиаплейлист и загружает новые сегменты."""
+        last_sequence = -1
+        while True:
+            target_duration = float(CLIP_RETRY_INTERVAL)
+            try:
+                url = self._variants.get(self.camera_uuid) or await self._variants.async_resolve(
+                    self.camera_uuid
+                )
+                playlist = await self._client.async_fetch_text(url) if url else None
+                if playlist:
+                    target_duration, segments = parse_media_playlist(playlist, url)
+                    for sequence, duration, segment_url in segments:
+                        if sequence <= last_sequence:
+                            continue
+                        data = await self._client.async_fetch_bytes(segment_url)
+                        if data:
+                            self._append(Segment(sequence, duration, data))
+                        last_sequence = sequence
+                else:
+                    # Вариант мог устареть вместе с токеном
+                    self._variants.invalidate(self.camera_uuid)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Буфер камеры %s: %s", self.camera_uuid, err)
+            # Плейлист обновляется примерно раз в длительность сегмента
+            await asyncio.sleep(max(target_duration / 2, 1.0))
+
+    @callback
+    def _append(self, segment: Segment) -> None:
+        """Добавляет сегмент и отбрасывает вышедшие за окно."""
+        self._segments.append(segment)
+        total = sum(item.duration for item in self._segments)
+        while self._segments and total - self._segments[0].duration >= self._keep_seconds:
+            total -= self._segments.popleft().duration
+        for listener in list(self._listeners):
+            listener(segment)
+
+
+class ClipRecorder:
+    """Сохраняет клипы выбранных камер записи и следит за объёмом."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        buffers: dict[str, SegmentBuffer],
+        pre_seconds: float,
+        post_seconds: float,
+        max_bytes: int,
+        retention_days: int,
+    ) -> None:
+        """Инициализация."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._buffers = buffers
+        self._pre_seconds = pre_seconds
+        self._post_seconds = post_seconds
+        self._max_bytes = max_bytes
+        self._retention_days = retention_days
+        self.directory = clips_directory(hass, entry_id)
+        self._unsub_prune: CALLBACK_TYPE | None = None
+        # Идущие записи клипов: при выгрузке их нужно отменить,
+        # иначе они допишут файлы в уже удалённый каталог
+        self._captures: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Запускает буферы камер и очистку старых клипов.
+
+        Очистка идёт сразу и затем раз в CLIP_PRUNE_INTERVAL, чтобы срок
+        хранения соблюдался и без новых событий.
+        """
+        for buffer in self._buffers.values():
+            buffer.start()
+        self._hass.async_create_background_task(self.async_prune(), "intersvyaz_clip_prune")
+        self._unsub_prune = async_track_time_interval(
+            self._hass, self.async_prune, timedelta(seconds=CLIP_PRUNE_INTERVAL)
+        )
+
+    async def async_stop(self) -> None:
+        """Останавливает буферы камер, очистку и идущие записи клипов."""
+        if self._unsub_prune is not None:
+            self._unsub_prune()
+            self._unsub_prune = None
+        for task in self._captures:
+            task.cancel()
+        await asyncio.gather(*self._captures, return_exceptions=True)
+        await asyncio.gather(*(buffer.async_stop() for buffer in self._buffers.values()))
+
+    @callback
+    def async_handle_door_open(self, event: Event) -> None:
+        """Клип после успешного открытия двери этой записи."""
+        if event.data.get("entry_id") == self._entry_id and event.data.get("success"):
+            self._async_start_capture("door")
+
+    @callback
+    def async_handle_call(self, event: dict) -> None:
+        """Клип камер адреса, на который пришёл вызов."""
+        self._async_start_capture("call", event.get(ADDRESS_KEY))
+
+    @callback
+    def _async_start_capture(self, reason: str, address: str | None = None) -> None:
+        """Запускает запись клипа в фоне и запоминает задачу до её завершения."""
+        task = self._hass.async_create_background_task(
+            self.async_capture(reason, address), f"intersvyaz_clip_{reason}"
+        )
+        self._captures.add(task)
+        task.add_done_callback(self._captures.discard)
+
+    async def async_capture(self, reason: str, address: str | None = None) -> None:
+        """Сохраняет клипы буферизуемых камер адреса или всех камер."""
+        await asyncio.gather(
+            *(
+                self._async_capture_camera(buffer, reason)
+                for buffer in self._buffers.values()
+                if address is None or buffer.address == address
+            )
+        )
+        await self.async_prune()
+
+    async def async_prune(self, now: datetime | None = None) -> None:
+        """Удаляет клипы старше срока хранения и сверх объёма."""
+        await self._hass.async_add_executor_job(self._prune)
+
+    async def _async_capture_camera(self, buffer: SegmentBuffer, reason: str) -> None:
+        """Последние pre_seconds и следующие post_seconds одной камеры."""
+        started = dt_util.now()
+        segments = buffer.recent(self._pre_seconds)
+        collected = {segment.sequence: segment for segment in segments}
+        post_duration = 0.0
+        done = asyncio.Event()
+
+        @callback
+        def _collect(segment: Segment) -> None:
+            nonlocal post_duration
+            collected[segment.sequence] = segment
+            post_duration += segment.duration
+            if post_duration >= self._post_seconds:
+                done.set()
+
+        remove = buffer.async_add_listener(_collect)
+        try:
+            # Запас на задержку плейлиста: сегменты приходят с опозданием
+            await asyncio.wait_for(done.wait(), self._post_seconds * 2 + CLIP_RETRY_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            remove()
+
+        if not collected:
+            _LOGGER.debug("Клип камеры %s пуст, поток недоступен", buffer.camera_uuid)
+            return
+
+        data = b"".join(collected[sequence].data for sequence in sorted(collected))
+        stem = f"{started.strftime('%Y%m%d_%H%M%S')}_{reason}"
+        path = await self._async_write(buffer.camera_uuid, stem, data)
+        self._hass.bus.async_fire(
+            EVENT_CLIP,
+            {
+                "entry_id": self._entry_id,
+                "camera_uuid": buffer.camera_uuid,
+                "reason": reason,
+                "media_content_id": clip_media_id(self._entry_id, buffer.camera_uuid, path.name),
+            },
+        )
+
+    async def _async_write(self, camera_uuid: str, stem: str, data: bytes) -> Path:
+        """Пишет клип: MPEG-TS перекладывается в MP4 копированием потока."""
+        directory = self.directory / camera_uuid
+        await self._hass.async_add_executor_job(lambda: directory.mkdir(parents=True, exist_ok=True))
+        path = directory / f"{stem}.mp4"
+
+        process = await asyncio.create_subprocess_exec(
+            get_ffmpeg_manager(self._hass).binary,
+            "-hide_banner", "-loglevel", "error",
+            "-f", "mpegts", "-i", "pipe:0",
+            "-c", "copy", "-movflags", "+faststart",
+            "-y", str(path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await process.communicate(data)
+        except asyncio.CancelledError:
+            # Выгрузка записи: ffmpeg не должен дописывать файл после неё
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode == 0:
+            return path
+
+        # Без MP4 клип всё равно сохраняется, как есть; недописанный MP4 удаляется
+        _LOGGER.warning("Не удалось упаковать клип в MP4: %s", stderr.decode(errors="replace").strip())
+        await self._hass.async_add_executor_job(partial(path.unlink, missing_ok=True))
+        path = directory / f"{stem}.ts"
+        await self._hass.async_add_executor_job(path.write_bytes, data)
+        return path
+
+    def _prune(self) -> None:
+        """Удаляет клипы старше срока хранения и самые старые сверх объёма."""
+        clips: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix not in CLIP_EXTENSIONS:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Клип удалили во время обхода: другая очистка или пользователь
+                continue
+            clips.append((stat.st_mtime, stat.st_size, path))
+        clips.sort()
+
+        expire_before = time.time() - self._retention_days * 86400
+        total = sum(size for _, size, _ in clips)
+        for mtime, size, path in clips:
+            if mtime >= expire_before and total <= self._max_bytes:
+                break
+            total -= size
+            path.unlink(missing_ok=True)
+
+
+def clips_directory(hass: HomeAssistant, entry_id: str) -> Path:
+    """Каталог клипов записи."""
+    return Path(hass.config.path(DOMAIN, CLIPS_DIR, entry_id))
+
+
+def clip_media_id(entry_id: str, camera_uuid: str, filename: str) -> str:
+    """Идентификатор клипа в медиаисточнике."""
+    return f"media-source://{DOMAIN}/clips/{entry_id}/{camera_uuid}/{filename}"
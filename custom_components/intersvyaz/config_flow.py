@@ -1,31 +1,61 @@
 """Config flow for Intersvyaz Domofon integration."""
 from typing import Any, Dict, Optional
+import asyncio
 import logging
 import aiohttp
-import asyncio
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import uuid
 
 from .const import (
     DOMAIN,
-    BASE_URL,
     CONF_USERNAME,
     CONF_PASSWORD,
     CONF_PHONE,
     CONF_AUTH_METHOD,
     CONF_SMS_CODE,
     CONF_ADDRESS,
+    CONF_ADDRESSES,
     CONF_DEVICE_ID,
     CONF_AUTH_ID,
     CONF_USER_ID,
+    CONF_BASE_URL,
+    BASE_URL,
     AUTH_METHOD_LOGIN,
     AUTH_METHOD_PHONE,
+    CONF_CALL_EVENTS,
+    CONF_CLIP_CAMERAS,
+    CONF_CLIP_MAX_SIZE,
+    CONF_CLIP_RETENTION_DAYS,
+    CONF_ENABLED_CAMERAS,
+    CONF_MJPEG_FPS,
+    CONF_MJPEG_WIDTH,
+    CONF_MOTION_CAMERAS,
+    CONF_MOTION_INTERVAL,
+    CONF_PRELOAD_CAMERAS,
+    CONF_PREWARM_STREAMS,
+    CONF_SCAN_INTERVAL,
+    CONF_SNAPSHOT_CACHE_SIZE,
+    CONF_SNAPSHOT_MAX_AGE,
+    CONF_WEBRTC_URL,
+    DEFAULT_CALL_EVENTS,
+    DEFAULT_CLIP_MAX_SIZE,
+    DEFAULT_CLIP_RETENTION_DAYS,
+    DEFAULT_MJPEG_FPS,
+    DEFAULT_MJPEG_WIDTH,
+    DEFAULT_MOTION_INTERVAL,
+    DEFAULT_PREWARM_STREAMS,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SNAPSHOT_CACHE_SIZE,
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    MIN_MOTION_INTERVAL,
+    MIN_SCAN_INTERVAL,
 )
-from . import get_token, get_token_by_phone
+from .addresses import entry_addresses
+from .api import IntersvyazApiClient
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +68,25 @@ class DomofonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize flow."""
         self.auth_method = None
         self.phone_data = {}
+        self._client: IntersvyazApiClient | None = None
+        self._reauth_entry: config_entries.ConfigEntry | None = None
+        # Адреса записи при повторной авторизации: выбор не меняется
+        self._reauth_addresses: list[str] = []
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> "DomofonOptionsFlow":
+        """Настройки интеграции."""
+        return DomofonOptionsFlow(config_entry)
+
+    @property
+    def client(self) -> IntersvyazApiClient:
+        """Клиент API поверх общей сессии Home Assistant."""
+        if self._client is None:
+            # Повторная авторизация идёт туда же, куда ходит запись
+            base_url = (self._reauth_entry.data if self._reauth_entry else {}).get(CONF_BASE_URL, BASE_URL)
+            self._client = IntersvyazApiClient(async_get_clientsession(self.hass), base_url=base_url)
+        return self._client
 
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None):
         """Выбор метода авторизации."""
@@ -59,45 +108,77 @@ class DomofonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             })
         )
 
+    async def async_step_reauth(self, entry_data: Dict[str, Any]):
+        """Повторная авторизация, когда сохранённые данные больше не подходят.
+
+        Способ входа, логин, телефон и адреса остаются прежними: меняются
+        только пароль или токены, иначе запись стала бы другой.
+        """
+        self._reauth_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        if entry_data.get(CONF_USERNAME):
+            self.auth_method = AUTH_METHOD_LOGIN
+            return await self.async_step_login()
+        self.auth_method = AUTH_METHOD_PHONE
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input: Optional[Dict[str, Any]] = None):
+        """Подтверждение отправки СМС на телефон записи."""
+        phone = self._reauth_entry.data[CONF_PHONE]
+        if user_input is not None:
+            return await self.async_step_phone_number({CONF_PHONE: phone})
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            description_placeholders={"phone": phone},
+        )
+
+    async def _async_finish(self, title: str, data: Dict[str, Any]):
+        """Создание записи или обновление существующей при повторной авторизации."""
+        if self._reauth_entry is not None:
+            return self.async_update_reload_and_abort(
+                self._reauth_entry, data={**self._reauth_entry.data, **data}
+            )
+        return self.async_create_entry(title=title, data=data)
+
     async def async_step_login(self, user_input: Optional[Dict[str, Any]] = None):
         """Авторизация по логину и паролю."""
         errors = {}
+        if user_input is not None and self._reauth_entry is not None:
+            # При повторной авторизации логин записи не меняется
+            user_input = {**user_input, CONF_USERNAME: self._reauth_entry.data[CONF_USERNAME]}
         if user_input is not None:
             try:
-                async with aiohttp.ClientSession() as session:
-                    _LOGGER.debug(f"Попытка авторизации для пользователя: {user_input[CONF_USERNAME]}")
-                    token = await get_token(
-                        session,
-                        user_input[CONF_USERNAME],
-                        user_input[CONF_PASSWORD]
+                _LOGGER.debug("Попытка авторизации для пользователя: %s", user_input[CONF_USERNAME])
+                token = await self.client.async_get_token(
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD]
+                )
+                _LOGGER.debug("Токен получен: %s", bool(token))
+                
+                if token:
+                    return await self._async_finish(
+                        title=user_input[CONF_USERNAME],
+                        data={
+                            CONF_USERNAME: user_input[CONF_USERNAME],
+                            CONF_PASSWORD: user_input[CONF_PASSWORD],
+                            "token": token
+                        }
                     )
-                    _LOGGER.debug(f"Результат получения токена: {token}")
-                    
-                    if token:
-                        return self.async_create_entry(
-                            title=user_input[CONF_USERNAME],
-                            data={
-                                CONF_USERNAME: user_input[CONF_USERNAME],
-                                CONF_PASSWORD: user_input[CONF_PASSWORD],
-                                "token": token
-                            }
-                        )
-                    errors["base"] = "auth_error"
-            except aiohttp.ClientError as e:
-                _LOGGER.error(f"Ошибка сети при авторизации: {e}")
+                errors["base"] = "auth_error"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                _LOGGER.error("Ошибка сети при авторизации: %s", e)
                 errors["base"] = "cannot_connect"
             except Exception as e:
-                _LOGGER.error(f"Неожиданная ошибка при авторизации: {e}")
+                _LOGGER.error("Неожиданная ошибка при авторизации: %s", e)
                 errors["base"] = "unknown"
 
-        return self.async_show_form(
-            step_id="login",
-            data_schema=vol.Schema({
+        if self._reauth_entry is not None:
+            schema = vol.Schema({vol.Required(CONF_PASSWORD): str})
+        else:
+            schema = vol.Schema({
                 vol.Required(CONF_USERNAME): str,
                 vol.Required(CONF_PASSWORD): str,
-            }),
-            errors=errors
-        )
+            })
+        return self.async_show_form(step_id="login", data_schema=schema, errors=errors)
 
     async def async_step_phone_number(self, user_input: Optional[Dict[str, Any]] = None):
         """Ввод номера телефона."""
@@ -109,22 +190,21 @@ class DomofonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_DEVICE_ID: str(uuid.uuid4()).replace("-", "")
             }
             
-            async with aiohttp.ClientSession() as session:
-                result = await get_token_by_phone(session, user_input[CONF_PHONE])
-                if "error" not in result:
-                    self.phone_data[CONF_DEVICE_ID] = result["device_id"]
-                    return await self.async_step_sms_code()
-                
-                # При любой ошибке отправки СМС предлагаем ввести старый код
-                error_message = result.get("message", "")
-                _LOGGER.debug(f"Ошибка отправки СМС: {error_message}")
-                
-                if "limit" in str(error_message).lower():
-                    description = f"\n\n{error_message}"
-                else:
-                    description = "\n\nВы можете ввести код из предыдущего СМС"
-                
-                return await self.async_step_sms_code(error_message=description)
+            result = await self.client.async_get_token_by_phone(user_input[CONF_PHONE])
+            if "error" not in result:
+                self.phone_data[CONF_DEVICE_ID] = result["device_id"]
+                return await self.async_step_sms_code()
+            
+            # При любой ошибке отправки СМС предлагаем ввести старый код
+            error_message = result.get("message", "")
+            _LOGGER.debug("Ошибка отправки СМС: %s", error_message)
+            
+            if "limit" in str(error_message).lower():
+                description = f"\n\n{error_message}"
+            else:
+                description = "\n\nВы можете ввести код из предыдущего СМС"
+            
+            return await self.async_step_sms_code(error_message=description)
 
         return self.async_show_form(
             step_id="phone_number",
@@ -145,20 +225,20 @@ class DomofonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         }
         
         if user_input is not None:
-            async with aiohttp.ClientSession() as session:
-                result = await get_token_by_phone(
-                    session,
-                    self.phone_data[CONF_PHONE],
-                    code=user_input[CONF_SMS_CODE],
-                    device_id=self.phone_data[CONF_DEVICE_ID]
-                )
-                if "error" not in result:
-                    self.phone_data.update({
-                        CONF_AUTH_ID: result["auth_id"],
-                        "addresses": result["addresses"]
-                    })
-                    return await self.async_step_address_select()
-                errors["base"] = "invalid_code"
+            result = await self.client.async_get_token_by_phone(
+                self.phone_data[CONF_PHONE],
+                code=user_input[CONF_SMS_CODE],
+                device_id=self.phone_data[CONF_DEVICE_ID]
+            )
+            if "error" not in result:
+                self.phone_data.update({
+                    CONF_AUTH_ID: result["auth_id"],
+                    "addresses": result["addresses"]
+                })
+                if self._reauth_entry is not None:
+                    return await self._async_reauth_addresses()
+                return await self.async_step_address_select()
+            errors["base"] = "invalid_code"
 
         return self.async_show_form(
             step_id="sms_code",
@@ -170,141 +250,185 @@ class DomofonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def async_step_address_select(self, user_input: Optional[Dict[str, Any]] = None):
-        """Выбор адреса."""
+        """Выбор одного или нескольких адресов."""
         errors = {}
+        addresses = {
+            str(addr["USER_ID"]): addr["ADDRESS"] for addr in self.phone_data.get("addresses", [])
+        }
         if user_input is not None:
-            try:
-                _LOGGER.debug(f"Все сохраненные данные: {self.phone_data}")
-                _LOGGER.debug(f"Выбранный адрес: {user_input}")
-                
-                selected_address = next(
-                    addr for addr in self.phone_data["addresses"]
-                    if addr["ADDRESS"] == user_input[CONF_ADDRESS]
-                )
-                
-                _LOGGER.debug(f"Данные выбранного адреса: {selected_address}")
-                _LOGGER.debug(f"AUTH_ID: {self.phone_data.get(CONF_AUTH_ID)}")
-                _LOGGER.debug(f"USER_ID: {selected_address.get('USER_ID')}")
-                
-                async with aiohttp.ClientSession() as session:
-                    # Сразу пытаемся получить токен без отправки SMS
-                    result = await get_token_by_phone(
-                        session,
-                        phone=self.phone_data[CONF_PHONE],
-                        auth_id=self.phone_data[CONF_AUTH_ID],
-                        user_id=selected_address["USER_ID"],
-                        skip_sms=True  # Добавляем флаг пропуска проверки SMS
-                    )
-                    _LOGGER.debug(f"Результат получения токена: {result}")
-                    
-                    if "error" not in result and result.get("token"):
-                        _LOGGER.debug("Токен успешно получен, создаем entry")
-                        return self.async_create_entry(
-                            title=user_input[CONF_ADDRESS],
-                            data={
-                                CONF_PHONE: self.phone_data[CONF_PHONE],
-                                "token": result["token"],
-                                CONF_ADDRESS: user_input[CONF_ADDRESS],
-                                CONF_USER_ID: selected_address["USER_ID"]
-                            }
+            selected = self._reauth_addresses or user_input[CONF_ADDRESSES]
+            if not selected:
+                errors["base"] = "no_address"
+            else:
+                # Токены адресов получаем параллельно, без повторного СМС
+                results = await asyncio.gather(
+                    *(
+                        self.client.async_get_token_by_phone(
+                            phone=self.phone_data[CONF_PHONE],
+                            auth_id=self.phone_data[CONF_AUTH_ID],
+                            user_id=user_id,
+                            skip_sms=True,
                         )
-                    
-                    _LOGGER.error(f"Ошибка получения токена: {result}")
-                    errors["base"] = "token_error"
-                        
-            except Exception as e:
-                _LOGGER.exception(f"Неожиданная ошибка при получении токена: {e}")
-                errors["base"] = "unknown"
+                        for user_id in selected
+                    ),
+                    return_exceptions=True,
+                )
+                tokens = {}
+                for user_id, result in zip(selected, results):
+                    if isinstance(result, Exception) or "error" in result or not result.get("token"):
+                        _LOGGER.error("Ошибка получения токена для адреса %s: %s", addresses[user_id], result)
+                        continue
+                    tokens[user_id] = result["token"]
+
+                if len(tokens) == len(selected):
+                    return await self._async_finish(*self._address_entry(selected, tokens))
+                errors["base"] = "token_error"
 
         return self.async_show_form(
             step_id="address_select",
             data_schema=vol.Schema({
-                vol.Required(CONF_ADDRESS): vol.In(
-                    [addr["ADDRESS"] for addr in self.phone_data.get("addresses", [])]
-                ),
+                vol.Required(CONF_ADDRESSES, default=list(addresses)[:1]): cv.multi_select(addresses),
             }),
             errors=errors
         )
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    """Настройка интеграции при добавлении записи."""
-    username = entry.data[CONF_USERNAME]
-    password = entry.data[CONF_PASSWORD]
-    
-    async with aiohttp.ClientSession() as session:
-        token = await get_token(session, username, password)
-        if not token:
-            _LOGGER.error("Не удалось аутентифицироваться в API Intersvyaz")
-            return False
-        
-        relay_id = await get_relay_id(session, token)
-        if not relay_id:
-            _LOGGER.error("Не удалось получить ID реле")
-            return False
-        
-        async def handle_open_door(call: ServiceCall):
-            """Обработчик сервиса открытия двери."""
-            await open_door(session, token, relay_id)
-        
-        hass.services.async_register(DOMAIN, "open_door", handle_open_door)
-        
-        hass.data[DOMAIN] = {
-            "session": session,
-            "token": token,
-            "relay_id": relay_id
+    async def _async_reauth_addresses(self):
+        """Токены для тех же адресов, что уже есть в записи, без выбора."""
+        available = {str(addr["USER_ID"]) for addr in self.phone_data["addresses"]}
+        selected = [str(address[CONF_USER_ID]) for address in entry_addresses(self._reauth_entry)]
+        if not set(selected) <= available:
+            return self.async_abort(reason="reauth_address_missing")
+        self._reauth_addresses = selected
+        return await self.async_step_address_select({CONF_ADDRESSES: selected})
+
+    def _address_entry(self, selected: list[str], tokens: dict[str, str]) -> tuple[str, Dict[str, Any]]:
+        """Заголовок и данные записи для выбранных адресов."""
+        addresses = {
+            str(addr["USER_ID"]): addr["ADDRESS"] for addr in self.phone_data["addresses"]
         }
-    
-    return True
+        data = {
+            CONF_PHONE: self.phone_data[CONF_PHONE],
+            # Нужен для повторного получения токена без СМС
+            CONF_AUTH_ID: self.phone_data[CONF_AUTH_ID],
+        }
+        if len(selected) == 1:
+            # Один адрес хранится как раньше, в корне данных записи
+            user_id = selected[0]
+            data.update({
+                "token": tokens[user_id],
+                CONF_ADDRESS: addresses[user_id],
+                CONF_USER_ID: user_id,
+            })
+            return addresses[user_id], data
 
-async def get_token(session: aiohttp.ClientSession, username: str, password: str) -> str | None:
-    """Получение токена авторизации."""
-    url = f"{BASE_URL}/auth/mobile"
-    payload = {"username": username, "password": password}
-    headers = {"Content-Type": "application/json"}
-    
-    try:
-        _LOGGER.debug(f"Отправка запроса авторизации для пользователя: {username}")
-        async with session.post(url, json=payload, headers=headers) as resp:
-            response_text = await resp.text()
-            _LOGGER.debug(f"Ответ сервера: {response_text}")
-            
-            if resp.status == 200:
-                try:
-                    data = await resp.json()
-                    if "TOKEN" in data:
-                        return data["TOKEN"]
-                    _LOGGER.error("Токен отсутствует в ответе")
-                except ValueError as e:
-                    _LOGGER.error(f"Ошибка разбора JSON ответа: {e}")
-            else:
-                _LOGGER.error(f"Ошибка авторизации. Статус: {resp.status}")
-    except aiohttp.ClientError as e:
-        _LOGGER.error(f"Ошибка сети при авторизации: {e}")
-    except Exception as e:
-        _LOGGER.error(f"Неожиданная ошибка при авторизации: {e}")
-    
-    return None
+        data[CONF_ADDRESSES] = [
+            {CONF_USER_ID: user_id, CONF_ADDRESS: addresses[user_id], "token": tokens[user_id]}
+            for user_id in selected
+        ]
+        return f"{self.phone_data[CONF_PHONE]} ({len(selected)} адр.)", data
 
-async def get_relay_id(session: aiohttp.ClientSession, token: str) -> str | None:
-    """Получение ID реле."""
-    url = f"{BASE_URL}/domofon/relays"
-    headers = {"Authorization": f"Bearer {token}"}
-    async with session.get(url, headers=headers) as resp:
-        if resp.status == 200:
-            data = await resp.json()
-            if "relays" in data and len(data["relays"]) > 0:
-                return data["relays"][0]["id"]  # Берем первый реле
-    return None
 
-async def open_door(session: aiohttp.ClientSession, token: str, relay_id: str) -> None:
-    """Открытие двери через API."""
-    url = f"{BASE_URL}/domofon/relays/{relay_id}/open?from=app"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    async with session.post(url, headers=headers) as resp:
-        if resp.status == 200:
-            _LOGGER.info("Дверь успешно открыта")
-        else:
-            _LOGGER.error("Ошибка открытия двери")
+class DomofonOptionsFlow(config_entries.OptionsFlow):
+    """Настройки домофона Интерсвязь."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None):
+        """Основные настройки."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_SCAN_INTERVAL,
+                    default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+                vol.Optional(
+                    CONF_SNAPSHOT_MAX_AGE,
+                    default=options.get(CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_SNAPSHOT_CACHE_SIZE,
+                    default=options.get(CONF_SNAPSHOT_CACHE_SIZE, DEFAULT_SNAPSHOT_CACHE_SIZE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MJPEG_FPS,
+                    default=options.get(CONF_MJPEG_FPS, DEFAULT_MJPEG_FPS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=25)),
+                vol.Optional(
+                    CONF_MJPEG_WIDTH,
+                    default=options.get(CONF_MJPEG_WIDTH, DEFAULT_MJPEG_WIDTH),
+                ): vol.All(vol.Coerce(int), vol.Range(min=160, max=1920)),
+                vol.Optional(
+                    CONF_WEBRTC_URL,
+                    default=options.get(CONF_WEBRTC_URL, ""),
+                ): vol.Any("", cv.url),
+                vol.Optional(
+                    CONF_CALL_EVENTS,
+                    default=options.get(CONF_CALL_EVENTS, DEFAULT_CALL_EVENTS),
+                ): bool,
+                vol.Optional(
+                    CONF_PREWARM_STREAMS,
+                    default=options.get(CONF_PREWARM_STREAMS, DEFAULT_PREWARM_STREAMS),
+                ): bool,
+                vol.Optional(
+                    CONF_ENABLED_CAMERAS,
+                    default=[
+                        camera_uuid
+                        for camera_uuid in options.get(CONF_ENABLED_CAMERAS, [])
+                        if camera_uuid in self._cameras()
+                    ],
+                ): cv.multi_select(self._cameras()),
+                vol.Optional(
+                    CONF_PRELOAD_CAMERAS,
+                    default=[
+                        camera_uuid
+                        for camera_uuid in options.get(CONF_PRELOAD_CAMERAS, [])
+                        if camera_uuid in self._cameras()
+                    ],
+                ): cv.multi_select(self._cameras()),
+                vol.Optional(
+                    CONF_CLIP_CAMERAS,
+                    default=[
+                        camera_uuid
+                        for camera_uuid in options.get(CONF_CLIP_CAMERAS, [])
+                        if camera_uuid in self._cameras()
+                    ],
+                ): cv.multi_select(self._cameras()),
+                vol.Optional(
+                    CONF_CLIP_MAX_SIZE,
+                    default=options.get(CONF_CLIP_MAX_SIZE, DEFAULT_CLIP_MAX_SIZE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                vol.Optional(
+                    CONF_CLIP_RETENTION_DAYS,
+                    default=options.get(CONF_CLIP_RETENTION_DAYS, DEFAULT_CLIP_RETENTION_DAYS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MOTION_CAMERAS,
+                    default=[
+                        camera_uuid
+                        for camera_uuid in options.get(CONF_MOTION_CAMERAS, [])
+                        if camera_uuid in self._cameras()
+                    ],
+                ): cv.multi_select(self._cameras()),
+                vol.Optional(
+                    CONF_MOTION_INTERVAL,
+                    default=options.get(CONF_MOTION_INTERVAL, DEFAULT_MOTION_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_MOTION_INTERVAL)),
+            }),
+        )
+
+    def _cameras(self) -> dict[str, str]:
+        """Камеры записи из последнего снимка координатора."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if not entry_data:
+            return {}
+        return {
+            camera["UUID"]: camera.get("NAME", camera["UUID"])
+            for camera in entry_data["coordinator"].data.cameras
+        }
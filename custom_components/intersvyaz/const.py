@@ -10,12 +10,23 @@ CONF_PHONE = "phone"
 CONF_AUTH_METHOD = "auth_method"
 CONF_SMS_CODE = "sms_code"
 CONF_ADDRESS = "address"
+CONF_ADDRESSES = "addresses"
 CONF_DEVICE_ID = "device_id"
 CONF_AUTH_ID = "auth_id"
 CONF_USER_ID = "user_id"
 CONF_UUID = "uuid"
 CONF_TOKEN = "token"
 
+# Несколько адресов в одной записи: ключ адреса в данных камер и реле,
+# адрес записей с одним адресом
+ADDRESS_KEY = "_address"
+MAIN_ADDRESS = "main"
+
+# Переопределение адресов API (локальный стенд, бенчмарки)
+CONF_BASE_URL = "base_url"
+CONF_BASE_URL_CAM = "base_url_cam"
+CONF_BASE_URL_STREAM = "base_url_stream"
+
 # Методы авторизации
 AUTH_METHOD_LOGIN = "login"
 AUTH_METHOD_PHONE = "phone"
@@ -24,3 +35,142 @@ AUTH_METHOD_PHONE = "phone"
 STEP_PHONE_NUMBER = "phone_number"
 STEP_SMS_CODE = "sms_code"
 STEP_ADDRESS_SELECT = "address_select"
+
+# Интервал обновления метаданных камер и реле (секунды)
+CONF_SCAN_INTERVAL = "scan_interval"
+DEFAULT_SCAN_INTERVAL = 600
+MIN_SCAN_INTERVAL = 60
+
+# Сигнал диспетчера с временем открытия двери, форматируется entry_id
+SIGNAL_DOOR_OPEN_LATENCY = "intersvyaz_door_open_latency_{}"
+
+# URL потоков камер
+BASE_URL_STREAM = "https://cdn.cams.is74.ru"
+
+# Параметры пула соединений к API
+MAX_CONNECTIONS_PER_HOST = 8
+MAX_CONCURRENT_REQUESTS = 8
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+# Снимки камер
+CONF_SNAPSHOT_MAX_AGE = "snapshot_max_age"
+CONF_SNAPSHOT_CACHE_SIZE = "snapshot_cache_size"
+DEFAULT_SNAPSHOT_MAX_AGE = 10
+DEFAULT_SNAPSHOT_CACHE_SIZE = 5  # мегабайт
+
+# Подготовка потоков камер
+CONF_PREWARM_STREAMS = "prewarm_streams"
+CONF_PRELOAD_CAMERAS = "preload_cameras"
+DEFAULT_PREWARM_STREAMS = False
+VARIANT_CACHE_TTL = 300
+
+# Открытие двери: таймауты (секунды), повторы и общий срок всех попыток
+DOOR_OPEN_CONNECT_TIMEOUT = 1.0
+DOOR_OPEN_ATTEMPT_TIMEOUT = 1.0
+DOOR_OPEN_RETRIES = 2
+DOOR_OPEN_BACKOFF = 0.2
+DOOR_OPEN_BUDGET = 2.0
+
+# Событие с результатом открытия двери
+EVENT_DOOR_OPEN = "intersvyaz_door_open"
+
+# Сервис открытия двери
+SERVICE_OPEN_DOOR = "open_door"
+ATTR_RELAY_ID = "relay_id"
+
+# Хранилище последней известной топологии (группы, камеры, реле)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+# События вызова домофона (long-poll)
+CONF_CALL_EVENTS = "call_events"
+DEFAULT_CALL_EVENTS = True
+CALL_EVENTS_PATH = "/domofon/calls/events"
+CALL_EVENTS_POLL_TIMEOUT = 60
+CALL_EVENTS_BACKOFF_MIN = 5
+CALL_EVENTS_BACKOFF_MAX = 300
+CALL_EVENTS_MIN_INTERVAL = 5
+DATA_CALL_LISTENERS = f"{DOMAIN}_call_listeners"
+EVENT_CALL = "intersvyaz_call"
+SIGNAL_CALL = "intersvyaz_call_{}"
+
+# Журнал вызовов и открытий (инкрементально, по курсору)
+HISTORY_PATH = "/domofon/history"
+HISTORY_PAGE_SIZE = 50
+HISTORY_SCAN_INTERVAL = 300
+HISTORY_BUFFER_SIZE = 100
+EVENT_HISTORY = "intersvyaz_history"
+
+# Камеры, включённые по умолчанию; без выбора включаются первые MAX_DEFAULT_CAMERAS
+CONF_ENABLED_CAMERAS = "enabled_cameras"
+MAX_DEFAULT_CAMERAS = 10
+
+# MJPEG для клиентов без HLS: ограничения перекодирования и простой
+CONF_MJPEG_FPS = "mjpeg_fps"
+CONF_MJPEG_WIDTH = "mjpeg_width"
+DEFAULT_MJPEG_FPS = 5
+DEFAULT_MJPEG_WIDTH = 640
+MJPEG_IDLE_TIMEOUT = 30
+
+# Запись клипов при открытии двери и вызове: буфер сегментов HLS без перекодирования
+CONF_CLIP_CAMERAS = "clip_cameras"
+CONF_CLIP_MAX_SIZE = "clip_max_size"
+CONF_CLIP_RETENTION_DAYS = "clip_retention_days"
+DEFAULT_CLIP_MAX_SIZE = 500
+DEFAULT_CLIP_RETENTION_DAYS = 7
+CLIP_PRE_SECONDS = 10
+CLIP_POST_SECONDS = 10
+CLIP_RETRY_INTERVAL = 30
+CLIP_PRUNE_INTERVAL = 3600
+CLIPS_DIR = "clips"
+CLIPS_URL = "/api/intersvyaz/clips/{entry_id}/{camera_uuid}/{filename}"
+EVENT_CLIP = "intersvyaz_clip"
+
+# Планировщик запросов: частота к одному хосту и паузы по Retry-After (секунды)
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+RATE_LIMIT_PER_SECOND = 5
+RATE_LIMIT_BURST = 10
+RETRY_AFTER_DEFAULT = 30
+RETRY_AFTER_MAX = 600
+
+# Пакетное обновление снимков: параллельность и сколько секунд после
+# последнего просмотра группа считается открытой
+SNAPSHOT_BATCH_CONCURRENCY = 3
+SNAPSHOT_VIEWER_WINDOW = 60
+GROUP_KEY = "_group"
+
+# Обнаружение движения: ключевой кадр раз в интервал, сравнение уменьшенных
+# серых кадров. Порог пикселя — по яркости 0..255, площади — доля кадра.
+CONF_MOTION_CAMERAS = "motion_cameras"
+CONF_MOTION_INTERVAL = "motion_interval"
+DEFAULT_MOTION_INTERVAL = 10
+MIN_MOTION_INTERVAL = 2
+MOTION_FRAME_WIDTH = 64
+MOTION_FRAME_HEIGHT = 36
+MOTION_PIXEL_THRESHOLD = 25
+MOTION_AREA_THRESHOLD = 0.02
+MOTION_OFF_DELAY = 30
+MOTION_MAX_DECODERS = 2
+
+# Отказы хостов: после BREAKER_FAILURE_THRESHOLD отказов подряд запросы
+# к хосту сразу завершаются ошибкой, проба — через паузу (секунды),
+# которая удваивается до максимума. Таймауты запросов без своего таймаута.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 30
+BREAKER_MAX_RESET_TIMEOUT = 300
+REQUEST_TIMEOUT = 30
+REQUEST_CONNECT_TIMEOUT = 10
+PROBE_TIMEOUT = 5
+
+# WebRTC с малой задержкой через сервер go2rtc (пустой адрес — выключено)
+CONF_WEBRTC_URL = "webrtc_url"
+WEBRTC_TIMEOUT = 10
+
+# Архив камер: интервалы записей запрашиваются по дням и страницам
+ARCHIVE_RANGES_PATH = "/api/archive/{uuid}/ranges"
+ARCHIVE_PAGE_SIZE = 100
+ARCHIVE_MAX_PAGES = 20
+ARCHIVE_DAYS = 30
+ARCHIVE_CACHE_SIZE = 200
+ARCHIVE_TODAY_TTL = 60
@@ -0,0 +1,163 @@
+"""Координатор обновления данных Интерсвязь."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+
+import aiohttp
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .addresses import item_client
+from .api import IntersvyazApiClient
+from .auth import IntersvyazAuthError
+from .const import (
+    ADDRESS_KEY,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    GROUP_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class IntersvyazData:
+    """Снимок групп, камер и реле для всех платформ."""
+
+    group_ids: list[str] = field(default_factory=list)
+    cameras: list[dict] = field(default_factory=list)
+    relays: list[dict] = field(default_factory=list)
+
+
+async def async_fetch_data(client: IntersvyazApiClient) -> IntersvyazData:
+    """Запрашивает группы с камерами и реле параллельно."""
+    (group_ids, cameras), relays = await asyncio.gather(
+        _async_fetch_cameras(client),
+        client.async_get_relays(),
+    )
+    return IntersvyazData(group_ids=group_ids, cameras=cameras, relays=relays)
+
+
+async def async_fetch_all(clients: dict[str, IntersvyazApiClient]) -> IntersvyazData:
+    """Запрашивает данные всех адресов записи параллельно.
+
+    Камеры и реле помечаются ключом адреса, чтобы платформы знали,
+    чьим токеном к ним обращаться.
+    """
+    results = await asyncio.gather(*(async_fetch_data(client) for client in clients.values()))
+    if len(results) == 1:
+        return results[0]
+
+    merged = IntersvyazData()
+    seen_uuids: set[str] = set()
+    for key, data in zip(clients, results):
+        merged.group_ids.extend(group_id for group_id in data.group_ids if group_id not in merged.group_ids)
+        # Камеры двора бывают общими для нескольких адресов
+        for camera in data.cameras:
+            if camera["UUID"] not in seen_uuids:
+                seen_uuids.add(camera["UUID"])
+                merged.cameras.append({**camera, ADDRESS_KEY: key})
+        merged.relays.extend({**relay, ADDRESS_KEY: key} for relay in data.relays)
+    return merged
+
+
+async def _async_fetch_cameras(client: IntersvyazApiClient) -> tuple[list[str], list[dict]]:
+    """Получает группы камер и состав всех групп."""
+    groups = await client.async_get_groups()
+    group_ids = [group["ID"] for group in groups if group.get("ID")]
+    if not group_ids:
+        _LOGGER.error("Не удалось получить group_id")
+        return [], []
+
+    results = await asyncio.gather(
+        *(client.async_get_cameras(group_id) for group_id in group_ids)
+    )
+
+    # Одна камера может входить в несколько групп
+    cameras: dict[str, dict] = {}
+    for group_id, group_cameras in zip(group_ids, results):
+        for camera in group_cameras:
+            if "UUID" in camera:
+                cameras.setdefault(camera["UUID"], {**camera, GROUP_KEY: group_id})
+
+    if not cameras:
+        _LOGGER.error("Не удалось получить информацию о камерах")
+    return group_ids, list(cameras.values())
+
+
+class IntersvyazDataUpdateCoordinator(DataUpdateCoordinator[IntersvyazData]):
+    """Получает метаданные камер и реле всех адресов одним обновлением."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, clients: dict[str, IntersvyazApiClient]
+    ) -> None:
+        """Инициализация координатора (клиенты по ключам адресов)."""
+        scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=scan_interval),
+            # Неизменившийся снимок не будит сущности
+            always_update=False,
+        )
+        self.clients = clients
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, storage_key(entry.entry_id))
+
+    async def async_load_cached(self) -> bool:
+        """Загружает последний сохранённый снимок, если он есть."""
+        stored = await self._store.async_load()
+        if not stored:
+            return False
+        try:
+            self.data = IntersvyazData(**stored)
+        except TypeError:
+            _LOGGER.warning("Сохранённые данные устарели, ждём ответа API")
+            return False
+        return True
+
+    def camera_client(self, camera_uuid: str) -> IntersvyazApiClient:
+        """Клиент адреса камеры: у адресов разные токены."""
+        camera = next(
+            (camera for camera in self.data.cameras if camera.get("UUID") == camera_uuid), {}
+        )
+        return item_client(self.clients, camera)
+
+    async def _async_update_data(self) -> IntersvyazData:
+        """Запрашивает группы, камеры и реле параллельно.
+
+        Ошибка любого запроса (в том числе ответ не 200) оставляет
+        предыдущий снимок: UpdateFailed не заменяет self.data. Так же
+        считается сбоем ответ без камер или без реле, если они были:
+        иначе кнопки и камеры пропали бы до следующего удачного опроса.
+        """
+        try:
+            data = await async_fetch_all(self.clients)
+        except IntersvyazAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise UpdateFailed(f"Ошибка связи с API Интерсвязь: {err}") from err
+
+        if self.data is not None:
+            if self.data.cameras and not data.cameras:
+                raise UpdateFailed("API не вернул камеры, оставлен прежний список")
+            if self.data.relays and not data.relays:
+                raise UpdateFailed("API не вернул реле, оставлен прежний список")
+
+        if data != self.data and (data.cameras or data.relays):
+            self._store.async_delay_save(lambda: asdict(data), STORAGE_SAVE_DELAY)
+        return data
+
+
+def storage_key(entry_id: str) -> str:
+    """Ключ хранилища записи."""
+    return f"{DOMAIN}.{entry_id}"
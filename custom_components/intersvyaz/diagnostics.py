@@ -0,0 +1,52 @@
+"""Диагностика интеграции Интерсвязь."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_ADDRESS,
+    CONF_AUTH_ID,
+    CONF_DEVICE_ID,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_TOKEN,
+    CONF_USER_ID,
+    CONF_USERNAME,
+    DOMAIN,
+)
+
+TO_REDACT = {
+    CONF_ADDRESS,
+    CONF_AUTH_ID,
+    CONF_DEVICE_ID,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_TOKEN,
+    CONF_USER_ID,
+    CONF_USERNAME,
+    "title",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Диагностика записи конфигурации."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    data = coordinator.data
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "group_count": len(data.group_ids),
+            "camera_count": len(data.cameras),
+            "relay_count": len(data.relays),
+        },
+        "api_metrics": entry_data["client"].metrics.as_dict(),
+    }
@@ -0,0 +1,66 @@
+"""Открытие двери домофона Интерсвязь."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .api import IntersvyazApiClient
+from .auth import IntersvyazAuthError
+from .const import EVENT_DOOR_OPEN, SIGNAL_DOOR_OPEN_LATENCY
+from .coordinator import IntersvyazDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_open_door(
+    hass: HomeAssistant,
+    entry_id: str,
+    client: IntersvyazApiClient,
+    coordinator: IntersvyazDataUpdateCoordinator,
+    relay_id: str,
+) -> None:
+    """Открывает дверь и сообщает результат в Home Assistant.
+
+    Результат публикуется событием intersvyaz_door_open, при ошибке
+    выбрасывается HomeAssistantError.
+    """
+    started = time.monotonic()
+    error: str | None = None
+    status: int | None = None
+
+    try:
+        status = await client.async_open_door(relay_id)
+    except IntersvyazAuthError as err:
+        error = str(err)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        error = f"Нет ответа от сервера: {err!r}"
+    else:
+        if status in (403, 404):
+            # Реле могло смениться, запрашиваем список заново
+            hass.async_create_task(coordinator.async_request_refresh())
+        if status != 200:
+            error = f"Сервер ответил HTTP {status}"
+
+    latency_ms = (time.monotonic() - started) * 1000
+    hass.bus.async_fire(
+        EVENT_DOOR_OPEN,
+        {
+            "entry_id": entry_id,
+            "relay_id": relay_id,
+            "success": error is None,
+            "status": status,
+            "latency_ms": round(latency_ms, 1),
+            "error": error,
+        },
+    )
+
+    if error is not None:
+        raise HomeAssistantError(f"Не удалось открыть дверь: {error}")
+
+    async_dispatcher_send(hass, SIGNAL_DOOR_OPEN_LATENCY.format(entry_id), latency_ms)
@@ -0,0 +1,59 @@
+import logging
+from homeassistant.components.event import EventDeviceClass, EventEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .addresses import address_device_info, entry_addresses, primary_address
+from .const import ADDRESS_KEY, SIGNAL_CALL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Тип события вызова домофона
+EVENT_TYPE_RING = "ring"
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Настройка сущностей событий домофона: по одной на адрес."""
+    async_add_entities(DomofonCallEvent(entry, address["key"]) for address in entry_addresses(entry))
+
+class DomofonCallEvent(EventEntity):
+    """Вызов домофона."""
+
+    _attr_device_class = EventDeviceClass.DOORBELL
+    _attr_event_types = [EVENT_TYPE_RING]
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry, address_key: str) -> None:
+        """Инициализация сущности."""
+        self._entry = entry
+        self._address_key = address_key
+        self._attr_name = "Вызов домофона"
+        # Сущность первого адреса сохраняет прежний unique_id
+        if address_key == primary_address(entry):
+            self._attr_unique_id = f"{entry.entry_id}_call"
+        else:
+            self._attr_unique_id = f"{entry.entry_id}_{address_key}_call"
+
+        # Добавляем информацию об устройстве
+        self._attr_device_info = address_device_info(entry, address_key)
+
+    async def async_added_to_hass(self) -> None:
+        """Подписка на события вызова."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_CALL.format(self._entry.entry_id), self._handle_call
+            )
+        )
+
+    @callback
+    def _handle_call(self, event: dict) -> None:
+        """Отмечает вызов своего адреса."""
+        if event.get(ADDRESS_KEY) != self._address_key:
+            return
+        self._trigger_event(
+            EVENT_TYPE_RING, {key: value for key, value in event.items() if key != ADDRESS_KEY}
+        )
+        self.async_write_ha_state()
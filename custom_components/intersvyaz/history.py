@@ -0,0 +1,143 @@
+"""Синхронизация журнала вызовов и открытий двери."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+import aiohttp
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import IntersvyazApiClient, IntersvyazApiError
+from .auth import IntersvyazAuthError
+from .const import (
+    DOMAIN,
+    EVENT_HISTORY,
+    HISTORY_BUFFER_SIZE,
+    HISTORY_SCAN_INTERVAL,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _first(record: dict, *keys: str) -> Any:
+    """Первое непустое значение из нескольких возможных полей."""
+    for key in keys:
+        if record.get(key) not in (None, ""):
+            return record[key]
+    return None
+
+
+def parse_time(value: Any) -> datetime | None:
+    """Время записи журнала: unix-время или строка ISO."""
+    if isinstance(value, (int, float)):
+        return dt_util.utc_from_timestamp(value)
+    if isinstance(value, str):
+        parsed = dt_util.parse_datetime(value)
+        if parsed is not None and parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+        return parsed
+    return None
+
+
+def normalize_record(record: dict) -> dict:
+    """Приводит запись журнала к общему виду."""
+    return {
+        "id": str(_first(record, "ID", "id")),
+        "type": str(_first(record, "TYPE", "type") or "call").lower(),
+        "time": _first(record, "DATE", "CREATED_AT", "TIME", "time"),
+        "opened_by": _first(record, "OPENED_BY", "SOURCE", "USER_NAME"),
+        "relay_id": _first(record, "RELAY_ID", "relay_id"),
+        "snapshot_url": _first(record, "SNAPSHOT_URL", "IMAGE_URL", "SNAPSHOT"),
+    }
+
+
+class HistoryCoordinator(DataUpdateCoordinator[list[dict]]):
+    """Журнал вызовов и открытий с инкрементальной загрузкой.
+
+    Запрашиваются только записи после сохранённого курсора (ID последней
+    записи). В памяти хранится ограниченное число последних записей.
+    Если сервер не знает журнала (404), опрос прекращается до перезагрузки
+    записи.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: IntersvyazApiClient) -> None:
+        """Инициализация координатора."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_history",
+            update_interval=timedelta(seconds=HISTORY_SCAN_INTERVAL),
+            always_update=False,
+        )
+        self._entry = entry
+        self.client = client
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, history_storage_key(entry.entry_id))
+        self._records: deque[dict] = deque(maxlen=HISTORY_BUFFER_SIZE)
+        self._cursor: str | None = None
+        self._unsupported = False
+
+    async def async_load(self) -> None:
+        """Загружает курсор и последние записи."""
+        stored = await self._store.async_load() or {}
+        self._cursor = stored.get("cursor")
+        self._records.extend(stored.get("records", []))
+        self.data = list(self._records)
+
+    async def _async_update_data(self) -> list[dict]:
+        """Получает новые записи после курсора."""
+        if self._unsupported:
+            return list(self._records)
+        try:
+            raw_records = await self.client.async_get_history(self._cursor)
+        except IntersvyazAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except IntersvyazApiError as err:
+            if err.status == 404:
+                _LOGGER.warning("Сервер не поддерживает журнал домофона, опрос остановлен")
+                self._unsupported = True
+                self.update_interval = None
+            raise UpdateFailed(f"Ошибка получения журнала: {err}") from err
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise UpdateFailed(f"Ошибка получения журнала: {err}") from err
+
+        new_records = [normalize_record(record) for record in raw_records]
+        if not new_records:
+            return list(self._records)
+
+        first_sync = self._cursor is None
+        for record in new_records:
+            self._records.append(record)
+            # При первой синхронизации не засыпаем шину старыми событиями
+            if not first_sync:
+                self.hass.bus.async_fire(
+                    EVENT_HISTORY, {"entry_id": self._entry.entry_id, **record}
+                )
+        self._cursor = new_records[-1]["id"]
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+        return list(self._records)
+
+    def _data_to_save(self) -> dict:
+        """Данные для хранилища."""
+        return {"cursor": self._cursor, "records": list(self._records)}
+
+    def last_record(self, record_type: str) -> dict | None:
+        """Последняя запись указанного типа."""
+        for record in reversed(self.data or []):
+            if record["type"] == record_type:
+                return record
+        return None
+
+
+def history_storage_key(entry_id: str) -> str:
+    """Ключ хранилища журнала записи."""
+    return f"{DOMAIN}.{entry_id}.history"
@@ -0,0 +1,153 @@
+"""Разбор и кэширование HLS-плейлистов камер Интерсвязь."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .api import IntersvyazApiClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_best_variant(playlist: str, playlist_url: str, lowest: bool = False) -> str | None:
+    """Возвращает абсолютный URL варианта с наибольшим BANDWIDTH.
+
+    С lowest=True — с наименьшим: для анализа кадров качество не нужно.
+    """
+    best_url: str | None = None
+    best_bandwidth = -1
+    bandwidth: int | None = None
+
+    for line in playlist.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            bandwidth = 0
+            for attribute in line.split(":", 1)[1].split(","):
+                name, _, value = attribute.partition("=")
+                if name == "BANDWIDTH" and value.isdigit():
+                    bandwidth = int(value)
+        elif line and not line.startswith("#") and bandwidth is not None:
+            better = bandwidth < best_bandwidth if lowest else bandwidth > best_bandwidth
+            if best_url is None or better:
+                best_bandwidth = bandwidth
+                best_url = urljoin(playlist_url, line)
+            bandwidth = None
+
+    if best_url is None:
+        return None
+    return _with_token(best_url, playlist_url)
+
+
+def parse_media_playlist(
+    playlist: str, playlist_url: str
+) -> tuple[float, list[tuple[int, float, str]]]:
+    """Разбирает медиаплейлист: целевая длительность и сегменты.
+
+    Сегмент — номер в последовательности, длительность и абсолютный URL.
+    """
+    target_duration = 2.0
+    sequence = 0
+    duration: float | None = None
+    segments: list[tuple[int, float, str]] = []
+
+    for line in playlist.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-TARGETDURATION:"):
+            target_duration = float(line.split(":", 1)[1] or target_duration)
+        elif line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.split(":", 1)[1] or 0)
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",", 1)[0] or 0)
+        elif line and not line.startswith("#") and duration is not None:
+            segments.append(
+                (sequence, duration, _with_token(urljoin(playlist_url, line), playlist_url))
+            )
+            sequence += 1
+            duration = None
+
+    return target_duration, segments
+
+
+def _with_token(url: str, playlist_url: str) -> str:
+    """Добавляет строку запроса плейлиста (с токеном) к URL без токена."""
+    # Токен передаётся в строке запроса, без него сервер не отдаст данные
+    query = urlsplit(playlist_url).query
+    if query and "token=" not in url:
+        url += ("&" if "?" in url else "?") + query
+    return url
+
+
+class VariantCache:
+    """URL вариантов HLS-потоков камер, получаемые заранее.
+
+    Параллельные запросы для одной камеры объединяются в один.
+    С lowest=True кэшируется вариант с наименьшим битрейтом.
+    Плейлист камеры запрашивается клиентом её адреса: токен из URL
+    мастер-плейлиста переходит в URL варианта.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        camera_client: Callable[[str], IntersvyazApiClient],
+        ttl: float,
+        lowest: bool = False,
+    ) -> None:
+        """Инициализация кэша; camera_client возвращает клиент по UUID камеры."""
+        self._hass = hass
+        self._camera_client = camera_client
+        self._ttl = ttl
+        self._lowest = lowest
+        self._variants: dict[str, tuple[float, str]] = {}
+        self._pending: dict[str, asyncio.Task[str | None]] = {}
+
+    def get(self, camera_uuid: str) -> str | None:
+        """Возвращает URL варианта, если он ещё не устарел."""
+        cached = self._variants.get(camera_uuid)
+        if cached is not None and time.monotonic() - cached[0] < self._ttl:
+            return cached[1]
+        return None
+
+    async def async_resolve(self, camera_uuid: str) -> str | None:
+        """Получает мастер-плейлист и кэширует нужный вариант."""
+        task = self._pending.get(camera_uuid)
+        if task is None:
+            task = self._hass.async_create_task(self._async_resolve(camera_uuid))
+            self._pending[camera_uuid] = task
+        return await asyncio.shield(task)
+
+    async def _async_resolve(self, camera_uuid: str) -> str | None:
+        """Запрос и разбор мастер-плейлиста."""
+        client = self._camera_client(camera_uuid)
+        url = client.stream_url(camera_uuid)
+        try:
+            playlist = await client.async_fetch_text(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Не удалось получить плейлист камеры %s: %s", camera_uuid, err)
+            return None
+        finally:
+            self._pending.pop(camera_uuid, None)
+
+        variant = parse_best_variant(playlist, url, self._lowest) if playlist else None
+        if variant:
+            self._variants[camera_uuid] = (time.monotonic(), variant)
+        return variant
+
+    async def async_prewarm(self, camera_uuids: list[str]) -> None:
+        """Заранее получает варианты для списка камер."""
+        await asyncio.gather(*(self.async_resolve(camera_uuid) for camera_uuid in camera_uuids))
+
+    def invalidate(self, camera_uuid: str) -> None:
+        """Сбрасывает вариант одной камеры, если его плейлист не открылся."""
+        self._variants.pop(camera_uuid, None)
+
+    def clear(self) -> None:
+        """Сбрасывает кэш, например после смены токена."""
+        self._variants.clear()
@@ -0,0 +1,296 @@
+"""Медиаисточник Интерсвязь: клипы и архив камер."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from http import HTTPStatus
+from pathlib import Path
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.media_player import MediaClass, MediaType
+from homeassistant.components.media_source import (
+    BrowseMediaSource,
+    MediaSource,
+    MediaSourceItem,
+    PlayMedia,
+    Unresolvable,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .addresses import item_client
+from .api import IntersvyazApiClient
+from .archive import ArchiveTimeline, day_bounds, hours_with_records
+from .clips import CLIP_EXTENSIONS, clips_directory
+from .const import ARCHIVE_DAYS, CLIPS_URL, DOMAIN
+
+MIME_TYPES = {".mp4": "video/mp4", ".ts": "video/mp2t"}
+HLS_MIME_TYPE = "application/vnd.apple.mpegurl"
+
+
+async def async_get_media_source(hass: HomeAssistant) -> IntersvyazMediaSource:
+    """Медиаисточник интеграции."""
+    hass.http.register_view(ClipView(hass))
+    return IntersvyazMediaSource(hass)
+
+
+def _camera_names(hass: HomeAssistant) -> dict[str, str]:
+    """Имена камер всех записей по UUID."""
+    names = {}
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        for camera in entry_data["coordinator"].data.cameras:
+            names[camera["UUID"]] = camera.get("NAME", camera["UUID"])
+    return names
+
+
+def _archive_camera(
+    hass: HomeAssistant, entry_id: str, camera_uuid: str
+) -> tuple[IntersvyazApiClient, ArchiveTimeline, str]:
+    """Клиент адреса камеры, кэш архива записи и имя камеры."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+    camera = entry_data and next(
+        (camera for camera in entry_data["coordinator"].data.cameras if camera["UUID"] == camera_uuid),
+        None,
+    )
+    if not camera:
+        raise Unresolvable(f"Неизвестная камера: {camera_uuid}")
+    return (
+        item_client(entry_data["clients"], camera),
+        entry_data["archive"],
+        camera.get("NAME", camera_uuid),
+    )
+
+
+def _parse_day(value: str) -> date:
+    """День из идентификатора ``ГГГГ-ММ-ДД``."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError as err:
+        raise Unresolvable(f"Неизвестный день: {value}") from err
+
+
+def _valid_name(name: str) -> bool:
+    """Имя файла или каталога без перехода по путям."""
+    return bool(name) and name not in (".", "..") and Path(name).name == name
+
+
+class IntersvyazMediaSource(MediaSource):
+    """Клипы камер, сохранённые при открытии двери и вызове, и архив камер.
+
+    Идентификаторы клипов: ``clips``, ``clips/<entry_id>/<uuid>``,
+    ``clips/<entry_id>/<uuid>/<файл>``. Архива: ``archive``,
+    ``archive/<entry_id>/<uuid>``, ``archive/<entry_id>/<uuid>/<день>``,
+    ``archive/<entry_id>/<uuid>/<день>/<час>``.
+    """
+
+    name = "Интерсвязь"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Инициализация."""
+        super().__init__(DOMAIN)
+        self.hass = hass
+
+    async def async_resolve_media(self, item: MediaSourceItem) -> PlayMedia:
+        """URL клипа или архивного потока для воспроизведения."""
+        parts = (item.identifier or "").split("/")
+        if len(parts) == 5 and parts[0] == "archive":
+            return await self._async_resolve_archive(*parts[1:])
+        if len(parts) != 4 or parts[0] != "clips" or not all(map(_valid_name, parts[1:])):
+            raise Unresolvable(f"Неизвестный клип: {item.identifier}")
+        _, entry_id, camera_uuid, filename = parts
+        mime_type = MIME_TYPES.get(Path(filename).suffix)
+        if mime_type is None:
+            raise Unresolvable(f"Неизвестный клип: {item.identifier}")
+        url = CLIPS_URL.format(entry_id=entry_id, camera_uuid=camera_uuid, filename=filename)
+        return PlayMedia(url, mime_type)
+
+    async def _async_resolve_archive(
+        self, entry_id: str, camera_uuid: str, day_id: str, hour_id: str
+    ) -> PlayMedia:
+        """Архивный плейлист с начала записи в выбранном часе и текущим токеном."""
+        client, timeline, _ = _archive_camera(self.hass, entry_id, camera_uuid)
+        day = _parse_day(day_id)
+        if not hour_id.isdigit() or not 0 <= int(hour_id) < 24:
+            raise Unresolvable(f"Неизвестный час: {hour_id}")
+        hours = hours_with_records(await timeline.async_day(client, camera_uuid, day), day)
+        start = hours.get(int(hour_id)) or day_bounds(day)[0] + timedelta(hours=int(hour_id))
+        return PlayMedia(client.archive_url(camera_uuid, int(start.timestamp())), HLS_MIME_TYPE)
+
+    async def async_browse_media(self, item: MediaSourceItem) -> BrowseMediaSource:
+        """Каталоги клипов и архива."""
+        parts = [part for part in (item.identifier or "").split("/") if part]
+        if not all(map(_valid_name, parts)):
+            raise Unresolvable(f"Неизвестный каталог: {item.identifier}")
+        if not parts:
+            return self._folder(
+                "",
+                self.name,
+                [self._folder("clips", "Клипы камер"), self._folder("archive", "Архив камер")],
+                MediaClass.DIRECTORY,
+            )
+        if parts[0] == "archive":
+            return await self._async_browse_archive(parts[1:])
+        if parts[0] != "clips":
+            raise Unresolvable(f"Неизвестный каталог: {item.identifier}")
+        if len(parts) == 3:
+            return await self._async_browse_camera(parts[1], parts[2])
+        return await self._async_browse_clips()
+
+    async def _async_browse_archive(self, parts: list[str]) -> BrowseMediaSource:
+        """Архив: камеры, дни, часы с записями."""
+        if not parts:
+            return self._folder(
+                "archive",
+                "Архив камер",
+                [
+                    self._folder(f"archive/{entry_id}/{camera['UUID']}", camera.get("NAME", camera["UUID"]))
+                    for entry_id, entry_data in self.hass.data.get(DOMAIN, {}).items()
+                    for camera in entry_data["coordinator"].data.cameras
+                ],
+                MediaClass.DIRECTORY,
+            )
+        if len(parts) == 2:
+            return self._browse_archive_days(*parts)
+        if len(parts) == 3:
+            return await self._async_browse_archive_hours(*parts)
+        raise Unresolvable(f"Неизвестный каталог: archive/{'/'.join(parts)}")
+
+    def _browse_archive_days(self, entry_id: str, camera_uuid: str) -> BrowseMediaSource:
+        """Последние ARCHIVE_DAYS дней; интервалы здесь ещё не запрашиваются."""
+        _, _, name = _archive_camera(self.hass, entry_id, camera_uuid)
+        today = dt_util.now().date()
+        return self._folder(
+            f"archive/{entry_id}/{camera_uuid}",
+            name,
+            [
+                self._folder(
+                    f"archive/{entry_id}/{camera_uuid}/{day.isoformat()}",
+                    day.strftime("%d.%m.%Y"),
+                )
+                for day in (today - timedelta(days=offset) for offset in range(ARCHIVE_DAYS))
+            ],
+            MediaClass.DIRECTORY,
+        )
+
+    async def _async_browse_archive_hours(
+        self, entry_id: str, camera_uuid: str, day_id: str
+    ) -> BrowseMediaSource:
+        """Часы дня с записями: интервалы загружаются только для этого дня."""
+        client, timeline, name = _archive_camera(self.hass, entry_id, camera_uuid)
+        day = _parse_day(day_id)
+        hours = hours_with_records(await timeline.async_day(client, camera_uuid, day), day)
+        return self._folder(
+            f"archive/{entry_id}/{camera_uuid}/{day_id}",
+            f"{name}, {day.strftime('%d.%m.%Y')}",
+            [
+                BrowseMediaSource(
+                    domain=DOMAIN,
+                    identifier=f"archive/{entry_id}/{camera_uuid}/{day_id}/{hour:02d}",
+                    media_class=MediaClass.VIDEO,
+                    media_content_type=HLS_MIME_TYPE,
+                    title=f"{hour:02d}:00",
+                    can_play=True,
+                    can_expand=False,
+                )
+                for hour in hours
+            ],
+        )
+
+    async def _async_browse_clips(self) -> BrowseMediaSource:
+        """Камеры, для которых есть клипы."""
+        entry_ids = list(self.hass.data.get(DOMAIN, {}))
+
+        def _list_cameras() -> list[tuple[str, str]]:
+            return [
+                (entry_id, path.name)
+                for entry_id in entry_ids
+                if (directory := clips_directory(self.hass, entry_id)).is_dir()
+                for path in sorted(directory.iterdir())
+                if path.is_dir()
+            ]
+
+        cameras = await self.hass.async_add_executor_job(_list_cameras)
+        names = _camera_names(self.hass)
+        return self._folder(
+            "clips",
+            "Клипы камер",
+            [
+                self._folder(f"clips/{entry_id}/{camera_uuid}", names.get(camera_uuid, camera_uuid))
+                for entry_id, camera_uuid in cameras
+            ],
+        )
+
+    async def _async_browse_camera(self, entry_id: str, camera_uuid: str) -> BrowseMediaSource:
+        """Клипы одной камеры, новые сверху."""
+        directory = clips_directory(self.hass, entry_id) / camera_uuid
+
+        def _list_clips() -> list[str]:
+            if not directory.is_dir():
+                return []
+            return sorted(
+                (path.name for path in directory.iterdir() if path.suffix in CLIP_EXTENSIONS),
+                reverse=True,
+            )
+
+        clips = await self.hass.async_add_executor_job(_list_clips)
+        title = _camera_names(self.hass).get(camera_uuid, camera_uuid)
+        return self._folder(
+            f"clips/{entry_id}/{camera_uuid}",
+            title,
+            [
+                BrowseMediaSource(
+                    domain=DOMAIN,
+                    identifier=f"clips/{entry_id}/{camera_uuid}/{filename}",
+                    media_class=MediaClass.VIDEO,
+                    media_content_type=MIME_TYPES[Path(filename).suffix],
+                    title=filename.rsplit(".", 1)[0],
+                    can_play=True,
+                    can_expand=False,
+                )
+                for filename in clips
+            ],
+        )
+
+    @staticmethod
+    def _folder(
+        identifier: str,
+        title: str,
+        children: list[BrowseMediaSource] | None = None,
+        children_media_class: MediaClass = MediaClass.VIDEO,
+    ) -> BrowseMediaSource:
+        """Каталог медиаисточника."""
+        return BrowseMediaSource(
+            domain=DOMAIN,
+            identifier=identifier,
+            media_class=MediaClass.DIRECTORY,
+            media_content_type=MediaType.VIDEO,
+            title=title,
+            can_play=False,
+            can_expand=True,
+            children=children,
+            children_media_class=children_media_class,
+        )
+
+
+class ClipView(HomeAssistantView):
+    """Отдаёт файлы клипов по подписанной ссылке."""
+
+    url = CLIPS_URL
+    name = "api:intersvyaz:clips"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Инициализация."""
+        self.hass = hass
+
+    async def get(
+        self, request: web.Request, entry_id: str, camera_uuid: str, filename: str
+    ) -> web.StreamResponse:
+        """Файл клипа."""
+        if not all(map(_valid_name, (entry_id, camera_uuid, filename))):
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        if Path(filename).suffix not in CLIP_EXTENSIONS:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        path = clips_directory(self.hass, entry_id) / camera_uuid / filename
+        if not await self.hass.async_add_executor_job(path.is_file):
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        return web.FileResponse(path)
@@ -0,0 +1,98 @@
+"""Счётчики и задержки запросов к API Интерсвязь."""
+from __future__ import annotations
+
+import bisect
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Верхние границы корзин гистограммы задержек (миллисекунды)
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+@dataclass
+class EndpointStats:
+    """Статистика одного эндпоинта."""
+
+    requests: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    last_ms: float | None = None
+    # Последняя корзина — всё, что дольше последней границы
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    @property
+    def mean_ms(self) -> float | None:
+        """Средняя задержка."""
+        if not self.requests:
+            return None
+        return self.total_ms / self.requests
+
+    def percentile_ms(self, percentile: float) -> float | None:
+        """Оценка перцентиля по гистограмме (верхняя граница корзины)."""
+        if not self.requests:
+            return None
+        threshold = self.requests * percentile / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[index])
+                break
+        # Перцентиль за пределами гистограммы
+        return None
+
+    def as_dict(self) -> dict:
+        """Представление для диагностики."""
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_ms": round(self.mean_ms, 1) if self.mean_ms is not None else None,
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+            "p50_ms": self.percentile_ms(50),
+            "p95_ms": self.percentile_ms(95),
+            "histogram_ms": dict(zip(labels, self.buckets)),
+        }
+
+
+class _Sample:
+    """Результат одного замера, ошибку отмечает вызывающий код."""
+
+    error = False
+
+
+class ApiMetrics:
+    """Статистика запросов по эндпоинтам."""
+
+    def __init__(self) -> None:
+        """Инициализация."""
+        self.endpoints: dict[str, EndpointStats] = {}
+
+    @contextmanager
+    def measure(self, endpoint: str) -> Iterator[_Sample]:
+        """Замеряет запрос; исключение считается ошибкой."""
+        sample = _Sample()
+        started = time.monotonic()
+        try:
+            yield sample
+        except BaseException:
+            sample.error = True
+            raise
+        finally:
+            self.record(endpoint, (time.monotonic() - started) * 1000, sample.error)
+
+    def record(self, endpoint: str, latency_ms: float, error: bool) -> None:
+        """Добавляет замер."""
+        stats = self.endpoints.setdefault(endpoint, EndpointStats())
+        stats.requests += 1
+        stats.errors += int(error)
+        stats.total_ms += latency_ms
+        stats.last_ms = latency_ms
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def as_dict(self) -> dict:
+        """Представление для диагностики."""
+        return {endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()}
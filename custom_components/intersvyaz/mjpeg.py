@@ -0,0 +1,187 @@
+"""MJPEG-поток камеры: один процесс ffmpeg на всех зрителей."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
+
+from aiohttp import web
+from homeassistant.components.ffmpeg import get_ffmpeg_manager
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+READ_CHUNK_SIZE = 64 * 1024
+# Больше этого без найденного кадра — поток испорчен, буфер сбрасывается
+MAX_BUFFER_SIZE = 4 * 1024 * 1024
+BOUNDARY = "frame"
+
+
+class MjpegBroadcaster:
+    """Раздаёт кадры одного процесса ffmpeg всем зрителям камеры.
+
+    ffmpeg запускается с первым зрителем и останавливается, если
+    зрителей нет дольше idle_timeout. Медленный зритель пропускает
+    кадры и получает последний, остальных он не задерживает.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        source: Callable[[], str],
+        fps: int,
+        width: int,
+        idle_timeout: float,
+    ) -> None:
+        """Инициализация."""
+        self._hass = hass
+        self._name = name
+        self._source = source
+        self._fps = fps
+        self._width = width
+        self._idle_timeout = idle_timeout
+        self._condition = asyncio.Condition()
+        self._frame: bytes | None = None
+        self._frame_id = 0
+        self._viewers = 0
+        self._alive = False
+        self._task: asyncio.Task | None = None
+        self._cancel_idle: CALLBACK_TYPE | None = None
+
+    @property
+    def running(self) -> bool:
+        """Идёт ли перекодирование."""
+        return self._task is not None and not self._task.done()
+
+    async def async_frames(self) -> AsyncIterator[bytes]:
+        """Кадры JPEG для одного зрителя."""
+        self._viewers += 1
+        if self._cancel_idle is not None:
+            self._cancel_idle()
+            self._cancel_idle = None
+        if not self.running:
+            self._alive = True
+            self._frame = None
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), f"intersvyaz_mjpeg_{self._name}"
+            )
+
+        # Новый зритель сразу получает последний кадр, если он есть
+        last_id = self._frame_id - 1 if self._frame is not None else self._frame_id
+        try:
+            while True:
+                async with self._condition:
+                    await self._condition.wait_for(
+                        lambda: self._frame_id != last_id or not self._alive
+                    )
+                    if self._frame_id == last_id:
+                        return
+                    last_id = self._frame_id
+                    frame = self._frame
+                yield frame
+        finally:
+            self._viewers -= 1
+            if self._viewers == 0 and self.running:
+                self._cancel_idle = async_call_later(
+                    self._hass, self._idle_timeout, self._async_idle_stop
+                )
+
+    @callback
+    def _async_idle_stop(self, _now) -> None:
+        """Останавливает ffmpeg, если зрители так и не появились."""
+        self._cancel_idle = None
+        if self._viewers == 0 and self._task is not None:
+            _LOGGER.debug("MJPEG %s: зрителей нет, ffmpeg остановлен", self._name)
+            self._task.cancel()
+
+    async def async_stop(self) -> None:
+        """Останавливает перекодирование (выгрузка сущности)."""
+        if self._cancel_idle is not None:
+            self._cancel_idle()
+            self._cancel_idle = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _async_run(self) -> None:
+        """Читает ffmpeg и публикует каждый полный кадр."""
+        # haffmpeg загружается только при первом MJPEG-зрителе
+        from haffmpeg.camera import CameraMjpeg
+
+        ffmpeg = CameraMjpeg(get_ffmpeg_manager(self._hass).binary)
+        # Без звука, с ограничением частоты и ширины кадра; на выходе
+        # поток JPEG подряд, кадры разделяются по маркерам SOI/EOI
+        started = await ffmpeg.open(
+            cmd=["-an", "-c:v", "mjpeg", "-q:v", "7"],
+            input_source=self._source(),
+            output="-f image2pipe -",
+            extra_cmd=f"-vf \"fps={self._fps},scale='min({self._width},iw)':-2\"",
+        )
+        try:
+            if not started:
+                _LOGGER.warning("MJPEG %s: не удалось запустить ffmpeg", self._name)
+                return
+            reader = await ffmpeg.get_reader()
+            buffer = bytearray()
+            while chunk := await reader.read(READ_CHUNK_SIZE):
+                buffer += chunk
+                for frame in _extract_frames(buffer):
+                    await self._async_publish(frame)
+                if len(buffer) > MAX_BUFFER_SIZE:
+                    buffer.clear()
+            _LOGGER.debug("MJPEG %s: ffmpeg завершился", self._name)
+        finally:
+            if started:
+                await ffmpeg.close()
+            async with self._condition:
+                self._alive = False
+                self._condition.notify_all()
+
+    async def _async_publish(self, frame: bytes) -> None:
+        """Отдаёт кадр ожидающим зрителям."""
+        async with self._condition:
+            self._frame = frame
+            self._frame_id += 1
+            self._condition.notify_all()
+
+
+def _extract_frames(buffer: bytearray) -> list[bytes]:
+    """Вырезает из буфера все полные кадры JPEG."""
+    frames = []
+    while (start := buffer.find(JPEG_SOI)) != -1:
+        end = buffer.find(JPEG_EOI, start + 2)
+        if end == -1:
+            del buffer[:start]
+            break
+        frames.append(bytes(buffer[start : end + 2]))
+        del buffer[: end + 2]
+    return frames
+
+
+async def async_stream_mjpeg(
+    request: web.Request, broadcaster: MjpegBroadcaster
+) -> web.StreamResponse:
+    """Отдаёт зрителю поток multipart/x-mixed-replace."""
+    response = web.StreamResponse()
+    response.content_type = f"multipart/x-mixed-replace;boundary={BOUNDARY}"
+    await response.prepare(request)
+    async with aclosing(broadcaster.async_frames()) as frames:
+        try:
+            async for frame in frames:
+                await response.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(frame)}\r\n\r\n".encode()
+                    + frame
+                    + b"\r\n"
+                )
+        except ConnectionResetError:
+            pass
+    return response
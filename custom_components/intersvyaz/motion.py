@@ -0,0 +1,249 @@
+"""Локальное обнаружение движения по HLS-потокам камер Интерсвязь.
+
+Раз в интервал берётся последний сегмент самого лёгкого варианта потока,
+ffmpeg декодирует из него только первый ключевой кадр в маленькое
+серое изображение, и кадр сравнивается с предыдущим. Сравнение идёт
+на NumPy в пуле потоков, не в цикле событий.
+
+Нагрузка ограничена: одновременно работает не больше
+MOTION_MAX_DECODERS процессов ffmpeg на все камеры, и если декодеры
+заняты, отсчёт камеры пропускается. Процессорное время ffmpeg и
+сравнения замеряется для каждой камеры.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import aiohttp
+from homeassistant.components.ffmpeg import get_ffmpeg_manager
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .api import IntersvyazApiClient
+from .const import (
+    MOTION_AREA_THRESHOLD,
+    MOTION_FRAME_HEIGHT,
+    MOTION_FRAME_WIDTH,
+    MOTION_MAX_DECODERS,
+    MOTION_OFF_DELAY,
+    MOTION_PIXEL_THRESHOLD,
+)
+from .hls import VariantCache, parse_media_playlist
+
+_LOGGER = logging.getLogger(__name__)
+
+# Итоговая строка ffmpeg -benchmark: процессорное время процесса
+_BENCH_RE = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s")
+
+
+@dataclass
+class MotionStats:
+    """Замеры детектора одной камеры."""
+
+    samples: int = 0
+    skipped: int = 0
+    changed_area: float | None = None
+    decode_cpu: float = 0.0
+    analysis_cpu: float = 0.0
+    started: float = 0.0
+
+    @property
+    def cpu_load(self) -> float | None:
+        """Доля одного ядра, которую занимает камера, в процентах."""
+        elapsed = time.monotonic() - self.started
+        if not self.samples or elapsed <= 0:
+            return None
+        return (self.decode_cpu + self.analysis_cpu) / elapsed * 100
+
+
+def numpy_available() -> bool:
+    """Есть ли NumPy; импорт тяжёлый, поэтому вызывать в пуле потоков."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def frame_difference(previous: bytes, current: bytes) -> tuple[float, float]:
+    """Доля изменившихся пикселей и затраченное процессорное время.
+
+    Из кадров вычитается средняя яркость, чтобы смена освещения
+    или переключение ИК-подсветки не считались движением.
+    """
+    import numpy as np
+
+    started = time.thread_time()
+    before = np.frombuffer(previous, dtype=np.uint8).astype(np.int16)
+    after = np.frombuffer(current, dtype=np.uint8).astype(np.int16)
+    delta = np.abs((after - int(after.mean())) - (before - int(before.mean())))
+    changed = np.count_nonzero(delta > MOTION_PIXEL_THRESHOLD) / delta.size
+    return float(changed), time.thread_time() - started
+
+
+class MotionAnalyzer:
+    """Общие для всех камер записи ограничения декодирования."""
+
+    def __init__(self, hass: HomeAssistant, max_decoders: int = MOTION_MAX_DECODERS) -> None:
+        """Инициализация."""
+        self._hass = hass
+        self._decoders = asyncio.Semaphore(max_decoders)
+
+    async def async_decode(self, segment: bytes) -> tuple[bytes, float] | None:
+        """Первый ключевой кадр сегмента и процессорное время ffmpeg.
+
+        Возвращает None, если все декодеры заняты: отсчёт лучше
+        пропустить, чем копить очередь.
+        """
+        if self._decoders.locked():
+            return None
+        async with self._decoders:
+            return await self._async_decode(segment)
+
+    async def _async_decode(self, segment: bytes) -> tuple[bytes, float] | None:
+        """Запуск ffmpeg для одного кадра."""
+        process = await asyncio.create_subprocess_exec(
+            get_ffmpeg_manager(self._hass).binary,
+            "-hide_banner", "-nostats", "-benchmark",
+            "-threads", "1",
+            "-skip_frame", "nokey",
+            "-f", "mpegts", "-i", "pipe:0",
+            "-frames:v", "1", "-an",
+            "-vf", f"scale={MOTION_FRAME_WIDTH}:{MOTION_FRAME_HEIGHT}:flags=area,format=gray",
+            "-f", "rawvideo", "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await process.communicate(segment)
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        if len(stdout) != MOTION_FRAME_WIDTH * MOTION_FRAME_HEIGHT:
+            _LOGGER.debug("Не удалось декодировать кадр: %s", stderr.decode(errors="replace")[-200:])
+            return None
+        match = _BENCH_RE.search(stderr.decode(errors="replace"))
+        cpu = float(match.group(1)) + float(match.group(2)) if match else 0.0
+        return stdout, cpu
+
+    async def async_compare(self, previous: bytes, current: bytes) -> tuple[float, float]:
+        """Сравнение кадров в пуле потоков."""
+        return await self._hass.async_add_executor_job(frame_difference, previous, current)
+
+
+class MotionDetector:
+    """Детектор движения одной камеры."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: IntersvyazApiClient,
+        variants: VariantCache,
+        analyzer: MotionAnalyzer,
+        camera_uuid: str,
+        interval: float,
+    ) -> None:
+        """Инициализация детектора."""
+        self._hass = hass
+        self._client = client
+        self._variants = variants
+        self._analyzer = analyzer
+        self.camera_uuid = camera_uuid
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self._listeners: list[Callable[[], None]] = []
+        self._previous: bytes | None = None
+        self._last_sequence: int | None = None
+        self._last_motion: float | None = None
+        self.stats = MotionStats()
+
+    @property
+    def motion(self) -> bool:
+        """Было ли движение за последние MOTION_OFF_DELAY секунд."""
+        return (
+            self._last_motion is not None
+            and time.monotonic() - self._last_motion < MOTION_OFF_DELAY
+        )
+
+    def start(self) -> None:
+        """Запускает отсчёты в фоне."""
+        self.stats = MotionStats(started=time.monotonic())
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"intersvyaz_motion_{self.camera_uuid}"
+        )
+
+    async def async_stop(self) -> None:
+        """Останавливает отсчёты."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._previous = None
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Подписка на смену состояния движения."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def _async_run(self) -> None:
+        """Отсчёт раз в интервал."""
+        while True:
+            was_motion = self.motion
+            try:
+                await self._async_sample()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as err:
+                _LOGGER.debug("Детектор движения камеры %s: %s", self.camera_uuid, err)
+            if self.motion != was_motion:
+                for listener in list(self._listeners):
+                    listener()
+            await asyncio.sleep(self._interval)
+
+    async def _async_sample(self) -> None:
+        """Берёт ключевой кадр последнего сегмента и сравнивает с предыдущим."""
+        url = (
+            self._variants.get(self.camera_uuid)
+            or await self._variants.async_resolve(self.camera_uuid)
+            # Без мастер-плейлиста поток и есть медиаплейлист
+            or self._client.stream_url(self.camera_uuid)
+        )
+        playlist = await self._client.async_fetch_text(url)
+        if not playlist:
+            self._variants.invalidate(self.camera_uuid)
+            return
+        _, segments = parse_media_playlist(playlist, url)
+        if not segments:
+            return
+        sequence, _, segment_url = segments[-1]
+        if sequence == self._last_sequence:
+            # Нового сегмента нет — нет и нового ключевого кадра
+            return
+
+        data = await self._client.async_fetch_bytes(segment_url)
+        if not data:
+            return
+        decoded = await self._analyzer.async_decode(data)
+        if decoded is None:
+            self.stats.skipped += 1
+            return
+        frame, decode_cpu = decoded
+        self._last_sequence = sequence
+        self.stats.samples += 1
+        self.stats.decode_cpu += decode_cpu
+
+        previous, self._previous = self._previous, frame
+        if previous is None:
+            return
+        changed, analysis_cpu = await self._analyzer.async_compare(previous, frame)
+        self.stats.changed_area = changed
+        self.stats.analysis_cpu += analysis_cpu
+        if changed >= MOTION_AREA_THRESHOLD:
+            self._last_motion = time.monotonic()
@@ -0,0 +1,358 @@
+"""Планировщик запросов к API Интерсвязь с учётом ограничений сервера."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum, StrEnum
+from typing import Any, TypeVar
+
+import aiohttp
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    DATA_SCHEDULER,
+    MAX_CONCURRENT_REQUESTS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+    RETRY_AFTER_DEFAULT,
+    RETRY_AFTER_MAX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Хост, пробой которого служит текущий запрос (на время его слота)
+_probe_host: ContextVar[str | None] = ContextVar("intersvyaz_probe_host", default=None)
+
+
+class Priority(IntEnum):
+    """Классы запросов: меньше — важнее."""
+
+    OPEN = 0
+    AUTH = 1
+    MEDIA = 2
+    METADATA = 3
+
+
+class BreakerState(StrEnum):
+    """Состояние связи с хостом."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """Хост недоступен, запрос не отправлялся."""
+
+
+class TokenBucket:
+    """Ограничение частоты запросов к одному хосту."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Инициализация: rate токенов в секунду, не больше capacity."""
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Пополняет ведро за прошедшее время."""
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Через сколько секунд появится токен."""
+        self._refill(now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+
+    def take(self, now: float) -> None:
+        """Забирает токен; открытие двери может увести баланс в минус."""
+        self._refill(now)
+        self._tokens -= 1
+
+
+class CircuitBreaker:
+    """Отказы одного хоста.
+
+    После threshold отказов подряд (ошибка соединения, таймаут, 5xx)
+    хост считается недоступным, и запросы к нему сразу завершаются
+    ошибкой. Когда пауза истекает, один запрос проходит пробой: успех
+    возвращает хост, отказ удваивает паузу.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float, max_reset_timeout: float) -> None:
+        """Инициализация."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self._threshold = threshold
+        self._base_timeout = reset_timeout
+        self._reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+
+    def allow(self, now: float) -> bool:
+        """Можно ли отправить запрос; первый после паузы становится пробой."""
+        if self.state == BreakerState.CLOSED:
+            return True
+        if self.probe_due(now):
+            self.state = BreakerState.HALF_OPEN
+            return True
+        return False
+
+    def probe_due(self, now: float) -> bool:
+        """Истекла ли пауза недоступного хоста."""
+        return self.state == BreakerState.OPEN and now >= self.opened_until
+
+    def success(self) -> bool:
+        """Хост ответил; True, если он снова стал доступен."""
+        recovered = self.state != BreakerState.CLOSED
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self._reset_timeout = self._base_timeout
+        return recovered
+
+    def failure(self, now: float, probe: bool = False) -> bool:
+        """Хост не ответил; True, если он только что стал недоступен.
+
+        Во время пробы её исход решает только сама проба (probe=True).
+        """
+        self.failures += 1
+        if self.state == BreakerState.HALF_OPEN:
+            if not probe:
+                return False
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+        elif self.state == BreakerState.OPEN or self.failures < self._threshold:
+            return False
+        lost = self.state == BreakerState.CLOSED
+        self.state = BreakerState.OPEN
+        self.opened_until = now + self._reset_timeout
+        return lost
+
+    def abort_probe(self) -> None:
+        """Проба прервана без ответа: следующий запрос пробует снова."""
+        if self.state == BreakerState.HALF_OPEN:
+            self.state = BreakerState.OPEN
+
+
+class RequestScheduler:
+    """Очередь запросов с приоритетами, общая для всех записей.
+
+    Запрос получает слот, когда есть свободное место, у хоста есть
+    токен и сервер не просил подождать (Retry-After). Ожидающие
+    обслуживаются по приоритету. Открытие двери не ждёт токена и
+    Retry-After, и для него всегда держится один свободный слот,
+    поэтому фоновые обновления не задерживают дверь.
+
+    Для каждого хоста ведётся CircuitBreaker: пока хост недоступен,
+    запросы к нему не ждут таймаута, а сразу получают CircuitOpenError.
+    Открытие двери пропускается всегда и само может вернуть хост.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: float = RATE_LIMIT_BURST,
+    ) -> None:
+        """Инициализация."""
+        self._max_concurrent = max_concurrent
+        self._rate = rate
+        self._burst = burst
+        self._active = 0
+        self._counter = itertools.count()
+        self._waiters: list[tuple[int, int, str, asyncio.Future[None]]] = []
+        self._buckets: dict[str, TokenBucket] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._wakeup: asyncio.TimerHandle | None = None
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._listeners: list[Callable[[str], None]] = []
+
+    @asynccontextmanager
+    async def async_slot(self, host: str, priority: Priority) -> AsyncIterator[None]:
+        """Ожидает очереди запроса и занимает слот на время запроса.
+
+        Ошибки соединения и таймауты внутри слота считаются отказами хоста.
+        Открытие двери не проверяет CircuitBreaker и никогда не становится
+        пробой, поэтому не может прервать чужую пробу.
+        """
+        breaker = self._breaker(host)
+        probe = False
+        if priority != Priority.OPEN:
+            if not breaker.allow(time.monotonic()):
+                raise CircuitOpenError(f"Нет связи с {host}, запрос не отправлен")
+            # allow() переводит хост в HALF_OPEN только для пробы
+            probe = breaker.state == BreakerState.HALF_OPEN
+        probe_token = _probe_host.set(host if probe else None)
+        try:
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._counter), host, future))
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Слот мог быть выдан одновременно с отменой
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+            try:
+                yield
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.record_failure(host)
+                raise
+            finally:
+                self._release()
+        finally:
+            _probe_host.reset(probe_token)
+            if probe:
+                breaker.abort_probe()
+
+    def retry_after(self, host: str, header: str | None) -> None:
+        """Запоминает, что сервер просил не обращаться к хосту какое-то время."""
+        delay = _parse_retry_after(header)
+        until = time.monotonic() + delay
+        if until > self._blocked_until.get(host, 0):
+            _LOGGER.warning("Сервер %s ограничил частоту запросов, пауза %.0f с", host, delay)
+            self._blocked_until[host] = until
+
+    def record_response(self, host: str, status: int) -> None:
+        """Учитывает ответ хоста: 5xx — отказ, остальное — хост на связи."""
+        if status >= 500:
+            self.record_failure(host)
+        elif self._breaker(host).success():
+            _LOGGER.info("Связь с %s восстановлена", host)
+            self._notify(host)
+
+    def record_failure(self, host: str) -> None:
+        """Учитывает отказ хоста."""
+        if self._breaker(host).failure(time.monotonic(), probe=_probe_host.get() == host):
+            _LOGGER.warning("Нет связи с %s, запросы приостановлены", host)
+            self._notify(host)
+
+    def host_state(self, host: str) -> BreakerState:
+        """Состояние связи с хостом."""
+        return self._breaker(host).state
+
+    def host_available(self, host: str) -> bool:
+        """Доступен ли хост."""
+        return self._breaker(host).state == BreakerState.CLOSED
+
+    def probe_due(self, host: str) -> bool:
+        """Пора ли проверить недоступный хост."""
+        return self._breaker(host).probe_due(time.monotonic())
+
+    def async_add_listener(self, listener: Callable[[str], None]) -> CALLBACK_TYPE:
+        """Подписка на смену доступности хостов."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self, host: str) -> None:
+        """Сообщает подписчикам о смене доступности хоста."""
+        for listener in list(self._listeners):
+            listener(host)
+
+    async def async_dedupe(self, key: Hashable, factory: Callable[[], Awaitable[_T]]) -> _T:
+        """Объединяет одинаковые запросы, которые выполняются одновременно."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Отмена одного ожидающего не отменяет запрос для остальных
+        return await asyncio.shield(task)
+
+    def _release(self) -> None:
+        """Освобождает слот."""
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Выдаёт слоты ожидающим по приоритету."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = time.monotonic()
+        deferred = []
+        next_wakeup: float | None = None
+        while self._waiters:
+            item = heapq.heappop(self._waiters)
+            priority, _, host, future = item
+            if future.done():
+                continue
+
+            # Последний слот держим для открытия двери
+            limit = self._max_concurrent if priority == Priority.OPEN else self._max_concurrent - 1
+            if self._active >= limit:
+                deferred.append(item)
+                if priority != Priority.OPEN:
+                    # Остальные ожидающие не важнее этого
+                    break
+                continue
+
+            wait = 0.0 if priority == Priority.OPEN else self._wait_time(host, now)
+            if wait > 0:
+                deferred.append(item)
+                next_wakeup = wait if next_wakeup is None else min(next_wakeup, wait)
+                continue
+
+            self._bucket(host).take(now)
+            self._active += 1
+            future.set_result(None)
+
+        for item in deferred:
+            heapq.heappush(self._waiters, item)
+        if next_wakeup is not None:
+            self._wakeup = asyncio.get_running_loop().call_later(next_wakeup, self._dispatch)
+
+    def _wait_time(self, host: str, now: float) -> float:
+        """Сколько ещё ждать запросу к хосту."""
+        blocked = self._blocked_until.get(host, 0) - now
+        return max(blocked, self._bucket(host).wait_time(now))
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        """Учёт отказов хоста."""
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(
+                BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, BREAKER_MAX_RESET_TIMEOUT
+            )
+        return self._breakers[host]
+
+    def _bucket(self, host: str) -> TokenBucket:
+        """Ведро токенов хоста."""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self._rate, self._burst)
+        return self._buckets[host]
+
+
+def _parse_retry_after(header: str | None) -> float:
+    """Задержка из заголовка Retry-After: секунды или HTTP-дата."""
+    delay: float = RETRY_AFTER_DEFAULT
+    if header:
+        if header.strip().isdigit():
+            delay = float(header)
+        else:
+            try:
+                delay = parsedate_to_datetime(header).timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass
+    return min(max(delay, 0.0), RETRY_AFTER_MAX)
+
+
+def async_get_scheduler(hass: HomeAssistant) -> RequestScheduler:
+    """Общий планировщик: ограничения сервера действуют на все записи сразу."""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = RequestScheduler()
+    return hass.data[DATA_SCHEDULER]
@@ -0,0 +1,187 @@
+import logging
+from datetime import timedelta
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .addresses import address_device_info, primary_address
+from .const import DOMAIN, SIGNAL_DOOR_OPEN_LATENCY
+from .history import HistoryCoordinator, parse_time
+from .metrics import ApiMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Сенсоры задержек API опрашивают счётчики в памяти, в сеть не ходят
+SCAN_INTERVAL = timedelta(seconds=60)
+
+# Эндпоинты, для которых создаются сенсоры задержки
+API_ENDPOINTS = {
+    "auth": "авторизация",
+    "relays": "реле",
+    "get-group": "группы камер",
+    "open": "открытие двери",
+}
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Настройка диагностических сенсоров."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    metrics: ApiMetrics = entry_data["client"].metrics
+    history: HistoryCoordinator = entry_data["history"]
+    entities: list[SensorEntity] = [
+        DoorOpenLatencySensor(entry),
+        LastCallSensor(entry, history),
+        LastOpenedBySensor(entry, history),
+    ]
+    entities.extend(
+        ApiLatencySensor(entry, metrics, endpoint, label)
+        for endpoint, label in API_ENDPOINTS.items()
+    )
+    async_add_entities(entities)
+
+def _device_info(entry: ConfigEntry) -> dict:
+    """Информация об устройстве домофона."""
+    return address_device_info(entry, primary_address(entry))
+
+class DoorOpenLatencySensor(SensorEntity):
+    """Время от нажатия кнопки до ответа 200 на открытие двери."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-outline"
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Инициализация сенсора."""
+        self._entry = entry
+        self._attr_name = "Время открытия двери"
+        self._attr_unique_id = f"{entry.entry_id}_door_open_latency"
+
+        # Добавляем информацию об устройстве
+        self._attr_device_info = _device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Подписка на замеры времени открытия."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DOOR_OPEN_LATENCY.format(self._entry.entry_id),
+                self._handle_latency,
+            )
+        )
+
+    @callback
+    def _handle_latency(self, latency_ms: float) -> None:
+        """Обновляет значение сенсора."""
+        self._attr_native_value = round(latency_ms, 1)
+        self.async_write_ha_state()
+
+class ApiLatencySensor(SensorEntity):
+    """Средняя задержка запросов к одному эндпоинту API."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-sand"
+
+    def __init__(self, entry: ConfigEntry, metrics: ApiMetrics, endpoint: str, label: str) -> None:
+        """Инициализация сенсора."""
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._attr_name = f"Задержка API: {label}"
+        self._attr_unique_id = f"{entry.entry_id}_api_latency_{endpoint}"
+        self._attr_device_info = _device_info(entry)
+
+    async def async_update(self) -> None:
+        """Берёт значения из счётчиков клиента."""
+        stats = self._metrics.endpoints.get(self._endpoint)
+        if stats is None:
+            return
+        summary = stats.as_dict()
+        self._attr_native_value = summary["mean_ms"]
+        self._attr_extra_state_attributes = {
+            "requests": summary["requests"],
+            "errors": summary["errors"],
+            "last_ms": summary["last_ms"],
+            "p50_ms": summary["p50_ms"],
+            "p95_ms": summary["p95_ms"],
+        }
+
+class HistorySensor(CoordinatorEntity[HistoryCoordinator], SensorEntity):
+    """Сенсор по последней записи журнала указанного типа."""
+
+    _record_type: str
+
+    def __init__(self, entry: ConfigEntry, coordinator: HistoryCoordinator) -> None:
+        """Инициализация сенсора."""
+        super().__init__(coordinator)
+        self._attr_device_info = _device_info(entry)
+
+    @property
+    def _record(self) -> dict | None:
+        """Последняя запись журнала нужного типа."""
+        return self.coordinator.last_record(self._record_type)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Данные последней записи."""
+        record = self._record
+        if record is None:
+            return None
+        return {
+            "time": record["time"],
+            "relay_id": record["relay_id"],
+            "snapshot_url": record["snapshot_url"],
+        }
+
+class LastCallSensor(HistorySensor):
+    """Время последнего вызова домофона."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:phone-incoming"
+    _record_type = "call"
+
+    def __init__(self, entry: ConfigEntry, coordinator: HistoryCoordinator) -> None:
+        """Инициализация сенсора."""
+        super().__init__(entry, coordinator)
+        self._attr_name = "Последний вызов"
+        self._attr_unique_id = f"{entry.entry_id}_last_call"
+
+    @property
+    def native_value(self):
+        """Время вызова."""
+        record = self._record
+        return parse_time(record["time"]) if record else None
+
+class LastOpenedBySensor(HistorySensor):
+    """Кто последним открыл дверь."""
+
+    _attr_icon = "mdi:door-open"
+    _record_type = "open"
+
+    def __init__(self, entry: ConfigEntry, coordinator: HistoryCoordinator) -> None:
+        """Инициализация сенсора."""
+        super().__init__(entry, coordinator)
+        self._attr_name = "Последним открыл"
+        self._attr_unique_id = f"{entry.entry_id}_last_opened_by"
+
+    @property
+    def native_value(self) -> str | None:
+        """Источник последнего открытия."""
+        record = self._record
+        return record["opened_by"] if record else None
@@ -0,0 +1,66 @@
+"""Сервисы интеграции Интерсвязь."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from .const import ATTR_RELAY_ID, DOMAIN, SERVICE_OPEN_DOOR
+from .addresses import item_address
+from .door import async_open_door
+
+_LOGGER = logging.getLogger(__name__)
+
+OPEN_DOOR_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_RELAY_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Регистрация сервисов интеграции."""
+
+    async def async_handle_open_door(call: ServiceCall) -> None:
+        """Открывает одну или несколько дверей параллельно."""
+        targets = []
+        for relay_id in call.data[ATTR_RELAY_ID]:
+            target = _find_relay_entry(hass, relay_id)
+            if target is None:
+                raise HomeAssistantError(f"Реле {relay_id} не найдено")
+            targets.append((target, relay_id))
+
+        results = await asyncio.gather(
+            *(
+                async_open_door(
+                    hass,
+                    entry_id,
+                    entry_data["clients"].get(address) or entry_data["client"],
+                    entry_data["coordinator"],
+                    relay_id,
+                )
+                for (entry_id, entry_data, address), relay_id in targets
+            ),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise HomeAssistantError("; ".join(str(error) for error in errors))
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_OPEN_DOOR, async_handle_open_door, schema=OPEN_DOOR_SCHEMA
+    )
+
+
+def _find_relay_entry(hass: HomeAssistant, relay_id: str) -> tuple[str, dict, str] | None:
+    """Находит запись конфигурации и адрес, которым принадлежит реле."""
+    for entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
+        coordinator = entry_data["coordinator"]
+        for relay in coordinator.data.relays:
+            if str(relay.get("RELAY_ID")) == relay_id:
+                return entry_id, entry_data, item_address(relay)
+    return None
@@ -0,0 +1,242 @@
+"""Кэш снимков камер Интерсвязь."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+
+from homeassistant.components.camera import Image
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import SNAPSHOT_VIEWER_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    """JPEG-кадры камер в памяти с ограничением по возрасту и объёму.
+
+    Параллельные запросы кадра одной камеры объединяются: пока идёт
+    декодирование, остальные ждут его результат, а не запускают ffmpeg.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_age: float, max_bytes: int) -> None:
+        """Инициализация кэша."""
+        self._hass = hass
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+        self._images: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._pending: dict[str, asyncio.Task[bytes | None]] = {}
+
+    async def async_get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[bytes | None]],
+        width: int | None = None,
+        height: int | None = None,
+    ) -> bytes | None:
+        """Возвращает свежий кадр из кэша или получает новый через fetch.
+
+        Если заданы ширина и высота, кадр уменьшается один раз на каждый
+        размер и хранится рядом с исходным до его обновления: новый
+        исходный кадр удаляет уменьшенные копии старого.
+        """
+        image = await self._async_get_full(key, fetch)
+        if image is None or width is None or height is None:
+            return image
+
+        scaled_key = f"{key}@{width}x{height}"
+        source = self._images.get(key)
+        scaled = self._images.get(scaled_key)
+        if source is not None and scaled is not None and scaled[0] >= source[0]:
+            self._images.move_to_end(scaled_key)
+            return scaled[1]
+
+        scaled_image = await self._hass.async_add_executor_job(
+            scale_jpeg_camera_image, Image("image/jpeg", image), width, height
+        )
+        # Пока кадр уменьшался, исходный мог обновиться: старую копию не сохраняем
+        if source is not None and self._images.get(key) is source:
+            self._store(scaled_key, scaled_image, source[0])
+        return scaled_image
+
+    async def async_refresh(self, key: str, fetch: Callable[[], Awaitable[bytes | None]]) -> None:
+        """Обновляет кадр заранее, если он скоро устареет."""
+        cached = self._images.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._max_age / 2:
+            return
+        await asyncio.shield(self._async_start_fetch(key, fetch))
+
+    def _async_start_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> asyncio.Task[bytes | None]:
+        """Запускает получение кадра или возвращает уже идущее."""
+        task = self._pending.get(key)
+        if task is None:
+            task = self._hass.async_create_task(self._async_fetch(key, fetch))
+            self._pending[key] = task
+        return task
+
+    async def _async_get_full(
+        self, key: str, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Кадр в исходном размере."""
+        cached = self._images.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._max_age:
+            self._images.move_to_end(key)
+            return cached[1]
+
+        image = await asyncio.shield(self._async_start_fetch(key, fetch))
+        if image is None and cached is not None:
+            # Лучше устаревший кадр, чем пустая плитка
+            return cached[1]
+        return image
+
+    async def _async_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Получает кадр и кладёт его в кэш."""
+        try:
+            image = await fetch()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Не удалось получить снимок камеры %s: %s", key, err)
+            image = None
+        finally:
+            # После clear() под этим ключом может идти уже другое получение
+            if self._pending.get(key) is asyncio.current_task():
+                del self._pending[key]
+
+        if image:
+            self._store(key, image)
+        return image
+
+    def _store(self, key: str, image: bytes, fetched_at: float | None = None) -> None:
+        """Сохраняет кадр, вытесняя самые старые при превышении объёма."""
+        self._discard(key)
+        if len(image) > self._max_bytes:
+            return
+
+        self._images[key] = (fetched_at if fetched_at is not None else time.monotonic(), image)
+        self._size += len(image)
+        while self._size > self._max_bytes:
+            old_key = next(iter(self._images))
+            self._discard(old_key)
+
+    def _discard(self, key: str) -> None:
+        """Удаляет кадр из кэша вместе с его уменьшенными копиями."""
+        keys = [key]
+        if "@" not in key:
+            keys.extend(other for other in self._images if other.startswith(f"{key}@"))
+        for old_key in keys:
+            cached = self._images.pop(old_key, None)
+            if cached is not None:
+                self._size -= len(cached[1])
+
+    def clear(self) -> None:
+        """Очищает кэш и отменяет идущие получения кадров.
+
+        Иначе после выгрузки записи они положили бы кадры обратно.
+        """
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+        self._images.clear()
+        self._size = 0
+
+
+class SnapshotRefresher:
+    """Пакетное обновление снимков, пока их кто-то смотрит.
+
+    Когда открыта панель с камерами, Home Assistant запрашивает кадр
+    каждой камеры отдельно. Здесь кадры всех камер группы, которую
+    недавно смотрели, обновляются заранее одним проходом с ограничением
+    параллельности, и запросы панели попадают в кэш. Если зрителей
+    нет, обновление останавливается.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, cache: SnapshotCache, interval: float, concurrency: int
+    ) -> None:
+        """Инициализация."""
+        self._hass = hass
+        self._cache = cache
+        self._interval = timedelta(seconds=interval)
+        self._concurrency = concurrency
+        self._cameras: dict[str, tuple[str | None, Callable[[], Awaitable[bytes | None]]]] = {}
+        self._viewed: dict[str, float] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+        self._running = False
+
+    @callback
+    def async_register(
+        self, key: str, group: str | None, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> CALLBACK_TYPE:
+        """Добавляет камеру в пакетное обновление."""
+        self._cameras[key] = (group, fetch)
+
+        @callback
+        def _remove() -> None:
+            self._cameras.pop(key, None)
+            self._viewed.pop(key, None)
+            if not self._cameras:
+                self.async_stop()
+
+        return _remove
+
+    @callback
+    def async_mark_viewed(self, key: str) -> None:
+        """Отмечает просмотр кадра и включает обновление."""
+        # Без кэша (время жизни 0) заранее обновлять нечего
+        if not self._interval:
+            return
+        self._viewed[key] = time.monotonic()
+        if self._unsub is None:
+            self._unsub = async_track_time_interval(
+                self._hass, self._async_refresh, self._interval, cancel_on_shutdown=True
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Останавливает обновление."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    async def _async_refresh(self, _now=None) -> None:
+        """Обновляет кадры всех камер просматриваемых групп."""
+        if self._running:
+            return
+        cutoff = time.monotonic() - SNAPSHOT_VIEWER_WINDOW
+        groups = {
+            self._cameras[key][0]
+            for key, viewed in self._viewed.items()
+            if viewed >= cutoff and key in self._cameras
+        }
+        if not groups:
+            self._viewed.clear()
+            self.async_stop()
+            return
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def _refresh(key: str, fetch: Callable[[], Awaitable[bytes | None]]) -> None:
+            async with semaphore:
+                await self._cache.async_refresh(key, fetch)
+
+        self._running = True
+        try:
+            await asyncio.gather(
+                *(
+                    _refresh(key, fetch)
+                    for key, (group, fetch) in self._cameras.items()
+                    if group in groups
+                )
+            )
+        finally:
+            self._running = False
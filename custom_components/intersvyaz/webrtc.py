@@ -0,0 +1,74 @@
+"""WebRTC с малой задержкой через сервер go2rtc.
+
+go2rtc забирает HLS-поток камеры один раз на всех зрителей и отдаёт
+его по WebRTC без перекодирования видео. Интеграция только регистрирует
+поток камеры на сервере и передаёт ему SDP-предложение браузера.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import aiohttp
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import WEBRTC_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Go2rtcClient:
+    """Клиент HTTP API go2rtc (или совместимого сервера)."""
+
+    def __init__(self, session: aiohttp.ClientSession, url: str) -> None:
+        """Инициализация: url — адрес API, например http://localhost:1984."""
+        self._session = session
+        self._url = url.rstrip("/")
+        self._timeout = aiohttp.ClientTimeout(total=WEBRTC_TIMEOUT)
+        # Источники, уже зарегистрированные на сервере, по имени потока
+        self._sources: dict[str, str] = {}
+        self._lock = asyncio.Lock()
+
+    async def async_register(self, name: str, source: str) -> None:
+        """Создаёт поток на сервере или меняет его источник (новый токен)."""
+        async with self._lock:
+            if self._sources.get(name) == source:
+                return
+            try:
+                async with self._session.put(
+                    f"{self._url}/api/streams",
+                    params={"name": name, "src": source},
+                    timeout=self._timeout,
+                ) as resp:
+                    if resp.status >= 400:
+                        raise HomeAssistantError(f"go2rtc не принял поток {name}: HTTP {resp.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                raise HomeAssistantError(f"go2rtc недоступен: {err}") from err
+            self._sources[name] = source
+
+    async def async_offer(self, name: str, offer_sdp: str) -> str:
+        """Передаёт SDP-предложение и возвращает ответ сервера."""
+        try:
+            async with self._session.post(
+                f"{self._url}/api/webrtc",
+                params={"src": name},
+                data=offer_sdp,
+                headers={"Content-Type": "application/sdp"},
+                timeout=self._timeout,
+            ) as resp:
+                if resp.status != 200:
+                    # Поток мог пропасть после перезапуска сервера
+                    self._sources.pop(name, None)
+                    raise HomeAssistantError(f"go2rtc отклонил WebRTC для {name}: HTTP {resp.status}")
+                return await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise HomeAssistantError(f"go2rtc недоступен: {err}") from err
+
+    def forget(self, name: str) -> None:
+        """Следующая регистрация потока обязательно уйдёт на сервер."""
+        self._sources.pop(name, None)
+
+
+def webrtc_stream_name(camera_uuid: str) -> str:
+    """Имя потока камеры на сервере go2rtc."""
+    return f"intersvyaz_{camera_uuid}"
@@ -0,0 +1,99 @@
+"""Общие фикстуры тестов интеграции Интерсвязь.
+
+Запросы к API идут в локальный стенд ``benchmarks.fake_is74``.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import NamedTuple
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from benchmarks.fake_is74 import FakeIs74Config, FakeIs74State, async_start
+from custom_components.intersvyaz.api import IntersvyazApiClient, async_create_session
+from custom_components.intersvyaz.const import (
+    CONF_AUTH_ID,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_USER_ID,
+    CONF_USERNAME,
+)
+from custom_components.intersvyaz.scheduler import RequestScheduler
+
+
+class FakeIs74(NamedTuple):
+    """Запущенный стенд; config можно менять по ходу теста."""
+
+    config: FakeIs74Config
+    state: FakeIs74State
+    url: str
+
+
+@pytest.fixture
+async def fake_is74() -> AsyncIterator[FakeIs74]:
+    """Стенд API Интерсвязь на свободном порту."""
+    config = FakeIs74Config()
+    runner, url = await async_start(config)
+    yield FakeIs74(config, runner.app["state"], url)
+    await runner.cleanup()
+
+
+async def async_wait_for(condition: Callable[[], object], timeout: float = 5.0) -> None:
+    """Ждёт условия, которое выполняют фоновые задачи интеграции."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнено"
+        await asyncio.sleep(0.01)
+
+
+PHONE = "+79990000000"
+AUTH_ID = "fake-auth"
+USER_IDS = ("1001", "1002")
+
+
+def _client(session, fake_is74: FakeIs74, token: str | None, credentials: dict) -> IntersvyazApiClient:
+    """Клиент стенда без ограничения частоты: тесты проверяют логику, а не паузы."""
+    return IntersvyazApiClient(
+        session,
+        token,
+        credentials=credentials,
+        base_url=fake_is74.url,
+        base_url_cam=fake_is74.url,
+        base_url_stream=fake_is74.url,
+        scheduler=RequestScheduler(rate=1000, burst=1000),
+    )
+
+
+@pytest.fixture
+async def api_client(hass: HomeAssistant, fake_is74: FakeIs74) -> AsyncIterator[IntersvyazApiClient]:
+    """Клиент стенда с токеном и данными для повторной авторизации."""
+    session = async_create_session(hass)
+    bootstrap = IntersvyazApiClient(session, base_url=fake_is74.url)
+    token = await bootstrap.async_get_token("test", "test")
+    yield _client(session, fake_is74, token, {CONF_USERNAME: "test", CONF_PASSWORD: "test"})
+    await session.close()
+
+
+@pytest.fixture
+async def phone_clients(
+    hass: HomeAssistant, fake_is74: FakeIs74
+) -> AsyncIterator[dict[str, IntersvyazApiClient]]:
+    """Клиенты адресов одного телефона по USER_ID, как в записи с несколькими адресами."""
+    session = async_create_session(hass)
+    bootstrap = IntersvyazApiClient(session, base_url=fake_is74.url)
+    clients = {}
+    for user_id in USER_IDS:
+        result = await bootstrap.async_get_token_by_phone(
+            PHONE, auth_id=AUTH_ID, user_id=user_id, skip_sms=True
+        )
+        clients[user_id] = _client(
+            session,
+            fake_is74,
+            result["token"],
+            {CONF_PHONE: PHONE, CONF_AUTH_ID: AUTH_ID, CONF_USER_ID: user_id},
+        )
+    yield clients
+    await session.close()
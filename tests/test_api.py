@@ -0,0 +1,107 @@
+"""Тесты клиента API на стенде."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.intersvyaz import api as api_module
+from custom_components.intersvyaz.api import IntersvyazApiClient, IntersvyazApiError
+from custom_components.intersvyaz.auth import IntersvyazAuthError
+
+from .conftest import FakeIs74
+
+
+def _revoke_tokens(fake_is74: FakeIs74) -> None:
+    """Стенд перестаёт принимать выданные токены, как после их истечения."""
+    fake_is74.state.tokens.clear()
+
+
+async def test_concurrent_401_share_one_refresh(
+    api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Параллельные запросы с истёкшим токеном обновляют его один раз."""
+    old_token = api_client.token
+    _revoke_tokens(fake_is74)
+
+    results = await asyncio.gather(
+        *(api_client.async_get_cameras(f"yard{index}") for index in range(5))
+    )
+
+    assert all(len(cameras) == fake_is74.config.cameras_per_group for cameras in results)
+    assert api_client.token != old_token
+    # Первый токен выдан фикстуре, второй — одно общее обновление
+    assert fake_is74.state.requests["auth-mobile"] == 2
+    assert fake_is74.state.requests["get-group-cameras"] == 10
+
+
+async def test_refresh_server_error_is_not_auth_error(
+    api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Сбой сервера авторизации не требует повторной настройки."""
+    _revoke_tokens(fake_is74)
+    fake_is74.config.auth_status = 503
+
+    with pytest.raises(IntersvyazApiError):
+        await api_client.async_get_relays()
+
+
+async def test_refresh_rejected(api_client: IntersvyazApiClient, fake_is74: FakeIs74) -> None:
+    """Отказ сервера в авторизации — IntersvyazAuthError."""
+    _revoke_tokens(fake_is74)
+    fake_is74.config.auth_status = 403
+
+    with pytest.raises(IntersvyazAuthError):
+        await api_client.async_get_relays()
+
+
+async def test_server_error_raises(api_client: IntersvyazApiClient, fake_is74: FakeIs74) -> None:
+    """Ответ не 200 — ошибка, а не пустой список."""
+    fake_is74.config.error_rate = 1.0
+
+    with pytest.raises(IntersvyazApiError):
+        await api_client.async_get_relays()
+
+
+async def test_open_door_retries(
+    api_client: IntersvyazApiClient, fake_is74: FakeIs74, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Ответы 5xx повторяются, пока дверь не откроется."""
+    monkeypatch.setattr(api_module, "DOOR_OPEN_BACKOFF", 0.01)
+    fake_is74.config.open_failures = 2
+
+    assert await api_client.async_open_door("500") == 200
+    assert fake_is74.state.requests["open"] == 3
+
+
+async def test_open_door_gives_up(
+    api_client: IntersvyazApiClient, fake_is74: FakeIs74, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Число попыток ограничено, последний статус возвращается."""
+    monkeypatch.setattr(api_module, "DOOR_OPEN_BACKOFF", 0.01)
+    fake_is74.config.open_failures = 10
+
+    assert await api_client.async_open_door("500") == 503
+    assert fake_is74.state.requests["open"] == api_module.DOOR_OPEN_RETRIES + 1
+
+
+async def test_open_door_client_error_not_retried(
+    api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Ответ 4xx не повторяется."""
+    assert await api_client.async_open_door("999") == 404
+    assert fake_is74.state.requests["open"] == 1
+
+
+async def test_open_door_budget(
+    api_client: IntersvyazApiClient, fake_is74: FakeIs74, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Все попытки вместе укладываются в общий срок."""
+    monkeypatch.setattr(api_module, "DOOR_OPEN_BUDGET", 0.3)
+    fake_is74.config.latency_ms = 1000
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        await api_client.async_open_door("500")
+    assert time.monotonic() - started < 0.9
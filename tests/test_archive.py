@@ -0,0 +1,67 @@
+"""Тесты архива камер."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.intersvyaz import api as api_module, archive as archive_module
+from custom_components.intersvyaz.api import IntersvyazApiClient
+from custom_components.intersvyaz.archive import ArchiveTimeline, hours_with_records
+
+from .conftest import FakeIs74
+
+DAY = date(2024, 1, 15)
+
+
+def test_hours_with_records() -> None:
+    """Час попадает в список, если в нём есть запись; время — начало записи в часе."""
+    start = dt_util.start_of_local_day(DAY)
+    ranges = [
+        # Запись с прошлого дня: в этот день попадает только полночь
+        (start - timedelta(minutes=30), start + timedelta(minutes=20)),
+        (start + timedelta(hours=10, minutes=30), start + timedelta(hours=12, minutes=10)),
+        (start + timedelta(hours=12, minutes=40), start + timedelta(hours=12, minutes=50)),
+    ]
+    assert hours_with_records(ranges, DAY) == {
+        0: start,
+        10: start + timedelta(hours=10, minutes=30),
+        11: start + timedelta(hours=11),
+        12: start + timedelta(hours=12),
+    }
+
+
+async def test_archive_day_paging(
+    hass: HomeAssistant,
+    api_client: IntersvyazApiClient,
+    fake_is74: FakeIs74,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """День загружается постранично до неполной страницы и кэшируется."""
+    monkeypatch.setattr(api_module, "ARCHIVE_PAGE_SIZE", 5)
+    monkeypatch.setattr(archive_module, "ARCHIVE_PAGE_SIZE", 5)
+    timeline = ArchiveTimeline()
+
+    ranges = await timeline.async_day(api_client, "yard0-cam0", DAY)
+
+    # Стенд пишет по 20 минут в начале каждого часа: 24 записи, 5 страниц
+    start = dt_util.start_of_local_day(DAY)
+    assert len(ranges) == 24
+    assert ranges[0] == (start, start + timedelta(minutes=20))
+    assert fake_is74.state.requests["archive"] == 5
+    assert list(hours_with_records(ranges, DAY)) == list(range(24))
+
+    # Прошедший день не меняется и второй раз не запрашивается
+    assert await timeline.async_day(api_client, "yard0-cam0", DAY) == ranges
+    assert fake_is74.state.requests["archive"] == 5
+
+
+async def test_archive_day_unavailable(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Сбой архива без кэша — пустой список, а не исключение."""
+    fake_is74.config.error_rate = 1.0
+
+    assert await ArchiveTimeline().async_day(api_client, "yard0-cam0", DAY) == []
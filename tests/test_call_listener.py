@@ -0,0 +1,103 @@
+"""Тесты слушателя вызовов домофона на стенде."""
+from __future__ import annotations
+
+import pytest
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_capture_events
+
+from custom_components.intersvyaz import call_listener as call_listener_module
+from custom_components.intersvyaz.api import IntersvyazApiClient
+from custom_components.intersvyaz.call_listener import (
+    async_setup_call_listener,
+    async_unload_call_listener,
+)
+from custom_components.intersvyaz.const import (
+    ADDRESS_KEY,
+    CONF_ADDRESS,
+    CONF_ADDRESSES,
+    CONF_AUTH_ID,
+    CONF_PHONE,
+    CONF_USER_ID,
+    DATA_CALL_LISTENERS,
+    DOMAIN,
+    EVENT_CALL,
+    MAIN_ADDRESS,
+    SIGNAL_CALL,
+)
+
+from .conftest import AUTH_ID, PHONE, FakeIs74, async_wait_for
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Стенд отвечает сразу, пауза между запросами не нужна."""
+    monkeypatch.setattr(call_listener_module, "CALL_EVENTS_MIN_INTERVAL", 0.05)
+
+
+async def test_calls_routed_by_address(
+    hass: HomeAssistant, phone_clients: dict[str, IntersvyazApiClient], fake_is74: FakeIs74
+) -> None:
+    """Вызов приходит только записям и адресам своей квартиры.
+
+    Запись с двумя адресами слушает оба; запись того же телефона
+    с одним адресом делит соединение со вторым адресом первой.
+    """
+    both = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_PHONE: PHONE,
+            CONF_AUTH_ID: AUTH_ID,
+            CONF_ADDRESSES: [
+                {CONF_USER_ID: user_id, CONF_ADDRESS: f"кв. {user_id}", "token": client.token}
+                for user_id, client in phone_clients.items()
+            ],
+        },
+    )
+    single = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_PHONE: PHONE,
+            CONF_AUTH_ID: AUTH_ID,
+            CONF_USER_ID: "1002",
+            "token": phone_clients["1002"].token,
+        },
+    )
+    for entry in (both, single):
+        entry.add_to_hass(hass)
+
+    events = async_capture_events(hass, EVENT_CALL)
+    signals: list[dict] = []
+
+    @callback
+    def _signal(event: dict) -> None:
+        signals.append(event)
+
+    unsub = async_dispatcher_connect(hass, SIGNAL_CALL.format(both.entry_id), _signal)
+
+    fake_is74.state.push_call("1002")
+    async_setup_call_listener(hass, both, phone_clients)
+    async_setup_call_listener(hass, single, {MAIN_ADDRESS: phone_clients["1002"]})
+    # Одно соединение на квартиру, а не на запись
+    assert len(hass.data[DATA_CALL_LISTENERS]) == 2
+
+    await async_wait_for(lambda: len(events) == 2)
+    assert {(event.data["entry_id"], event.data["address"]) for event in events} == {
+        (both.entry_id, "1002"),
+        (single.entry_id, MAIN_ADDRESS),
+    }
+    assert [(signal["ID"], signal[ADDRESS_KEY]) for signal in signals] == [(1, "1002")]
+
+    fake_is74.state.push_call("1001")
+    await async_wait_for(lambda: len(events) == 3)
+    assert (events[2].data["entry_id"], events[2].data["address"]) == (both.entry_id, "1001")
+    assert [(signal["ID"], signal[ADDRESS_KEY]) for signal in signals] == [(1, "1002"), (2, "1001")]
+
+    # Соединение второй квартиры остаётся, пока его слушает другая запись
+    await async_unload_call_listener(hass, both)
+    assert len(hass.data[DATA_CALL_LISTENERS]) == 1
+    await async_unload_call_listener(hass, single)
+    assert hass.data[DATA_CALL_LISTENERS] == {}
+    unsub()
+
+    assert len(events) == 3
@@ -0,0 +1,148 @@
+"""Тесты клипов камер."""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import Event, HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.intersvyaz import clips as clips_module
+from custom_components.intersvyaz.api import IntersvyazApiClient
+from custom_components.intersvyaz.clips import ClipRecorder, SegmentBuffer
+from custom_components.intersvyaz.const import ADDRESS_KEY, EVENT_CLIP, EVENT_DOOR_OPEN
+from custom_components.intersvyaz.hls import VariantCache
+
+from .conftest import async_wait_for
+
+ENTRY_ID = "entry"
+# Камера двора первого адреса и своя камера второго
+CAMERAS = {"yard0-cam0": "1001", "self-cam0": "1002"}
+
+
+@pytest.fixture(autouse=True)
+def config_dir(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Клипы пишутся во временный каталог."""
+    hass.config.config_dir = str(tmp_path)
+
+
+@pytest.fixture
+def ffmpeg_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ffmpeg, который не может упаковать клип в MP4; сегменты ждутся без запаса."""
+    monkeypatch.setattr(
+        clips_module, "get_ffmpeg_manager", lambda hass: SimpleNamespace(binary="false")
+    )
+    monkeypatch.setattr(clips_module, "CLIP_RETRY_INTERVAL", 0)
+
+
+def _recorder(
+    hass: HomeAssistant,
+    clients: dict[str, IntersvyazApiClient],
+    post_seconds: float = 0,
+    max_bytes: int = 1024 * 1024,
+    retention_days: int = 1,
+) -> ClipRecorder:
+    """Запись клипов камер CAMERAS через клиенты их адресов."""
+    variants = VariantCache(hass, lambda camera_uuid: clients[CAMERAS[camera_uuid]], 60)
+    return ClipRecorder(
+        hass,
+        ENTRY_ID,
+        {
+            camera_uuid: SegmentBuffer(
+                hass, clients[address], variants, camera_uuid, 10, address=address
+            )
+            for camera_uuid, address in CAMERAS.items()
+        },
+        pre_seconds=10,
+        post_seconds=post_seconds,
+        max_bytes=max_bytes,
+        retention_days=retention_days,
+    )
+
+
+def _clip(directory: Path, name: str, size: int, age: float) -> Path:
+    """Файл клипа заданного размера и возраста в секундах."""
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+async def test_prune(hass: HomeAssistant) -> None:
+    """Удаляются клипы старше срока хранения и самые старые сверх объёма."""
+    recorder = ClipRecorder(
+        hass, ENTRY_ID, {}, pre_seconds=10, post_seconds=10, max_bytes=2500, retention_days=1
+    )
+    expired = _clip(recorder.directory, "cam1/expired.mp4", 100, 2 * 86400)
+    oldest = _clip(recorder.directory, "cam1/oldest.mp4", 1000, 300)
+    kept = [
+        _clip(recorder.directory, "cam2/older.ts", 1000, 200),
+        _clip(recorder.directory, "cam2/newest.mp4", 1000, 100),
+        # Чужие файлы не считаются и не удаляются
+        _clip(recorder.directory, "cam2/notes.txt", 10000, 3 * 86400),
+    ]
+
+    await recorder.async_prune()
+
+    assert not expired.exists()
+    assert not oldest.exists()
+    assert all(path.exists() for path in kept)
+
+
+async def test_call_clip_for_address(
+    hass: HomeAssistant,
+    phone_clients: dict[str, IntersvyazApiClient],
+    ffmpeg_fails: None,
+) -> None:
+    """Вызов записывает клипы камер только своего адреса; без MP4 остаётся MPEG-TS."""
+    events = async_capture_events(hass, EVENT_CLIP)
+    recorder = _recorder(hass, phone_clients)
+    recorder.start()
+    await async_wait_for(
+        lambda: all(buffer.recent(10) for buffer in recorder._buffers.values())
+    )
+
+    recorder.async_handle_call({"ID": 1, ADDRESS_KEY: "1002"})
+    await async_wait_for(lambda: events)
+    await recorder.async_stop()
+
+    assert [(event.data["camera_uuid"], event.data["reason"]) for event in events] == [
+        ("self-cam0", "call")
+    ]
+    assert not (recorder.directory / "yard0-cam0").exists()
+    [clip] = (recorder.directory / "self-cam0").iterdir()
+    assert clip.suffix == ".ts"
+    assert clip.read_bytes() == b"self-cam0:segment1;self-cam0:segment2;"
+    assert events[0].data["media_content_id"].endswith(f"/self-cam0/{clip.name}")
+
+
+async def test_stop_cancels_capture(
+    hass: HomeAssistant, phone_clients: dict[str, IntersvyazApiClient], ffmpeg_fails: None
+) -> None:
+    """Выгрузка отменяет идущую запись клипа, файл не появляется."""
+    events = async_capture_events(hass, EVENT_CLIP)
+    recorder = _recorder(hass, phone_clients, post_seconds=30)
+    recorder.start()
+
+    recorder.async_handle_door_open(
+        Event(EVENT_DOOR_OPEN, {"entry_id": ENTRY_ID, "success": True})
+    )
+    # Неудачное открытие и открытие другой записи клип не записывают
+    recorder.async_handle_door_open(
+        Event(EVENT_DOOR_OPEN, {"entry_id": ENTRY_ID, "success": False})
+    )
+    recorder.async_handle_door_open(
+        Event(EVENT_DOOR_OPEN, {"entry_id": "other", "success": True})
+    )
+    assert len(recorder._captures) == 1
+    await recorder.async_stop()
+    await hass.async_block_till_done()
+
+    assert not recorder._captures
+    assert events == []
+    assert not any(recorder.directory.glob("*/*"))
@@ -0,0 +1,212 @@
+"""Тесты координаторов данных и журнала на стенде."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_capture_events
+
+from custom_components.intersvyaz.api import IntersvyazApiClient
+from custom_components.intersvyaz.const import (
+    ADDRESS_KEY,
+    DOMAIN,
+    EVENT_HISTORY,
+    MAIN_ADDRESS,
+    STORAGE_VERSION,
+)
+from custom_components.intersvyaz.coordinator import (
+    IntersvyazDataUpdateCoordinator,
+    async_fetch_all,
+    storage_key,
+)
+from custom_components.intersvyaz.history import HistoryCoordinator
+
+from .conftest import FakeIs74
+
+
+def _entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Запись конфигурации без данных: клиенты передаются напрямую."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_fetch_all_marks_addresses(
+    phone_clients: dict[str, IntersvyazApiClient], fake_is74: FakeIs74
+) -> None:
+    """Общие камеры двора берутся один раз, реле — у каждого адреса свои."""
+    data = await async_fetch_all(phone_clients)
+
+    # Умный двор и свои камеры, по одному разу на все адреса
+    assert len(data.cameras) == 2 * fake_is74.config.cameras_per_group
+    assert {camera[ADDRESS_KEY] for camera in data.cameras} == {"1001"}
+    assert [relay[ADDRESS_KEY] for relay in data.relays] == ["1001", "1001", "1002", "1002"]
+    assert data.group_ids == ["yard0", "self"]
+
+
+async def test_coordinator_refresh(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Обновление получает камеры и реле, ключ адреса у одного адреса не ставится."""
+    coordinator = IntersvyazDataUpdateCoordinator(hass, _entry(hass), {MAIN_ADDRESS: api_client})
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert len(coordinator.data.cameras) == 2 * fake_is74.config.cameras_per_group
+    assert [relay["RELAY_ID"] for relay in coordinator.data.relays] == [500, 501]
+    assert all(ADDRESS_KEY not in camera for camera in coordinator.data.cameras)
+    assert coordinator.camera_client("yard0-cam0") is api_client
+
+
+async def test_coordinator_keeps_data_on_error(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Сбой сервера не заменяет прежний снимок."""
+    coordinator = IntersvyazDataUpdateCoordinator(hass, _entry(hass), {MAIN_ADDRESS: api_client})
+    await coordinator.async_refresh()
+    data = coordinator.data
+
+    fake_is74.config.error_rate = 1.0
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert coordinator.data is data
+
+
+async def test_coordinator_keeps_data_when_empty(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Ответ без камер или без реле при прежних данных считается сбоем."""
+    coordinator = IntersvyazDataUpdateCoordinator(hass, _entry(hass), {MAIN_ADDRESS: api_client})
+    await coordinator.async_refresh()
+    data = coordinator.data
+
+    fake_is74.config.cameras_per_group = 0
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.data is data
+
+    fake_is74.config.cameras_per_group = 8
+    fake_is74.config.relays = 0
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.data is data
+
+    fake_is74.config.relays = 1
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert [relay["RELAY_ID"] for relay in coordinator.data.relays] == [500]
+
+
+async def test_coordinator_one_group_request_fails(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Если не ответил один из запросов групп, камеры берутся из другого."""
+    coordinator = IntersvyazDataUpdateCoordinator(hass, _entry(hass), {MAIN_ADDRESS: api_client})
+    fake_is74.config.self_cams_status = 500
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data.group_ids == ["yard0"]
+    assert len(coordinator.data.cameras) == fake_is74.config.cameras_per_group
+
+
+async def test_coordinator_cached_then_reconciled(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    api_client: IntersvyazApiClient,
+    fake_is74: FakeIs74,
+) -> None:
+    """Сохранённый снимок доступен сразу и заменяется ответом API."""
+    entry = _entry(hass)
+    hass_storage[storage_key(entry.entry_id)] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": storage_key(entry.entry_id),
+        "data": {"group_ids": ["yard0"], "cameras": [{"UUID": "old-cam"}], "relays": []},
+    }
+    coordinator = IntersvyazDataUpdateCoordinator(hass, entry, {MAIN_ADDRESS: api_client})
+
+    assert await coordinator.async_load_cached()
+    assert coordinator.data.cameras == [{"UUID": "old-cam"}]
+    assert fake_is74.state.requests["get-group"] == 0
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert "old-cam" not in {camera["UUID"] for camera in coordinator.data.cameras}
+
+
+async def test_coordinator_stale_cache_ignored(
+    hass: HomeAssistant, hass_storage: dict[str, Any], api_client: IntersvyazApiClient
+) -> None:
+    """Снимок старого формата не загружается, запись ждёт ответа API."""
+    entry = _entry(hass)
+    hass_storage[storage_key(entry.entry_id)] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": storage_key(entry.entry_id),
+        "data": {"group_id": "yard0", "cameras": []},
+    }
+    coordinator = IntersvyazDataUpdateCoordinator(hass, entry, {MAIN_ADDRESS: api_client})
+
+    assert not await coordinator.async_load_cached()
+    assert coordinator.data is None
+
+
+async def test_history_cursor(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Первая загрузка не засыпает шину, дальше запрашиваются только новые записи."""
+    events = async_capture_events(hass, EVENT_HISTORY)
+    history = HistoryCoordinator(hass, _entry(hass), api_client)
+    await history.async_load()
+
+    await history.async_refresh()
+    await hass.async_block_till_done()
+    assert len(history.data) == 10
+    assert events == []
+
+    fake_is74.config.history_records = 12
+    await history.async_refresh()
+    await hass.async_block_till_done()
+
+    assert len(history.data) == 12
+    assert [event.data["id"] for event in events] == ["9010", "9011"]
+    assert history.last_record("call")["id"] == "9011"
+    assert history.last_record("open")["id"] == "9010"
+
+
+async def test_history_error_keeps_records(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """Сбой сервера — ошибка обновления, а не пустой журнал."""
+    history = HistoryCoordinator(hass, _entry(hass), api_client)
+    await history.async_load()
+    await history.async_refresh()
+
+    fake_is74.config.error_rate = 1.0
+    await history.async_refresh()
+
+    assert not history.last_update_success
+    assert len(history.data) == 10
+
+
+async def test_history_unsupported_stops_polling(
+    hass: HomeAssistant, api_client: IntersvyazApiClient, fake_is74: FakeIs74
+) -> None:
+    """После 404 журнал больше не запрашивается."""
+    fake_is74.config.history_supported = False
+    history = HistoryCoordinator(hass, _entry(hass), api_client)
+    await history.async_load()
+
+    await history.async_refresh()
+    assert not history.last_update_success
+    assert history.update_interval is None
+    assert fake_is74.state.requests["history"] == 1
+
+    await history.async_refresh()
+    assert fake_is74.state.requests["history"] == 1
+    assert history.data == []
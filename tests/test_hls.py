@@ -0,0 +1,65 @@
+"""Тесты разбора HLS-плейлистов."""
+from __future__ import annotations
+
+from custom_components.intersvyaz.hls import parse_best_variant, parse_media_playlist
+
+PLAYLIST_URL = "https://cdn.cams.is74.ru/hls/playlists/multivariant.m3u8?uuid=cam&token=bearer-abc"
+
+MULTIVARIANT = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=400000,RESOLUTION=640x360
+low/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=1500000,RESOLUTION=1280x720
+high/index.m3u8
+#EXT-X-STREAM-INF:RESOLUTION=320x180
+audio/index.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:4
+#EXT-X-MEDIA-SEQUENCE:120
+#EXTINF:4.0,
+segment120.ts
+#EXTINF:3.5,
+/hls/segments/segment121.ts?token=bearer-other
+"""
+
+
+def test_best_variant() -> None:
+    """Выбирается наибольший BANDWIDTH, URL абсолютный и с токеном."""
+    assert parse_best_variant(MULTIVARIANT, PLAYLIST_URL) == (
+        "https://cdn.cams.is74.ru/hls/playlists/high/index.m3u8?uuid=cam&token=bearer-abc"
+    )
+
+
+def test_lowest_variant() -> None:
+    """С lowest=True выбирается наименьший битрейт; без BANDWIDTH — ноль."""
+    assert parse_best_variant(MULTIVARIANT, PLAYLIST_URL, lowest=True) == (
+        "https://cdn.cams.is74.ru/hls/playlists/audio/index.m3u8?uuid=cam&token=bearer-abc"
+    )
+
+
+def test_no_variants() -> None:
+    """Медиаплейлист без вариантов — None."""
+    assert parse_best_variant(MEDIA, PLAYLIST_URL) is None
+
+
+def test_media_playlist() -> None:
+    """Номера сегментов идут от MEDIA-SEQUENCE, свой токен сегмента сохраняется."""
+    target_duration, segments = parse_media_playlist(MEDIA, PLAYLIST_URL)
+    assert target_duration == 4.0
+    assert segments == [
+        (
+            120,
+            4.0,
+            "https://cdn.cams.is74.ru/hls/playlists/segment120.ts?uuid=cam&token=bearer-abc",
+        ),
+        (121, 3.5, "https://cdn.cams.is74.ru/hls/segments/segment121.ts?token=bearer-other"),
+    ]
+
+
+def test_media_playlist_defaults() -> None:
+    """Без тегов — длительность 2 с и нумерация с нуля."""
+    target_duration, segments = parse_media_playlist("#EXTM3U\n#EXTINF:2,\na.ts\n", PLAYLIST_URL)
+    assert target_duration == 2.0
+    assert [segment[0] for segment in segments] == [0]
@@ -0,0 +1,195 @@
+"""Тесты планировщика запросов."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from custom_components.intersvyaz import scheduler as scheduler_module
+from custom_components.intersvyaz.scheduler import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+    Priority,
+    RequestScheduler,
+    TokenBucket,
+)
+
+HOST = "api.is74.ru"
+
+
+def test_token_bucket_rate() -> None:
+    """Токены расходуются до capacity и пополняются со скоростью rate."""
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = time.monotonic()
+    assert bucket.wait_time(now) == 0
+    bucket.take(now)
+    bucket.take(now)
+    assert bucket.wait_time(now) == pytest.approx(0.5)
+    assert bucket.wait_time(now + 0.5) == 0
+    # Простой не копит токенов больше capacity
+    assert bucket.wait_time(now + 100) == 0
+    bucket.take(now + 100)
+    bucket.take(now + 100)
+    assert bucket.wait_time(now + 100) == pytest.approx(0.5)
+
+
+def test_token_bucket_debt() -> None:
+    """Открытие двери может увести баланс в минус, следующие ждут дольше."""
+    bucket = TokenBucket(rate=1, capacity=1)
+    now = time.monotonic()
+    bucket.take(now)
+    bucket.take(now)
+    assert bucket.wait_time(now) == pytest.approx(2)
+
+
+def test_breaker_transitions() -> None:
+    """CLOSED → OPEN → HALF_OPEN → OPEN с удвоенной паузой → CLOSED."""
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30, max_reset_timeout=100)
+    now = 1000.0
+
+    assert not breaker.failure(now)
+    assert not breaker.failure(now)
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.failure(now)
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow(now + 29)
+
+    # Первый запрос после паузы становится пробой, остальные ждут её исхода
+    assert breaker.allow(now + 30)
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert not breaker.allow(now + 30)
+
+    # Неудачная проба удваивает паузу
+    assert not breaker.failure(now + 30, probe=True)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.opened_until == now + 90
+    assert not breaker.allow(now + 89)
+    assert breaker.allow(now + 90)
+
+    # Пауза не превышает максимума
+    breaker.failure(now + 90, probe=True)
+    assert breaker.opened_until == now + 190
+    assert breaker.allow(now + 190)
+
+    assert breaker.success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow(now + 190)
+
+    # После восстановления пауза снова базовая
+    for _ in range(3):
+        breaker.failure(now + 200)
+    assert breaker.opened_until == now + 230
+
+
+def test_breaker_probe_outcome() -> None:
+    """Во время пробы чужие отказы не считаются, прерванная проба повторяется."""
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30, max_reset_timeout=300)
+    breaker.failure(0)
+    assert breaker.allow(30)
+
+    assert not breaker.failure(31)
+    assert breaker.state == BreakerState.HALF_OPEN
+
+    breaker.abort_probe()
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.allow(31)
+    assert breaker.state == BreakerState.HALF_OPEN
+
+
+async def test_scheduler_priority() -> None:
+    """Освободившийся слот получает самый важный из ожидающих."""
+    scheduler = RequestScheduler(max_concurrent=2, rate=1000, burst=1000)
+    order: list[Priority] = []
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.async_slot(HOST, Priority.METADATA):
+            entered.set()
+            await release.wait()
+
+    async def request(priority: Priority) -> None:
+        async with scheduler.async_slot(HOST, priority):
+            order.append(priority)
+
+    holder = asyncio.create_task(hold())
+    await entered.wait()
+    waiting = [
+        asyncio.create_task(request(priority))
+        for priority in (Priority.METADATA, Priority.MEDIA, Priority.AUTH)
+    ]
+    await asyncio.sleep(0)
+    assert not order
+
+    release.set()
+    await asyncio.gather(holder, *waiting)
+    assert order == [Priority.AUTH, Priority.MEDIA, Priority.METADATA]
+
+
+async def test_scheduler_reserves_open_slot() -> None:
+    """Фоновые запросы не занимают последний слот: дверь не ждёт."""
+    scheduler = RequestScheduler(max_concurrent=2, rate=1000, burst=1000)
+    release = asyncio.Event()
+    background, queued, door = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+    async def hold(priority: Priority, entered: asyncio.Event) -> None:
+        async with scheduler.async_slot(HOST, priority):
+            entered.set()
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold(Priority.METADATA, background))]
+    await background.wait()
+    tasks.append(asyncio.create_task(hold(Priority.METADATA, queued)))
+    tasks.append(asyncio.create_task(hold(Priority.OPEN, door)))
+
+    await asyncio.wait_for(door.wait(), 1)
+    assert not queued.is_set()
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert queued.is_set()
+
+
+async def test_scheduler_probe_owned_by_admitted_request(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Исход пробы решает только запрос, прошедший пробой, а не открытие двери."""
+    monkeypatch.setattr(scheduler_module, "BREAKER_RESET_TIMEOUT", 0.01)
+    scheduler = RequestScheduler(rate=1000, burst=1000)
+    for _ in range(scheduler_module.BREAKER_FAILURE_THRESHOLD):
+        scheduler.record_failure(HOST)
+    assert scheduler.host_state(HOST) == BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        async with scheduler.async_slot(HOST, Priority.METADATA):
+            pass
+    await asyncio.sleep(0.02)
+
+    started = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def probe() -> None:
+        async with scheduler.async_slot(HOST, Priority.METADATA):
+            started.set()
+            await finish.wait()
+            raise aiohttp.ClientConnectionError
+
+    task = asyncio.create_task(probe())
+    await started.wait()
+    assert scheduler.host_state(HOST) == BreakerState.HALF_OPEN
+
+    with pytest.raises(CircuitOpenError):
+        async with scheduler.async_slot(HOST, Priority.METADATA):
+            pass
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        async with scheduler.async_slot(HOST, Priority.OPEN):
+            raise aiohttp.ClientConnectionError
+    assert scheduler.host_state(HOST) == BreakerState.HALF_OPEN
+
+    finish.set()
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await task
+    assert scheduler.host_state(HOST) == BreakerState.OPEN
@@ -0,0 +1,86 @@
+"""Тесты сервиса открытия двери на стенде."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_capture_events
+
+from custom_components.intersvyaz.api import IntersvyazApiClient
+from custom_components.intersvyaz.const import (
+    ATTR_RELAY_ID,
+    DOMAIN,
+    EVENT_DOOR_OPEN,
+    MAIN_ADDRESS,
+    SERVICE_OPEN_DOOR,
+)
+from custom_components.intersvyaz.coordinator import IntersvyazDataUpdateCoordinator
+from custom_components.intersvyaz.services import async_setup_services
+
+from .conftest import FakeIs74
+
+
+@pytest.fixture
+async def entry_id(hass: HomeAssistant, api_client: IntersvyazApiClient) -> AsyncIterator[str]:
+    """Запись с полученным списком реле и зарегистрированный сервис."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    coordinator = IntersvyazDataUpdateCoordinator(hass, entry, {MAIN_ADDRESS: api_client})
+    await coordinator.async_refresh()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "client": api_client,
+        "clients": {MAIN_ADDRESS: api_client},
+        "coordinator": coordinator,
+    }
+    async_setup_services(hass)
+    yield entry.entry_id
+    # Отказ реле ставит обновление списка в очередь, его таймер не должен пережить тест
+    await coordinator.async_shutdown()
+
+
+async def test_open_door_service(
+    hass: HomeAssistant, entry_id: str, fake_is74: FakeIs74
+) -> None:
+    """Несколько дверей открываются одним вызовом, результат — события."""
+    events = async_capture_events(hass, EVENT_DOOR_OPEN)
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_OPEN_DOOR, {ATTR_RELAY_ID: ["500", "501"]}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert fake_is74.state.requests["open"] == 2
+    assert sorted(event.data["relay_id"] for event in events) == ["500", "501"]
+    assert all(event.data["entry_id"] == entry_id and event.data["success"] for event in events)
+
+
+async def test_open_door_service_unknown_relay(
+    hass: HomeAssistant, entry_id: str, fake_is74: FakeIs74
+) -> None:
+    """Неизвестное реле — ошибка до отправки запросов."""
+    with pytest.raises(HomeAssistantError, match="999"):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_OPEN_DOOR, {ATTR_RELAY_ID: ["500", "999"]}, blocking=True
+        )
+
+    assert fake_is74.state.requests["open"] == 0
+
+
+async def test_open_door_service_relay_gone(
+    hass: HomeAssistant, entry_id: str, fake_is74: FakeIs74
+) -> None:
+    """Реле пропало на сервере: ошибка, событие неудачи и новый список реле."""
+    events = async_capture_events(hass, EVENT_DOOR_OPEN)
+    coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+    fake_is74.config.relays = 1
+
+    with pytest.raises(HomeAssistantError, match="404"):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_OPEN_DOOR, {ATTR_RELAY_ID: "501"}, blocking=True
+        )
+    await coordinator.async_refresh()
+
+    assert [(event.data["success"], event.data["status"]) for event in events] == [(False, 404)]
+    assert [relay["RELAY_ID"] for relay in coordinator.data.relays] == [500]
@@ -0,0 +1,136 @@
+"""Тесты кэша снимков камер."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from homeassistant.components.camera import Image
+from homeassistant.core import HomeAssistant
+
+from custom_components.intersvyaz import snapshot as snapshot_module
+from custom_components.intersvyaz.snapshot import SnapshotCache
+
+
+class FakeFetch:
+    """Получение кадра: отдаёт кадры по очереди и считает вызовы."""
+
+    def __init__(self, *images: bytes | Exception | None) -> None:
+        """Инициализация; последний кадр повторяется, исключение выбрасывается."""
+        self._images = list(images)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> bytes | None:
+        """Кадр после release."""
+        self.calls += 1
+        await self.release.wait()
+        image = self._images[min(self.calls, len(self._images)) - 1]
+        if isinstance(image, Exception):
+            raise image
+        return image
+
+
+@pytest.fixture(autouse=True)
+def fake_scale(monkeypatch: pytest.MonkeyPatch) -> list[bytes]:
+    """Уменьшение кадра без декодирования JPEG; список исходных кадров."""
+    scaled: list[bytes] = []
+
+    def _scale(image: Image, width: int, height: int) -> bytes:
+        scaled.append(image.content)
+        return f"{width}x{height}:".encode() + image.content
+
+    monkeypatch.setattr(snapshot_module, "scale_jpeg_camera_image", _scale)
+    return scaled
+
+
+async def test_concurrent_requests_share_fetch(hass: HomeAssistant) -> None:
+    """Параллельные запросы кадра одной камеры получают его один раз."""
+    cache = SnapshotCache(hass, max_age=60, max_bytes=1024)
+    fetch = FakeFetch(b"frame")
+    fetch.release.clear()
+
+    requests = [asyncio.ensure_future(cache.async_get("cam", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(*requests) == [b"frame"] * 5
+    assert fetch.calls == 1
+    # Свежий кадр берётся из кэша
+    assert await cache.async_get("cam", fetch) == b"frame"
+    assert fetch.calls == 1
+
+
+async def test_stale_frame_on_failure(hass: HomeAssistant) -> None:
+    """Если кадр не получен, отдаётся устаревший, а не пустой."""
+    cache = SnapshotCache(hass, max_age=0, max_bytes=1024)
+    fetch = FakeFetch(b"old", RuntimeError("ffmpeg"), None)
+
+    assert await cache.async_get("cam", fetch) == b"old"
+    assert await cache.async_get("cam", fetch) == b"old"
+    assert await cache.async_get("cam", fetch) == b"old"
+    assert fetch.calls == 3
+
+
+async def test_byte_budget_evicts_oldest(hass: HomeAssistant) -> None:
+    """Сверх объёма вытесняются давно не запрошенные кадры; слишком большой не хранится."""
+    cache = SnapshotCache(hass, max_age=60, max_bytes=10)
+    fetches = {key: FakeFetch(key.encode() * 4) for key in ("a", "b", "c")}
+
+    await cache.async_get("a", fetches["a"])
+    await cache.async_get("b", fetches["b"])
+    # Запрос поднимает кадр в начало очереди: вытеснен будет b
+    await cache.async_get("a", fetches["a"])
+    await cache.async_get("c", fetches["c"])
+
+    await cache.async_get("a", fetches["a"])
+    await cache.async_get("b", fetches["b"])
+    assert fetches["a"].calls == 1
+    assert fetches["b"].calls == 2
+
+    huge = FakeFetch(b"x" * 11)
+    await cache.async_get("huge", huge)
+    await cache.async_get("huge", huge)
+    assert huge.calls == 2
+
+
+async def test_scaled_copy_follows_source(hass: HomeAssistant, fake_scale: list[bytes]) -> None:
+    """Уменьшенная копия делается один раз и не переживает новый исходный кадр."""
+    cache = SnapshotCache(hass, max_age=60, max_bytes=1024)
+    fetch = FakeFetch(b"v1", b"v2")
+
+    assert await cache.async_get("cam", fetch, 320, 180) == b"320x180:v1"
+    assert await cache.async_get("cam", fetch, 320, 180) == b"320x180:v1"
+    assert fake_scale == [b"v1"]
+
+    await cache.async_refresh("cam", fetch)
+    # Обновление с max_age / 2 не требуется: кадр свежий
+    assert fetch.calls == 1
+
+    expired = SnapshotCache(hass, max_age=0, max_bytes=1024)
+    fetch = FakeFetch(b"v1", b"v2")
+    assert await expired.async_get("cam", fetch, 320, 180) == b"320x180:v1"
+    assert await expired.async_get("cam", fetch, 320, 180) == b"320x180:v2"
+    assert fake_scale == [b"v1", b"v1", b"v2"]
+
+
+async def test_clear_cancels_pending_fetch(hass: HomeAssistant) -> None:
+    """Очистка отменяет идущее получение, и оно не кладёт кадр обратно."""
+    cache = SnapshotCache(hass, max_age=60, max_bytes=1024)
+    hanging = FakeFetch(b"late")
+    hanging.release.clear()
+
+    request = asyncio.ensure_future(cache.async_get("cam", hanging))
+    await asyncio.sleep(0)
+    cache.clear()
+
+    with pytest.raises(asyncio.CancelledError):
+        await request
+
+    fresh = FakeFetch(b"fresh")
+    assert await cache.async_get("cam", fresh) == b"fresh"
+    assert fresh.calls == 1
+    hanging.release.set()
+    await hass.async_block_till_done()
+    assert await cache.async_get("cam", fresh) == b"fresh"
+    assert fresh.calls == 1